@@ -1,40 +1,555 @@
+import calendar
 import json
 import os
-from datetime import datetime, timedelta
-from collections import defaultdict
-import statistics
-import re    
+import sys
+from datetime import date, datetime
+from collections import Counter, defaultdict
+import heapq
+import threading
+from fintrack_armazenamento import criar_armazenamento, ArmazenamentoAdiado, ConflitoDeVersao, MODOS_ARMAZENAMENTO
+from fintrack_busca import IndiceBusca
+from fintrack_categorias import RegistroCategorias, ClassificadorCategorias
+from fintrack_snapshot import ErroSnapshot
+from fintrack_importacao import importar_extrato, imprimir_relatorio
+from fintrack_metricas import METRICAS, capturar_perfil, configurar_pelo_ambiente
+from fintrack_previsao import MotorPrevisao, MODELOS
+from fintrack_recorrentes import AgendaRecorrentes, FREQUENCIAS
+from fintrack_orcamentos import ControleOrcamentos
+from fintrack_datas import ordinal_da_data, validar_datas
+from fintrack_exibicao import (formatar_brl, formatar_data, exibir_transacoes, exibir_transacoes_gerenciar, exibir_analise,
+                               exibir_previsao, exibir_recomendacoes, exibir_dashboard, exibir_busca,
+                               exibir_recorrentes, exibir_alertas, exibir_orcamentos, texto_alerta)
 class FinTrack:  # Aplicativo funcional feito para portifólio (propriedade autoral/intelectual de Eduardo J.)'''
-    def __init__(self, arquivo_dados='fintrack_data.json'):
+    def __init__(self, arquivo_dados='fintrack_data.json', modo_armazenamento=None, intervalo_gravacao=None):
+        # Instrumentação opcional (FINTRACK_METRICAS*); desligada, não embrulha nada
+        configurar_pelo_ambiente()
         self.arquivo_dados = arquivo_dados
-        self.transacoes = []
+        # Modos: 'json' (arquivo único), 'journal' (snapshot + journal append-only),
+        # 'binario' (snapshot binário colunar + journal), 'particionado' (um arquivo por ano,
+        # carregado sob demanda) ou 'sqlite' (anos lidos do banco sob demanda)
+        self.modo_armazenamento = modo_armazenamento or os.environ.get('FINTRACK_ARMAZENAMENTO', 'json')
+        self.armazenamento = criar_armazenamento(self.modo_armazenamento, arquivo_dados)
+        # Protege as transações em memória quando a gravação roda em segundo plano
+        self._trava = threading.RLock()
+        # Write-behind: com intervalo > 0 (segundos) as mutações são gravadas em lote por uma thread
+        if intervalo_gravacao is None:
+            intervalo_gravacao = float(os.environ.get('FINTRACK_INTERVALO_GRAVACAO', 0))
+        if intervalo_gravacao > 0:
+            self.armazenamento = ArmazenamentoAdiado(
+                self.armazenamento, self._trava, intervalo=intervalo_gravacao,
+                tamanho_lote=int(os.environ.get('FINTRACK_LOTE_GRAVACAO', 100)),
+                ao_gravar=self._apos_gravacao)
+        # Índice id -> transação (ordem de inserção); remoção e busca em O(1)
+        self._por_id = {}
+        # Carga sob demanda (particionado, sqlite): anos ainda não lidos -> quantidade de transações
+        self._anos_pendentes = {}
+        self.proximo_id = 1
+        # Índice (ano, mes) -> {id: transação} e resumos mensais, mantidos a cada mutação
+        self._indice_mes = defaultdict(dict)
+        self._resumo_mes = {}
+        self._contribuicao = {}
+        # Total de despesas por (ano, mes), acompanhando o resumo (orçamento geral em O(1))
+        self._despesas_mes = {}
+        # Data de cada transação como ordinal (date.toordinal), para filtrar e ordenar sem strptime
+        self._ordinal = {}
+        # Versão dos dados em memória (muda a cada carga/mutação) e estado dos arquivos lidos
+        self.versao = 0
+        self._assinatura = None
+        # IDs alterados desde _versao_base (um por versão), para consumidores incrementais
+        self._alteracoes = []
+        self._versao_base = 0
+        # Índice de busca textual, montado na primeira busca
+        self._busca = None
+        # Classificador descrição -> categoria, treinado na primeira sugestão
+        self._classificador = None
         self.categorias_padrao = {
             'receita': ['Salário', 'Freelance', 'Investimentos', 'Outros'],
             'despesa': ['Alimentação', 'Transporte', 'Moradia', 'Saúde', 
                        'Entretenimento', 'Educação', 'Vestuário', 'Outros']
         }
+        auxiliares = self.arquivos_auxiliares(arquivo_dados)
+        # Padrão + categorias criadas pelo usuário (<base>.categorias.json) + as que aparecem nos dados
+        self.registro_categorias = RegistroCategorias(auxiliares['categorias'], self.categorias_padrao,
+                                                      arquivo_trava=auxiliares['trava'])
+        # Regras recorrentes (<base>.recorrentes.json), materializadas quando um período consultado precisa
+        self.recorrentes = AgendaRecorrentes(auxiliares['recorrentes'], arquivo_trava=auxiliares['trava_recorrentes'])
+        # Orçamentos mensais (<base>.orcamentos.json) e histórico de alertas (<base>.alertas.jsonl)
+        self.orcamentos = ControleOrcamentos(auxiliares['orcamentos'], auxiliares['alertas'],
+                                             arquivo_trava=auxiliares['trava'])
         self.carregar_dados()
+        if METRICAS.ativo:
+            METRICAS.acompanhar(self)
+    
+    @staticmethod
+    def arquivos_auxiliares(arquivo_dados):
+        """Arquivos dos cadastros ao lado dos dados (categorias, recorrentes, orçamentos, alertas e travas)"""
+        base = os.path.splitext(arquivo_dados)[0]
+        return {
+            'categorias': base + '.categorias.json',
+            'recorrentes': base + '.recorrentes.json',
+            'trava_recorrentes': base + '.recorrentes.lock',
+            'orcamentos': base + '.orcamentos.json',
+            'alertas': base + '.alertas.jsonl',
+            'trava': base + '.lock',
+        }
+    
+    @classmethod
+    def arquivos(cls, arquivo_dados, modo_armazenamento):
+        """Todos os caminhos de um FinTrack com esse nome base e modo (sem abrir nem criar nada)"""
+        caminhos = MODOS_ARMAZENAMENTO[modo_armazenamento].arquivos(arquivo_dados)
+        return list(dict.fromkeys(caminhos + list(cls.arquivos_auxiliares(arquivo_dados).values())))
     
     def carregar_dados(self):
-        """Carrega dados do arquivo JSON com tratamento de erros"""
+        """Carrega dados do armazenamento com tratamento de erros"""
         try:
-            if os.path.exists(self.arquivo_dados):
-                with open(self.arquivo_dados, 'r', encoding='utf-8') as f:
-                    self.transacoes = json.load(f)
+            if getattr(self.armazenamento, 'particionado', False):
+                # Só o índice agora; cada ano é lido quando uma consulta precisar dele
+                indice = self.armazenamento.indice()
+                transacoes = []
             else:
-                self.transacoes = []
-        except (json.JSONDecodeError, IOError) as e:
+                indice = {}
+                transacoes = self.armazenamento.carregar()
+            contador = self.armazenamento.ler_contador()
+        except (json.JSONDecodeError, ErroSnapshot, IOError) as e:
             print(f"⚠️  Erro ao carregar dados: {e}")
             print("Iniciando com dados vazios...")
-            self.transacoes = []
+            transacoes, contador, indice = [], 1, {}
+        
+        por_id = {}
+        repetidas = []
+        for t in transacoes:
+            # Registros anteriores ao controle de versão começam na versão 1
+            t.setdefault('versao', 1)
+            if t['id'] in por_id:
+                repetidas.append(t)
+            else:
+                por_id[t['id']] = t
+        with self._trava:
+            self._por_id = por_id
+            self._anos_pendentes = {ano: quantidade for ano, (quantidade, _) in indice.items()}
+        
+        # O contador persistido nunca recua, mesmo que o maior ID tenha sido deletado
+        self.proximo_id = max(contador, max(self._por_id, default=0) + 1)
+        
+        if repetidas:
+            # Versões antigas geravam id = len + 1 e repetiam IDs após exclusões
+            for t in repetidas:
+                t['id'] = self._alocar_id()
+                self._por_id[t['id']] = t
+            print(f"⚠️  {len(repetidas)} transação(ões) com ID repetido receberam novos IDs")
+            self.salvar_dados()
+        
+        self._reconstruir_indices(indice)
+        self._conhecer_categorias()
+        self.recorrentes.recarregar()
+        self.orcamentos.recarregar()
+        self._nova_base()
     
-    def salvar_dados(self):
-        """Salva dados no arquivo JSON com tratamento de erros"""
+    def _conhecer_categorias(self):
+        """Relê o cadastro de categorias e inclui as usadas nos dados (pelos resumos mensais)"""
+        self.registro_categorias.recarregar()
+        usadas = set()
+        for resumo in self._resumo_mes.values():
+            usadas.update(resumo)
+        for tipo, categoria in usadas:
+            self.registro_categorias.conhecer(tipo, categoria)
+    
+    def _nova_base(self):
+        """Marca uma nova versão sem histórico de alterações (consumidores reconstroem tudo)"""
+        self.versao += 1
+        self._versao_base = self.versao
+        self._alteracoes = []
+        self._assinatura = self.armazenamento.assinatura()
+    
+    def alteracoes_desde(self, versao):
+        """IDs alterados depois da versão informada, ou None se for preciso reconstruir"""
+        if versao < self._versao_base or versao > self.versao:
+            return None
+        return self._alteracoes[versao - self._versao_base:]
+    
+    def recarregar_se_alterado(self):
+        """Recarrega só se outro processo gravou nos arquivos; retorna True se recarregou
+        
+        Sem gravação de fora, as mutações pendentes do write-behind continuam
+        esperando o intervalo/lote: nada é gravado aqui.
+        """
+        if self.armazenamento.assinatura() == self._assinatura:
+            return False
+        # Grava antes o que estiver pendente (sobre o que o outro processo gravou), para não perder ao recarregar
+        self.flush()
+        self.carregar_dados()
+        return True
+    
+    def flush(self):
+        """Grava agora as mutações pendentes do write-behind (sem efeito no modo síncrono)"""
+        if hasattr(self.armazenamento, 'flush'):
+            try:
+                self.armazenamento.flush()
+            except IOError as e:
+                print(f"❌ Erro ao salvar dados: {e}")
+    
+    def _apos_gravacao(self, antes, depois, conflitos):
+        """Chamado pelo write-behind: a gravação própria não deve disparar recarga
+        
+        Se houve conflito, a memória diverge do disco e a próxima verificação recarrega.
+        """
+        if conflitos:
+            print(f"⚠️  {len(conflitos)} alteração(ões) descartada(s): transação(ões) {', '.join(map(str, conflitos))} "
+                  "alterada(s) em outra sessão")
+            self._assinatura = None
+        elif self._assinatura == antes:
+            self._assinatura = depois
+    
+    def _acompanhar(self, antes):
+        """Depois de uma gravação própria: adota o novo estado dos arquivos só se
+        ninguém mais tinha gravado antes (senão deixa para recarregar_se_alterado)"""
+        if self._assinatura == antes:
+            self._assinatura = self.armazenamento.assinatura()
+    
+    def __len__(self):
+        """Quantidade de transações (inclusive as de anos ainda não carregados)"""
+        return len(self._por_id) + sum(self._anos_pendentes.values())
+    
+    @property
+    def transacoes(self):
+        """Todas as transações em ordem de inserção (cópia da lista; carrega todos os anos)"""
+        self._carregar_tudo()
+        return list(self._por_id.values())
+    
+    def _carregar_anos(self, anos):
+        """Lê as partições dos anos pedidos que ainda não estão em memória
+        
+        O resumo mensal desses anos (vindo do índice) é refeito a partir das
+        transações lidas; os IDs entram em alteracoes_desde como alterados.
+        """
+        with self._trava:
+            faltando = sorted(ano for ano in anos if ano in self._anos_pendentes)
+            if not faltando:
+                return
+            carregadas = []
+            for ano in faltando:
+                transacoes = self.armazenamento.carregar_ano(ano)
+                del self._anos_pendentes[ano]
+                for chave in [chave for chave in self._resumo_mes if chave[0] == ano]:
+                    del self._resumo_mes[chave]
+                    self._despesas_mes.pop(chave, None)
+                for t in transacoes:
+                    t.setdefault('versao', 1)
+                    if t['id'] not in self._por_id:
+                        self._por_id[t['id']] = t
+                        self._indexar(t)
+                        carregadas.append(t['id'])
+            self._registrar_alteracoes(carregadas)
+    
+    def _carregar_tudo(self):
+        """Garante todos os anos em memória (consultas sem filtro de data)"""
+        if self._anos_pendentes:
+            self._carregar_anos(list(self._anos_pendentes))
+    
+    def _transacao_carregada(self, transacao_id):
+        """Transação pelo ID; se não estiver em memória, carrega os anos pendentes e procura de novo"""
+        transacao = self._por_id.get(transacao_id)
+        if transacao is None and self._anos_pendentes:
+            self._carregar_tudo()
+            transacao = self._por_id.get(transacao_id)
+        return transacao
+    
+    def _reservar_ids(self, quantidade):
+        """Reserva IDs no contador persistido (único entre processos); retorna o primeiro"""
+        antes = self.armazenamento.assinatura()
         try:
-            with open(self.arquivo_dados, 'w', encoding='utf-8') as f:
-                json.dump(self.transacoes, f, indent=2, ensure_ascii=False)
+            primeiro = self.armazenamento.reservar_ids(quantidade, self.proximo_id)
         except IOError as e:
             print(f"❌ Erro ao salvar dados: {e}")
+            primeiro = self.proximo_id
+        self.proximo_id = primeiro + quantidade
+        self._acompanhar(antes)
+        return primeiro
+    
+    def _alocar_id(self):
+        """Reserva o próximo ID e grava o contador antes de usar o ID"""
+        return self._reservar_ids(1)
+    
+    def obter_transacao(self, transacao_id):
+        """Busca uma transação pelo ID em O(1)"""
+        return self._transacao_carregada(transacao_id)
+    
+    def remover_transacao(self, transacao_id, versao_esperada=None):
+        """Remove uma transação pelo ID sem confirmação; retorna a transação removida ou None
+        
+        Com `versao_esperada`, lança ConflitoDeVersao se a transação mudou desde que foi lida.
+        """
+        with self._trava:
+            transacao = self._transacao_carregada(transacao_id)
+            if transacao is None:
+                return None
+            if versao_esperada is not None and transacao['versao'] != versao_esperada:
+                raise ConflitoDeVersao(f"Transação #{transacao_id} foi alterada em outra sessão")
+            del self._por_id[transacao_id]
+            self.persistir('delete', transacao)
+        return transacao
+    
+    def atualizar_transacao(self, transacao_id, campos, versao_esperada=None):
+        """Altera campos de uma transação sem interação; retorna a nova versão do registro
+        
+        O registro é substituído (não alterado no lugar) e ganha versão + 1. Com
+        `versao_esperada`, lança ConflitoDeVersao se a transação mudou desde que foi lida.
+        """
+        with self._trava:
+            atual = self._transacao_carregada(transacao_id)
+            if atual is None:
+                raise ConflitoDeVersao(f"Transação #{transacao_id} não existe mais")
+            if 'data' in campos:
+                self._carregar_anos([int(campos['data'][:4])])
+            if versao_esperada is not None and atual['versao'] != versao_esperada:
+                raise ConflitoDeVersao(f"Transação #{transacao_id} foi alterada em outra sessão")
+            nova = dict(atual, **campos, id=transacao_id)
+            self._por_id[transacao_id] = nova
+            self.persistir('edit', nova)
+        return nova
+    
+    def remover_em_lote(self, ids):
+        """Remove várias transações com uma única gravação; retorna as removidas (IDs inexistentes são ignorados)"""
+        with self._trava:
+            removidas = []
+            for transacao_id in dict.fromkeys(ids):
+                transacao = self._transacao_carregada(transacao_id)
+                if transacao is not None:
+                    del self._por_id[transacao_id]
+                    removidas.append(transacao)
+            if removidas:
+                self.persistir_lote('delete', removidas)
+        return removidas
+    
+    def atualizar_em_lote(self, alteracoes):
+        """Aplica [(id, campos)] com uma única gravação; retorna as novas versões
+        
+        Várias alterações do mesmo ID são combinadas em uma só; IDs inexistentes
+        são ignorados.
+        """
+        with self._trava:
+            novas = {}
+            for transacao_id, campos in alteracoes:
+                atual = novas.get(transacao_id) or self._transacao_carregada(transacao_id)
+                if atual is None:
+                    continue
+                if 'data' in campos:
+                    self._carregar_anos([int(campos['data'][:4])])
+                novas[transacao_id] = dict(atual, **campos, id=transacao_id)
+            for transacao_id, nova in novas.items():
+                self._por_id[transacao_id] = nova
+            if novas:
+                self.persistir_lote('edit', list(novas.values()))
+        return list(novas.values())
+    
+    @staticmethod
+    def _mes_da_data(data):
+        """Extrai (ano, mes) de uma data 'AAAA-MM-DD' sem strptime"""
+        return int(data[:4]), int(data[5:7])
+    
+    @staticmethod
+    def _fim_do_mes(mes, ano):
+        """Último dia do mês/ano (None quando o mês não foi informado)"""
+        if mes is None or ano is None:
+            return None
+        return date(ano, mes, calendar.monthrange(ano, mes)[1])
+    
+    def _reconstruir_indices(self, indice=None):
+        """Monta índice por mês e resumos mensais a partir das transações carregadas
+
+        Mesmo resultado de chamar _indexar para cada uma, mas sem os deltas e
+        convertendo cada data distinta uma só vez (é o custo dominante da abertura).
+        Nos modos com carga sob demanda (particionado, sqlite), os resumos dos anos
+        ainda não lidos vêm do `indice` do armazenamento.
+        """
+        self._indice_mes = indice_mes = defaultdict(dict)
+        self._resumo_mes = resumo_mes = {}
+        self._contribuicao = contribuicao = {}
+        self._ordinal = ordinais = {}
+        por_data = {}   # 'AAAA-MM-DD' -> ((ano, mes), ordinal)
+        for transacao_id, t in self._por_id.items():
+            data = t['data']
+            convertida = por_data.get(data)
+            if convertida is None:
+                convertida = por_data[data] = (self._mes_da_data(data), ordinal_da_data(data))
+            chave, ordinais[transacao_id] = convertida
+            contribuicao[transacao_id] = (chave, t['tipo'], t['categoria'], t['valor'])
+            indice_mes[chave][transacao_id] = t
+            resumo = resumo_mes.get(chave)
+            if resumo is None:
+                resumo = resumo_mes[chave] = {}
+            acumulado = resumo.get((t['tipo'], t['categoria']))
+            if acumulado is None:
+                resumo[(t['tipo'], t['categoria'])] = [t['valor'], 1]
+            else:
+                acumulado[0] += t['valor']
+                acumulado[1] += 1
+        for ano in self._anos_pendentes:
+            resumo_mes.update(indice[ano][1])
+        self._despesas_mes = {chave: sum(total for (tipo, _), (total, _) in resumo.items() if tipo == 'despesa')
+                              for chave, resumo in resumo_mes.items()}
+    
+    def _aplicar_resumo(self, contribuicao, sinal):
+        """Soma (sinal=1) ou subtrai (sinal=-1) uma transação do resumo do seu mês"""
+        chave, tipo, categoria, valor = contribuicao
+        resumo = self._resumo_mes.setdefault(chave, {})
+        acumulado = resumo.setdefault((tipo, categoria), [0.0, 0])
+        acumulado[0] += sinal * valor
+        acumulado[1] += sinal
+        if tipo == 'despesa':
+            self._despesas_mes[chave] = self._despesas_mes.get(chave, 0.0) + sinal * valor
+        # Sem transações restantes, descarta o acumulado (evita resíduo de ponto flutuante)
+        if acumulado[1] == 0:
+            del resumo[(tipo, categoria)]
+            if not resumo:
+                del self._resumo_mes[chave]
+                self._despesas_mes.pop(chave, None)
+    
+    def _indexar(self, transacao):
+        """Atualiza índice por mês e resumos com a versão atual da transação (aplica só o delta)"""
+        anterior = self._contribuicao.get(transacao['id'])
+        atual = (self._mes_da_data(transacao['data']), transacao['tipo'],
+                 transacao['categoria'], transacao['valor'])
+        # O dia pode mudar sem mudar o mês, então o ordinal é sempre recalculado
+        self._ordinal[transacao['id']] = ordinal_da_data(transacao['data'])
+        if anterior == atual:
+            # Mesmo mês e totais, mas o registro pode ter sido substituído
+            self._indice_mes[atual[0]][transacao['id']] = transacao
+            return
+        if anterior is not None:
+            self._indice_mes[anterior[0]].pop(transacao['id'], None)
+            self._aplicar_resumo(anterior, -1)
+        self._indice_mes[atual[0]][transacao['id']] = transacao
+        self._aplicar_resumo(atual, 1)
+        self._contribuicao[transacao['id']] = atual
+    
+    def _desindexar(self, transacao):
+        """Remove a transação do índice por mês e dos resumos"""
+        anterior = self._contribuicao.pop(transacao['id'], None)
+        self._ordinal.pop(transacao['id'], None)
+        if anterior is not None:
+            self._indice_mes[anterior[0]].pop(transacao['id'], None)
+            self._aplicar_resumo(anterior, -1)
+    
+    def salvar_dados(self):
+        """Salva todas as transações (no modo journal, compacta o histórico)"""
+        with self._trava:
+            self._carregar_tudo()
+            try:
+                self.armazenamento.salvar(self._por_id.values())
+            except IOError as e:
+                print(f"❌ Erro ao salvar dados: {e}")
+            self._nova_base()
+    
+    def persistir(self, operacao, transacao):
+        """Persiste uma única mutação ('add', 'edit' ou 'delete')
+        
+        Cada edição avança a versão do registro. Se outra sessão alterou o
+        registro no disco, a mutação é descartada, os dados são recarregados
+        e ConflitoDeVersao é lançada. Retorna os alertas de orçamento disparados.
+        """
+        return self.persistir_lote(operacao, [transacao])
+    
+    def persistir_lote(self, operacao, lote):
+        """Persiste várias mutações do mesmo tipo com uma única gravação
+        
+        Retorna os alertas de orçamento que o lote disparou; quem chamou decide
+        como mostrá-los (o menu e a página web leem do histórico de alertas).
+        """
+        with self._trava:
+            for transacao in lote:
+                if operacao == 'delete':
+                    self._desindexar(transacao)
+                else:
+                    if operacao == 'edit':
+                        transacao['versao'] = transacao.get('versao', 1) + 1
+                    self._indexar(transacao)
+            antes = self.armazenamento.assinatura()
+            conflitos = []
+            try:
+                conflitos = self.armazenamento.registrar_lote(operacao, lote, self._por_id.values())
+                if operacao != 'delete':
+                    # Categorias novas passam a ser conhecidas (validação e sugestões)
+                    self.registro_categorias.registrar((t['tipo'], t['categoria']) for t in lote)
+            except IOError as e:
+                print(f"❌ Erro ao salvar dados: {e}")
+            self._registrar_alteracoes([t['id'] for t in lote])
+            self._acompanhar(antes)
+            if conflitos:
+                # O disco venceu: volta a memória para o estado gravado
+                self.carregar_dados()
+                raise ConflitoDeVersao(f"Transação(ões) {', '.join(map(str, conflitos))} "
+                                       "alterada(s) em outra sessão; dados recarregados")
+            if operacao != 'delete':
+                return self._verificar_orcamentos(lote)
+            return []
+    
+    def _verificar_orcamentos(self, lote):
+        """Confere os orçamentos das categorias/meses tocados pelo lote (O(1) cada, pelos resumos)
+        
+        Só meses a partir do atual: importar extratos antigos não dispara alertas.
+        Retorna os alertas novos, já gravados no histórico.
+        """
+        orcamentos = self.orcamentos
+        if not orcamentos.limites and not orcamentos.geral:
+            return []
+        hoje = datetime.now()
+        atual = (hoje.year, hoje.month)
+        tocados = dict.fromkeys((self._contribuicao[t['id']][0], t['categoria'])
+                                for t in lote if t['tipo'] == 'despesa')
+        alertas = []
+        for chave, categoria in tocados:
+            if chave >= atual:
+                gasto = self._resumo_mes.get(chave, {}).get(('despesa', categoria), (0.0, 0))[0]
+                alertas.append(orcamentos.avaliar(*chave, categoria, gasto))
+        for chave in dict.fromkeys(chave for chave, _ in tocados):
+            if chave >= atual:
+                alertas.append(orcamentos.avaliar(*chave, None, self._despesas_mes.get(chave, 0.0)))
+        try:
+            return orcamentos.registrar([a for a in alertas if a])
+        except IOError as e:
+            print(f"❌ Erro ao salvar alertas: {e}")
+            return []
+    
+    def _registrar_alteracoes(self, ids):
+        """Avança uma versão por ID alterado (ou recomeça a base se o histórico ficou grande)"""
+        if len(self._alteracoes) + len(ids) > 10000:
+            assinatura = self._assinatura
+            self._nova_base()
+            self._assinatura = assinatura
+        else:
+            self.versao += len(ids)
+            self._alteracoes.extend(ids)
+    
+    def transacoes_do_mes(self, mes, ano):
+        """Transações de um mês/ano pelo índice em memória (o mesmo dos resumos mensais)"""
+        self._carregar_anos([ano])
+        return list(self._indice_mes.get((ano, mes), {}).values())
+    
+    def _totais_do_mes(self, mes, ano):
+        """Retorna (receitas, despesas, gastos_categoria) do mês ou None se não houver transações
+        
+        Lê o resumo mensal materializado: custo O(categorias), independente do histórico.
+        """
+        resumo = self._resumo_mes.get((ano, mes))
+        if not resumo:
+            return None
+        
+        receitas = despesas = 0.0
+        gastos_categoria = {}
+        for (tipo, categoria), (total, _) in resumo.items():
+            if tipo == 'receita':
+                receitas += total
+            elif tipo == 'despesa':
+                despesas += total
+                gastos_categoria[categoria] = total
+        
+        return receitas, despesas, gastos_categoria
+    
+    def resumo_do_mes(self, mes, ano):
+        """Totais do mês por (tipo, categoria), lidos do resumo materializado"""
+        self.materializar_recorrentes(self._fim_do_mes(mes, ano))
+        return {chave: total for chave, (total, _) in self._resumo_mes.get((ano, mes), {}).items()}
     
     def validar_valor(self, entrada):
         """Valida e converte entrada de valor monetário"""
@@ -57,255 +572,314 @@ class FinTrack:  # Aplicativo funcional feito para portifólio (propriedade auto
             raise ValueError("Valor inválido")
     
     def validar_categoria(self, categoria, tipo):
-        """Valida se categoria existe ou sugere alternativas"""
+        """Valida se categoria existe ou sugere alternativas
+        
+        Compara com as categorias conhecidas (padrão, criadas pelo usuário e
+        usadas nos dados) sem diferença de acentos/maiúsculas; nomes parecidos
+        (trigramas, "Alimentcao" -> "Alimentação") viram sugestão.
+        """
         categoria = categoria.strip().title()
         
         if not categoria:
             return None, "Categoria não pode ser vazia"
         
-        categorias_disponiveis = self.categorias_padrao[tipo]
-        
-        # Aceita categoria exata
-        if categoria in categorias_disponiveis:
-            return categoria, None
-        
-        # Busca categoria similar (case-insensitive)
-        for cat in categorias_disponiveis:
-            if cat.lower() == categoria.lower():
-                return cat, None
-        
-        # Busca parcial
-        sugestoes = [cat for cat in categorias_disponiveis 
-                     if categoria.lower() in cat.lower() or cat.lower() in categoria.lower()]
+        # Aceita categoria conhecida (devolve o nome cadastrado)
+        cadastrada, sugestoes = self.registro_categorias.procurar(categoria, tipo)
+        if cadastrada:
+            return cadastrada, None
         
         if sugestoes:
             return categoria, f"⚠️  '{categoria}' não encontrada. Você quis dizer: {', '.join(sugestoes)}?"
         
         return categoria, f"⚠️  '{categoria}' é uma categoria nova. Será adicionada ao sistema."
     
+    def categorias(self, tipo):
+        """Categorias conhecidas do tipo ('receita' ou 'despesa')"""
+        return self.registro_categorias.categorias(tipo)
+    
+    def sugerir_categoria(self, descricao, tipo):
+        """Categoria mais provável para a descrição, aprendida das transações (ou None)"""
+        return self.classificar_descricoes([(descricao, tipo)])[0]
+    
+    def classificar_descricoes(self, itens, confianca_minima=0.5):
+        """Rotula em lote uma lista de (descrição, tipo); None onde não há confiança suficiente
+        
+        O classificador é treinado na primeira chamada e depois atualizado só
+        com as transações alteradas; descrições repetidas são previstas uma vez.
+        """
+        with self._trava:
+            if self._classificador is None:
+                self._classificador = ClassificadorCategorias(self)
+            return self._classificador.classificar(itens, confianca_minima)
+    
     def validar_data(self, data_str):
-        """Valida formato de data"""
-        if not data_str or data_str.strip() == '':
-            return datetime.now().strftime('%Y-%m-%d'), None
-        
-        # Aceita formatos: DD/MM/YYYY, DD-MM-YYYY, YYYY-MM-DD
-        padroes = [
-            (r'(\d{2})[/-](\d{2})[/-](\d{4})', '%d/%m/%Y'),  # DD/MM/YYYY
-            (r'(\d{4})[/-](\d{2})[/-](\d{2})', '%Y-%m-%d'),  # YYYY-MM-DD
-        ]
-        
-        for padrao, formato in padroes:
-            match = re.match(padrao, data_str.strip())
-            if match:
-                try:
-                    if formato == '%d/%m/%Y':
-                        dia, mes, ano = match.groups()
-                        data = datetime.strptime(f"{dia}/{mes}/{ano}", formato)
-                    else:
-                        data = datetime.strptime(data_str.strip(), formato)
-                    
-                    # Verifica se data não é muito antiga ou futura
-                    hoje = datetime.now()
-                    if data.year < 2000 or data.year > hoje.year + 1:
-                        return None, f"Ano inválido: {data.year}"
-                    
-                    return data.strftime('%Y-%m-%d'), None
-                except ValueError:
-                    return None, "Data inválida (dia/mês incorretos)"
-        
-        return None, "Formato inválido. Use: DD/MM/AAAA ou AAAA-MM-DD"
+        """Valida formato de data (DD/MM/AAAA, DD-MM-AAAA ou AAAA-MM-DD)"""
+        return validar_datas([data_str])[0]
+    
+    def validar_datas(self, datas):
+        """Valida uma lista de datas de uma vez; retorna [(data, erro), ...] na mesma ordem"""
+        return validar_datas(datas)
+    
+    def ordinal_da_transacao(self, transacao_id):
+        """Data da transação como ordinal (date.toordinal), calculada ao carregar/inserir"""
+        return self._ordinal[transacao_id]
     
     def adicionar_transacao(self, tipo, valor, categoria, descricao='', data=None):
         """Adiciona uma nova transação com validações"""
         transacao = {
-            'id': len(self.transacoes) + 1,
+            'id': self._alocar_id(),
             'tipo': tipo,
             'valor': float(valor),
             'categoria': categoria,
             'descricao': descricao,
-            'data': data
+            'data': data,
+            'versao': 1
         }
         
-        self.transacoes.append(transacao)
-        self.salvar_dados()
-        data_formatada = datetime.strptime(data, '%Y-%m-%d').strftime('%d/%m/%Y')
+        with self._trava:
+            self._carregar_anos([int(data[:4])])
+            self._por_id[transacao['id']] = transacao
+            self.persistir('add', transacao)
+        data_formatada = formatar_data(data)
         print(f"\n✅ Transação adicionada com sucesso!")
         print(f"   {tipo.upper()}: R$ {valor:.2f} | {categoria} | {data_formatada}")
     
-    def listar_transacoes(self, mes=None, ano=None):
-        """Lista transações filtradas por mês/ano"""
+    def adicionar_em_lote(self, transacoes):
+        """Adiciona transações já validadas com uma única gravação (sem saída no terminal)
+        
+        Cada item precisa de 'tipo', 'valor', 'categoria', 'descricao' e 'data'; os IDs
+        são alocados aqui e o contador é gravado uma só vez.
+        """
+        if not transacoes:
+            return []
+        
+        primeiro_id = self._reservar_ids(len(transacoes))
+        
+        novas = [{
+            'id': transacao_id,
+            'tipo': t['tipo'],
+            'valor': float(t['valor']),
+            'categoria': t['categoria'],
+            'descricao': t.get('descricao', ''),
+            'data': t['data'],
+            'versao': 1
+        } for transacao_id, t in enumerate(transacoes, primeiro_id)]
+        
+        with self._trava:
+            self._carregar_anos({int(t['data'][:4]) for t in novas})
+            for transacao in novas:
+                self._por_id[transacao['id']] = transacao
+            self.persistir_lote('add', novas)
+        return novas
+    
+    def criar_recorrente(self, tipo, valor, categoria, descricao='', frequencia='mensal', inicio=None,
+                         intervalo=1, fim=None):
+        """Cria uma regra recorrente ('mensal', 'semanal' ou 'dias' a cada `intervalo`)
+        
+        Datas 'AAAA-MM-DD'; `inicio` padrão hoje e `fim` opcional (inclusivo). As
+        ocorrências já vencidas são geradas na hora, as futuras quando chegar a data.
+        """
+        regra = self.recorrentes.criar(tipo, valor, categoria, descricao, frequencia,
+                                       inicio or date.today().isoformat(), intervalo, fim)
+        self.registro_categorias.registrar([(tipo, categoria)])
+        self.materializar_recorrentes()
+        return regra
+    
+    def listar_recorrentes(self):
+        """Regras recorrentes cadastradas, pela ordem de criação"""
+        return self.recorrentes.listar()
+    
+    def remover_recorrente(self, regra_id):
+        """Encerra a regra; as transações já geradas continuam (retorna a regra ou None)"""
+        return self.recorrentes.remover(regra_id)
+    
+    def definir_orcamento(self, categoria, limite):
+        """Limite mensal de gastos da categoria (None = orçamento geral); limite vazio/0 remove"""
+        self.orcamentos.definir(categoria, limite)
+    
+    def situacao_orcamentos(self, mes=None, ano=None):
+        """Gasto de cada orçamento no mês: [{categoria, limite, gasto, percentual}] (geral por último)"""
+        if mes is None:
+            mes = datetime.now().month
+        if ano is None:
+            ano = datetime.now().year
+        resumo = self.resumo_do_mes(mes, ano)
+        situacao = [(categoria, limite, resumo.get(('despesa', categoria), 0.0))
+                    for categoria, limite in self.orcamentos.limites.items()]
+        if self.orcamentos.geral:
+            situacao.append((None, self.orcamentos.geral, self._despesas_mes.get((ano, mes), 0.0)))
+        return [{'categoria': categoria, 'limite': limite, 'gasto': gasto, 'percentual': gasto / limite * 100}
+                for categoria, limite, gasto in situacao]
+    
+    def historico_alertas(self, ano=None, mes=None, categoria=None, limite=None):
+        """Alertas de orçamento já disparados, do mais recente para o mais antigo"""
+        return self.orcamentos.historico(ano, mes, categoria, limite)
+    
+    def materializar_recorrentes(self, ate=None):
+        """Gera as ocorrências recorrentes vencidas até `ate` (no máximo hoje); retorna as novas
+        
+        Sem nada pendente custa uma comparação. Senão, todas as ocorrências vão numa
+        única gravação e o cursor de cada regra avança; se uma gravação anterior caiu
+        entre as transações e o cursor, as que já existem no dia não são repetidas.
+        """
+        hoje = date.today()
+        limite = min(ate, hoje) if ate else hoje
+        if not self.recorrentes.pendente(limite):
+            return []
+        
+        with self._trava, self.recorrentes.materializar(limite) as ocorrencias:
+            chave = lambda t: (t['data'], t['tipo'], t['categoria'], t['descricao'], round(t['valor'], 2))
+            existentes = Counter()
+            for ano, mes in {self._mes_da_data(t['data']) for t in ocorrencias}:
+                existentes.update(map(chave, self.transacoes_do_mes(mes, ano)))
+            novas = []
+            for transacao in ocorrencias:
+                if existentes[chave(transacao)] > 0:
+                    existentes[chave(transacao)] -= 1
+                else:
+                    novas.append(transacao)
+            novas = self.adicionar_em_lote(novas)
+            # O cursor só avança depois que as transações estão no disco (mesmo com write-behind)
+            self.flush()
+        return novas
+    
+    def consultar_mes(self, mes=None, ano=None):
+        """Transações do mês ordenadas por data (sem imprimir nada)"""
         if mes is None:
             mes = datetime.now().month
         if ano is None:
             ano = datetime.now().year
         
+        self.materializar_recorrentes(self._fim_do_mes(mes, ano))
+        ordinal = self._ordinal
+        filtradas = sorted(self.transacoes_do_mes(mes, ano), key=lambda x: ordinal[x['id']])
+        return {'mes': mes, 'ano': ano, 'transacoes': filtradas}
+    
+    def listar_transacoes(self, mes=None, ano=None):
+        """Lista transações filtradas por mês/ano"""
         try:
-            filtradas = [t for t in self.transacoes 
-                         if datetime.strptime(t['data'], '%Y-%m-%d').month == mes
-                         and datetime.strptime(t['data'], '%Y-%m-%d').year == ano]
+            resultado = self.consultar_mes(mes, ano)
         except (ValueError, KeyError) as e:
             print(f"❌ Erro ao filtrar transações: {e}")
             return []
         
-        if not filtradas:
-            print(f"\n📭 Nenhuma transação encontrada para {mes:02d}/{ano}")
-            return []
-        
-        print(f"\n📊 Transações de {mes:02d}/{ano}:")
-        print("-" * 90)
-        print(f"{'Data':<12} {'Tipo':<10} {'Categoria':<18} {'Valor':>12} {'Descrição':<30}")
-        print("-" * 90)
-        
-        for t in sorted(filtradas, key=lambda x: x['data']):
-            simbolo = "➕ Receita" if t['tipo'] == 'receita' else "➖ Despesa"
-            valor_fmt = f"R$ {t['valor']:>8.2f}"
-            desc = t['descricao'][:27] + '...' if len(t['descricao']) > 30 else t['descricao']
-            # Converter data de YYYY-MM-DD para DD/MM/YYYY
-            data_formatada = datetime.strptime(t['data'], '%Y-%m-%d').strftime('%d/%m/%Y')
-            print(f"{data_formatada:<12} {simbolo:<10} {t['categoria']:<18} {valor_fmt:>12} {desc:<30}")
-        
-        print("-" * 90)
-        return filtradas
+        exibir_transacoes(resultado)
+        return resultado['transacoes']
     
-    def analisar_gastos(self, mes=None, ano=None):
-        """Módulo Analytics - Detecta padrões e consumo excessivo"""
+    def calcular_analise(self, mes=None, ano=None):
+        """Números do módulo Analytics para o mês, sem imprimir nada
+        
+        Retorna None se o mês não tem transações.
+        """
         if mes is None:
             mes = datetime.now().month
         if ano is None:
             ano = datetime.now().year
         
-        transacoes_mes = [t for t in self.transacoes 
-                          if datetime.strptime(t['data'], '%Y-%m-%d').month == mes
-                          and datetime.strptime(t['data'], '%Y-%m-%d').year == ano]
-        
-        if not transacoes_mes:
-            print(f"\n📭 Nenhuma transação para analisar em {mes:02d}/{ano}")
+        self.materializar_recorrentes(self._fim_do_mes(mes, ano))
+        totais = self._totais_do_mes(mes, ano)
+        if not totais:
             return None
         
-        receitas = sum(t['valor'] for t in transacoes_mes if t['tipo'] == 'receita')
-        despesas = sum(t['valor'] for t in transacoes_mes if t['tipo'] == 'despesa')
+        receitas, despesas, gastos_categoria = totais
         saldo = receitas - despesas
         
-        gastos_categoria = defaultdict(float)
-        for t in transacoes_mes:
-            if t['tipo'] == 'despesa':
-                gastos_categoria[t['categoria']] += t['valor']
-        
-        print(f"\n{'='*90}")
-        print(f"💰 ANÁLISE FINANCEIRA - {mes:02d}/{ano}".center(90))
-        print(f"{'='*90}")
-        print(f"\n{'Receitas:':<20} R$ {receitas:>12,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        print(f"{'Despesas:':<20} R$ {despesas:>12,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        print(f"{'-'*90}")
-        
-        saldo_fmt = f"R$ {abs(saldo):>12,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-        if saldo >= 0:
-            print(f"{'Saldo Positivo:':<20} {saldo_fmt} ✅")
-        else:
-            print(f"{'Saldo Negativo:':<20} {saldo_fmt} ⚠️")
-        
+        categorias_ordenadas = []
+        maior_categoria = None
         if despesas > 0:
-            print(f"\n📈 Distribuição de Gastos por Categoria:")
-            print("-" * 90)
-            categorias_ordenadas = sorted(gastos_categoria.items(), key=lambda x: x[1], reverse=True)
-            
-            for cat, valor in categorias_ordenadas:
-                percentual = (valor / despesas) * 100
-                barra = '█' * int(percentual / 2)
-                valor_fmt = f"R$ {valor:>8,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-                print(f"  {cat:<18} {valor_fmt:>15} ({percentual:5.1f}%) {barra}")
-            
-            cat_maior = categorias_ordenadas[0]
-            print(f"\n🔍 INSIGHT: Maior gasto em '{cat_maior[0]}' - R$ {cat_maior[1]:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-            
-            if cat_maior[1] / despesas > 0.4:
-                print(f"⚠️  ALERTA: '{cat_maior[0]}' representa {(cat_maior[1]/despesas*100):.1f}% dos gastos!")
-            
-            if receitas > 0:
-                taxa_economia = (saldo / receitas) * 100
-                print(f"\n💹 Taxa de Economia: {taxa_economia:.1f}%", end='')
-                if taxa_economia < 0:
-                    print(" 🔴 (Gastando mais que ganha)")
-                elif taxa_economia < 10:
-                    print(" 🟡 (Baixa)")
-                elif taxa_economia < 20:
-                    print(" 🟢 (Boa)")
-                else:
-                    print(" 🟢🟢 (Excelente!)")
+            categorias_ordenadas = [(cat, valor, (valor / despesas) * 100)
+                                    for cat, valor in sorted(gastos_categoria.items(), key=lambda x: x[1], reverse=True)]
+            maior_categoria = categorias_ordenadas[0][:2]
+        
+        taxa_economia = None
+        classificacao_economia = None
+        if receitas > 0:
+            taxa_economia = (saldo / receitas) * 100
+            if taxa_economia < 0:
+                classificacao_economia = "🔴 (Gastando mais que ganha)"
+            elif taxa_economia < 10:
+                classificacao_economia = "🟡 (Baixa)"
+            elif taxa_economia < 20:
+                classificacao_economia = "🟢 (Boa)"
+            else:
+                classificacao_economia = "🟢🟢 (Excelente!)"
         
         return {
+            'mes': mes,
+            'ano': ano,
             'receitas': receitas,
             'despesas': despesas,
             'saldo': saldo,
-            'gastos_categoria': dict(gastos_categoria)
+            'gastos_categoria': gastos_categoria,
+            'categorias_ordenadas': categorias_ordenadas,
+            'maior_categoria': maior_categoria,
+            'alerta_concentracao': maior_categoria is not None and maior_categoria[1] / despesas > 0.4,
+            'taxa_economia': taxa_economia,
+            'classificacao_economia': classificacao_economia,
+            'uso_orcamento': (despesas / receitas) * 100 if receitas > 0 else None,
         }
     
-    def prever_proximo_mes(self):
-        """Módulo Preditivo - Estima balanço futuro baseado em histórico"""
-        hoje = datetime.now()
-        historico = []
-        
-        for i in range(1, 4):
-            data_ref = hoje - timedelta(days=30*i)
-            trans = [t for t in self.transacoes 
-                    if datetime.strptime(t['data'], '%Y-%m-%d').month == data_ref.month
-                    and datetime.strptime(t['data'], '%Y-%m-%d').year == data_ref.year]
-            
-            if trans:
-                receitas = sum(t['valor'] for t in trans if t['tipo'] == 'receita')
-                despesas = sum(t['valor'] for t in trans if t['tipo'] == 'despesa')
-                historico.append({'receitas': receitas, 'despesas': despesas, 'mes': data_ref.strftime('%m/%Y')})
-        
-        if len(historico) < 2:
-            print(f"\n{'='*90}")
-            print("🔮 PREVISÃO PARA O PRÓXIMO MÊS".center(90))
-            print(f"{'='*90}")
-            print("\n⚠️  Dados insuficientes para fazer previsão precisa.")
-            print("💡 Dica: Registre transações por pelo menos 2 meses para ativar este recurso.")
-            return None
-        
-        media_receitas = statistics.mean([h['receitas'] for h in historico])
-        media_despesas = statistics.mean([h['despesas'] for h in historico])
-        saldo_previsto = media_receitas - media_despesas
-        
-        desvio_receitas = statistics.stdev([h['receitas'] for h in historico]) if len(historico) > 1 else 0
-        desvio_despesas = statistics.stdev([h['despesas'] for h in historico]) if len(historico) > 1 else 0
+    def analisar_gastos(self, mes=None, ano=None):
+        """Módulo Analytics - Detecta padrões e consumo excessivo"""
+        if mes is None:
+            mes = datetime.now().month
+        if ano is None:
+            ano = datetime.now().year
         
-        proximo_mes = (hoje.month % 12) + 1
-        proximo_ano = hoje.year if hoje.month < 12 else hoje.year + 1
+        analise = self.calcular_analise(mes, ano)
+        exibir_analise(analise, mes, ano)
+        return analise
+    
+    def calcular_previsao(self, meses_historico=3, horizonte=1, modelo='media_movel'):
+        """Números do módulo Preditivo, sem imprimir nada
+        
+        Retorna None se houver menos de 2 meses de histórico.
+        """
+        self.materializar_recorrentes()
+        motor = MotorPrevisao(self, meses_historico=meses_historico, modelo=modelo)
+        previsao = motor.prever(horizonte)
+        if not previsao:
+            return None
         
-        print(f"\n{'='*90}")
-        print(f"🔮 PREVISÃO PARA {proximo_mes:02d}/{proximo_ano}".center(90))
-        print(f"{'='*90}")
-        print(f"\n📊 Baseado em {len(historico)} meses de histórico: {', '.join([h['mes'] for h in historico])}")
-        print(f"\n{'Receita esperada:':<25} R$ {media_receitas:>12,.2f} (±{desvio_receitas:,.2f})".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        print(f"{'Despesa esperada:':<25} R$ {media_despesas:>12,.2f} (±{desvio_despesas:,.2f})".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        print(f"{'-'*90}")
-        
-        if saldo_previsto >= 0:
-            print(f"{'Saldo previsto:':<25} R$ {saldo_previsto:>12,.2f} ✅".replace(',', 'X').replace('.', ',').replace('X', '.'))
-            print(f"\n🎉 Parabéns! Você deve terminar o mês com saldo positivo!")
-        else:
-            print(f"{'Déficit previsto:':<25} R$ {abs(saldo_previsto):>12,.2f} ⚠️".replace(',', 'X').replace('.', ',').replace('X', '.'))
-            print(f"\n⚠️  ALERTA: Possível déficit de R$ {abs(saldo_previsto):,.2f}!".replace(',', 'X').replace('.', ',').replace('X', '.'))
-            print(f"💡 Sugestão: Reduza gastos ou busque receita extra de R$ {abs(saldo_previsto):,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+        meses = []
+        for (ano, mes), receita, despesa, saldo, receita_recorrente, despesa_recorrente in zip(
+                previsao['meses_previstos'], previsao['receitas'], previsao['despesas'], previsao['saldos'],
+                previsao['recorrentes_receitas'], previsao['recorrentes_despesas']):
+            meses.append({'mes': f"{mes:02d}/{ano}", 'receita': receita, 'despesa': despesa, 'saldo': saldo,
+                          'receita_recorrente': receita_recorrente, 'despesa_recorrente': despesa_recorrente})
         
         return {
-            'receita_prevista': media_receitas,
-            'despesa_prevista': media_despesas,
-            'saldo_previsto': saldo_previsto
+            'receita_prevista': previsao['receitas'][0],
+            'despesa_prevista': previsao['despesas'][0],
+            'saldo_previsto': previsao['saldos'][0],
+            'desvio_receitas': previsao['desvio_receitas'],
+            'desvio_despesas': previsao['desvio_despesas'],
+            'historico': [f"{m:02d}/{a}" for a, m in previsao['meses_historico']],
+            'modelo': modelo,
+            'nome_modelo': MODELOS[modelo],
+            'meses': meses,
+            'categorias': previsao['categorias']
         }
     
-    def gerar_recomendacoes(self):
-        """Módulo Recomendador - Gera insights e estratégias personalizadas"""
-        analise = self.analisar_gastos()
+    def prever_proximo_mes(self, meses_historico=3, horizonte=1, modelo='media_movel'):
+        """Módulo Preditivo - Estima balanço futuro baseado em histórico
+        
+        Por padrão usa a média dos últimos 3 meses completos; `horizonte` (1-12)
+        prevê vários meses e `modelo` escolhe entre os modelos de fintrack_previsao.
+        """
+        previsao = self.calcular_previsao(meses_historico, horizonte, modelo)
+        exibir_previsao(previsao)
+        return previsao
+    
+    def calcular_recomendacoes(self, analise=None):
+        """Módulo Recomendador sem impressão: lista de {prioridade, titulo, acao}
         
+        Usa a análise do mês atual se `analise` não for informada.
+        """
+        if analise is None:
+            analise = self.calcular_analise()
         if not analise:
-            return
-        
-        print(f"\n{'='*90}")
-        print("💡 RECOMENDAÇÕES INTELIGENTES".center(90))
-        print(f"{'='*90}\n")
+            return []
         
         recomendacoes = []
         
@@ -317,19 +891,19 @@ class FinTrack:  # Aplicativo funcional feito para portifólio (propriedade auto
                 recomendacoes.append({
                     'prioridade': '🔴 CRÍTICO',
                     'titulo': 'Você está gastando mais do que ganha!',
-                    'acao': f'Corte imediatamente R$ {abs(analise['saldo']):,.2f} em despesas'.replace(',', 'X').replace('.', ',').replace('X', '.')
+                    'acao': f"Corte imediatamente {formatar_brl(abs(analise['saldo']))} em despesas"
                 })
             elif taxa_economia < 10:
                 recomendacoes.append({
                     'prioridade': '🟡 ATENÇÃO',
                     'titulo': f'Taxa de economia baixa ({taxa_economia:.1f}%)',
-                    'acao': f'Meta ideal: economizar 20% da receita (R$ {analise["receitas"]*0.20:,.2f})'.replace(',', 'X').replace('.', ',').replace('X', '.')
+                    'acao': f"Meta ideal: economizar 20% da receita ({formatar_brl(analise['receitas'] * 0.20)})"
                 })
             elif taxa_economia >= 20:
                 recomendacoes.append({
                     'prioridade': '🟢 PARABÉNS',
                     'titulo': f'Excelente taxa de economia ({taxa_economia:.1f}%)!',
-                    'acao': f'Considere investir os R$ {analise["saldo"]:,.2f} economizados'.replace(',', 'X').replace('.', ',').replace('X', '.')
+                    'acao': f"Considere investir os {formatar_brl(analise['saldo'])} economizados"
                 })
         
         # Recomendação 2: Categoria problemática
@@ -342,7 +916,7 @@ class FinTrack:  # Aplicativo funcional feito para portifólio (propriedade auto
                 recomendacoes.append({
                     'prioridade': '🟡 OPORTUNIDADE',
                     'titulo': f'{cat_maior[0]} representa {percentual_cat:.1f}% dos gastos',
-                    'acao': f'Tente reduzir 15% = economia de R$ {reducao_sugerida:,.2f}/mês'.replace(',', 'X').replace('.', ',').replace('X', '.')
+                    'acao': f"Tente reduzir 15% = economia de {formatar_brl(reducao_sugerida)}/mês"
                 })
         
         # Recomendação 3: Meta de economia
@@ -354,27 +928,41 @@ class FinTrack:  # Aplicativo funcional feito para portifólio (propriedade auto
                 recomendacoes.append({
                     'prioridade': '🎯 META',
                     'titulo': 'Estabeleça um teto de gastos',
-                    'acao': f'Gasto máximo ideal: R$ {gasto_maximo:,.2f} (está em R$ {analise["despesas"]:,.2f})'.replace(',', 'X').replace('.', ',').replace('X', '.')
+                    'acao': f"Gasto máximo ideal: {formatar_brl(gasto_maximo)} (está em {formatar_brl(analise['despesas'])})"
                 })
         
-        # Exibir recomendações
-        for i, rec in enumerate(recomendacoes, 1):
-            print(f"{i}. {rec['prioridade']} | {rec['titulo']}")
-            print(f"   → {rec['acao']}\n")
+        # Recomendação 4: Orçamentos estourados no mês analisado
+        for item in self.situacao_orcamentos(analise['mes'], analise['ano']):
+            if item['percentual'] >= 100:
+                recomendacoes.append({
+                    'prioridade': '🔴 ORÇAMENTO',
+                    'titulo': f"Orçamento {item['categoria'] or 'geral'} estourado ({item['percentual']:.0f}%)",
+                    'acao': f"Excesso de {formatar_brl(item['gasto'] - item['limite'])} sobre o limite de {formatar_brl(item['limite'])}"
+                })
+        
+        return recomendacoes
+    
+    def gerar_recomendacoes(self):
+        """Módulo Recomendador - Gera insights e estratégias personalizadas"""
+        analise = self.analisar_gastos()
+        
+        if not analise:
+            return []
         
-        if not recomendacoes:
-            print("✅ Suas finanças estão equilibradas! Continue assim! 🎉\n")
+        recomendacoes = self.calcular_recomendacoes(analise)
+        exibir_recomendacoes(recomendacoes)
+        return recomendacoes
     
     def deletar_transacao(self, transacao_id):
         """Deleta uma transação pelo ID"""
-        transacao = next((t for t in self.transacoes if t['id'] == transacao_id), None)
+        transacao = self.obter_transacao(transacao_id)
         
         if not transacao:
             print(f"❌ Transação #{transacao_id} não encontrada")
             return False
         
         # Mostra detalhes da transação
-        data_formatada = datetime.strptime(transacao['data'], '%Y-%m-%d').strftime('%d/%m/%Y')
+        data_formatada = formatar_data(transacao['data'])
         print(f"\n🗑️  Transação a ser deletada:")
         print(f"   ID: {transacao['id']}")
         print(f"   Tipo: {transacao['tipo'].upper()}")
@@ -386,8 +974,11 @@ class FinTrack:  # Aplicativo funcional feito para portifólio (propriedade auto
         confirma = input("\n⚠️  Tem certeza que deseja deletar? (S/n): ").strip().lower()
         
         if confirma == 's':
-            self.transacoes.remove(transacao)
-            self.salvar_dados()
+            try:
+                self.remover_transacao(transacao_id, versao_esperada=transacao['versao'])
+            except ConflitoDeVersao as e:
+                print(f"❌ {e} - exclusão cancelada")
+                return False
             print("✅ Transação deletada com sucesso!")
             return True
         else:
@@ -396,14 +987,14 @@ class FinTrack:  # Aplicativo funcional feito para portifólio (propriedade auto
     
     def editar_transacao(self, transacao_id):
         """Edita uma transação existente"""
-        transacao = next((t for t in self.transacoes if t['id'] == transacao_id), None)
+        transacao = self.obter_transacao(transacao_id)
         
         if not transacao:
             print(f"❌ Transação #{transacao_id} não encontrada")
             return False
         
         # Mostra detalhes atuais
-        data_formatada = datetime.strptime(transacao['data'], '%Y-%m-%d').strftime('%d/%m/%Y')
+        data_formatada = formatar_data(transacao['data'])
         print(f"\n✏️  Editando transação #{transacao_id}")
         print("="*90)
         print(f"Tipo: {transacao['tipo'].upper()}")
@@ -414,11 +1005,14 @@ class FinTrack:  # Aplicativo funcional feito para portifólio (propriedade auto
         print("\n💡 Pressione ENTER para manter o valor atual")
         print("-"*90)
         
+        # As mudanças são juntadas aqui e gravadas de uma vez, conferindo a versão lida
+        versao_lida = transacao['versao']
+        campos = {}
         try:
             # Editar valor
             novo_valor = input(f"\n💵 Novo valor (atual: R$ {transacao['valor']:.2f}): ").strip()
             if novo_valor:
-                transacao['valor'] = self.validar_valor(novo_valor)
+                campos['valor'] = self.validar_valor(novo_valor)
             
             # Editar categoria
             nova_categoria = input(f"📁 Nova categoria (atual: {transacao['categoria']}): ").strip()
@@ -428,14 +1022,14 @@ class FinTrack:  # Aplicativo funcional feito para portifólio (propriedade auto
                     print(aviso)
                     confirma = input("   Deseja continuar? (S/n): ").strip().lower()
                     if confirma != 'n':
-                        transacao['categoria'] = categoria_validada
+                        campos['categoria'] = categoria_validada
                 else:
-                    transacao['categoria'] = categoria_validada
+                    campos['categoria'] = categoria_validada
             
             # Editar descrição
             nova_descricao = input(f"📝 Nova descrição (atual: {transacao['descricao']}): ").strip()
             if nova_descricao:
-                transacao['descricao'] = nova_descricao
+                campos['descricao'] = nova_descricao
             
             # Editar data
             nova_data = input(f"📅 Nova data (atual: {data_formatada}, formato: DD/MM/AAAA): ").strip()
@@ -444,10 +1038,10 @@ class FinTrack:  # Aplicativo funcional feito para portifólio (propriedade auto
                 if erro_data:
                     print(f"❌ {erro_data} - Mantendo data original")
                 else:
-                    transacao['data'] = data_validada
+                    campos['data'] = data_validada
             
-            self.salvar_dados()
-            data_final = datetime.strptime(transacao['data'], '%Y-%m-%d').strftime('%d/%m/%Y')
+            transacao = self.atualizar_transacao(transacao_id, campos, versao_esperada=versao_lida)
+            data_final = formatar_data(transacao['data'])
             print("\n✅ Transação editada com sucesso!")
             print(f"   Valor: R$ {transacao['valor']:.2f}")
             print(f"   Categoria: {transacao['categoria']}")
@@ -462,79 +1056,161 @@ class FinTrack:  # Aplicativo funcional feito para portifólio (propriedade auto
     
     def listar_transacoes_para_gerenciar(self, mes=None, ano=None):
         """Lista transações com IDs para facilitar gerenciamento"""
-        if mes is None:
-            mes = datetime.now().month
-        if ano is None:
-            ano = datetime.now().year
-        
         try:
-            filtradas = [t for t in self.transacoes 
-                         if datetime.strptime(t['data'], '%Y-%m-%d').month == mes
-                         and datetime.strptime(t['data'], '%Y-%m-%d').year == ano]
+            resultado = self.consultar_mes(mes, ano)
         except (ValueError, KeyError) as e:
             print(f"❌ Erro ao filtrar transações: {e}")
             return []
         
-        if not filtradas:
-            print(f"\n📭 Nenhuma transação encontrada para {mes:02d}/{ano}")
-            return []
-        
-        print(f"\n📋 Transações de {mes:02d}/{ano}:")
-        print("="*90)
-        print(f"{'ID':<5} {'Data':<12} {'Tipo':<10} {'Categoria':<18} {'Valor':>12} {'Descrição':<25}")
-        print("-"*90)
-        
-        for t in sorted(filtradas, key=lambda x: x['data']):
-            simbolo = "Receita" if t['tipo'] == 'receita' else "Despesa"
-            valor_fmt = f"R$ {t['valor']:>8.2f}"
-            desc = t['descricao'][:22] + '...' if len(t['descricao']) > 25 else t['descricao']
-            # Converter data de YYYY-MM-DD para DD/MM/YYYY
-            data_formatada = datetime.strptime(t['data'], '%Y-%m-%d').strftime('%d/%m/%Y')
-            print(f"{t['id']:<5} {data_formatada:<12} {simbolo:<10} {t['categoria']:<18} {valor_fmt:>12} {desc:<25}")
-        
-        print("="*90)
-        return filtradas
+        exibir_transacoes_gerenciar(resultado)
+        return resultado['transacoes']
+    
+    def consultar_transacoes(self, inicio=0, limite=50, ordenar_por='data', decrescente=True,
+                             tipo=None, categoria=None, data_inicial=None, data_final=None,
+                             valor_min=None, valor_max=None):
+        """Consulta paginada com filtros; retorna (transações da página, total filtrado)
+        
+        Datas no formato 'AAAA-MM-DD' (limites inclusivos). Ordenando por data sem
+        filtro de valor, os meses são percorridos em ordem e só os que caem na
+        página são lidos (o total vem dos resumos mensais). Nos outros casos só os
+        meses do intervalo são percorridos, e só as `inicio + limite` primeiras
+        linhas da ordenação são selecionadas (heap), sem ordenar o resultado
+        inteiro. Datas são comparadas e ordenadas pelo ordinal já calculado de
+        cada transação.
+        """
+        if ordenar_por not in ('data', 'valor', 'id', 'categoria', 'tipo'):
+            raise ValueError(f"Campo de ordenação inválido: {ordenar_por}")
+        
+        self.materializar_recorrentes(date.fromisoformat(data_final) if data_final else None)
+        if ordenar_por == 'data' and valor_min is None and valor_max is None:
+            return self._pagina_por_data(inicio, limite, decrescente, tipo, categoria, data_inicial, data_final)
+        if data_inicial or data_final:
+            chave_ini = self._mes_da_data(data_inicial) if data_inicial else (0, 0)
+            chave_fim = self._mes_da_data(data_final) if data_final else (9999, 12)
+            self._carregar_anos([ano for ano in self._anos_pendentes if chave_ini[0] <= ano <= chave_fim[0]])
+            candidatas = (t for chave, balde in self._indice_mes.items()
+                          if chave_ini <= chave <= chave_fim
+                          for t in balde.values())
+        else:
+            self._carregar_tudo()
+            candidatas = self._por_id.values()
+        
+        categoria = categoria.lower() if categoria else None
+        ordinal = self._ordinal
+        ordinal_ini = ordinal_da_data(data_inicial) if data_inicial else None
+        ordinal_fim = ordinal_da_data(data_final) if data_final else None
+        filtradas = [t for t in candidatas
+                     if (tipo is None or t['tipo'] == tipo)
+                     and (categoria is None or t['categoria'].lower() == categoria)
+                     and (ordinal_ini is None or ordinal[t['id']] >= ordinal_ini)
+                     and (ordinal_fim is None or ordinal[t['id']] <= ordinal_fim)
+                     and (valor_min is None or t['valor'] >= valor_min)
+                     and (valor_max is None or t['valor'] <= valor_max)]
+        
+        if ordenar_por == 'data':
+            chave = lambda t: (ordinal[t['id']], t['id'])
+        else:
+            chave = lambda t: (t[ordenar_por], t['id'])
+        selecionar = heapq.nlargest if decrescente else heapq.nsmallest
+        pagina = selecionar(inicio + limite, filtradas, key=chave)[inicio:]
+        return pagina, len(filtradas)
+    
+    def _pagina_por_data(self, inicio, limite, decrescente, tipo, categoria, data_inicial, data_final):
+        """Página da consulta ordenada por data, mês a mês pelo índice (ano, mes)
+        
+        Meses inteiros no intervalo são contados pelo resumo mensal, sem ler as
+        transações (nem carregar o ano, nos modos com carga sob demanda); só os meses da
+        página e os cortados pelas datas limite são filtrados e ordenados.
+        """
+        categoria = categoria.lower() if categoria else None
+        ordinal = self._ordinal
+        ordinal_ini = ordinal_da_data(data_inicial) if data_inicial else None
+        ordinal_fim = ordinal_da_data(data_final) if data_final else None
+        chave_ini = self._mes_da_data(data_inicial) if data_inicial else None
+        chave_fim = self._mes_da_data(data_final) if data_final else None
+        meses = sorted((chave for chave in self._resumo_mes
+                        if (chave_ini is None or chave >= chave_ini) and (chave_fim is None or chave <= chave_fim)),
+                       reverse=decrescente)
+        
+        def filtrar(chave):
+            self._carregar_anos([chave[0]])
+            return [t for t in self._indice_mes.get(chave, {}).values()
+                    if (tipo is None or t['tipo'] == tipo)
+                    and (categoria is None or t['categoria'].lower() == categoria)
+                    and (ordinal_ini is None or ordinal[t['id']] >= ordinal_ini)
+                    and (ordinal_fim is None or ordinal[t['id']] <= ordinal_fim)]
+        
+        pagina, total, pular = [], 0, inicio
+        for chave in meses:
+            if chave in (chave_ini, chave_fim):
+                # Mês cortado por uma data limite: a contagem precisa olhar cada dia
+                linhas = filtrar(chave)
+                quantidade = len(linhas)
+            else:
+                linhas = None
+                quantidade = sum(qtd for (t, c), (_, qtd) in self._resumo_mes.get(chave, {}).items()
+                                 if (tipo is None or t == tipo) and (categoria is None or c.lower() == categoria))
+            total += quantidade
+            if len(pagina) >= limite or not quantidade:
+                continue
+            if pular >= quantidade:
+                pular -= quantidade
+                continue
+            if linhas is None:
+                linhas = filtrar(chave)
+            linhas.sort(key=lambda t: (ordinal[t['id']], t['id']), reverse=decrescente)
+            pagina.extend(linhas[pular:pular + limite - len(pagina)])
+            pular = 0
+        return pagina, total
+    
+    def buscar_transacoes(self, consulta, inicio=0, limite=50, tipo=None, data_inicial=None, data_final=None):
+        """Busca textual em descrição e categoria; retorna (transações da página, total encontrado)
+        
+        Sem acentos e sem diferença de maiúsculas; cada termo casa com as palavras
+        que começam com ele e todos os termos precisam aparecer ("merc ali" acha
+        "Mercado" em "Alimentação"). Resultados do mais recente para o mais antigo.
+        """
+        self.materializar_recorrentes(date.fromisoformat(data_final) if data_final else None)
+        with self._trava:
+            if self._busca is None:
+                self._busca = IndiceBusca(self)
+            # Sincroniza antes de olhar o índice por mês (a montagem carrega todos os anos)
+            self._busca.sincronizar()
+            permitidos = None
+            if data_inicial or data_final:
+                # Os meses do período vêm do índice por mês; a busca só filtra o dia exato
+                chave_ini = self._mes_da_data(data_inicial) if data_inicial else (0, 0)
+                chave_fim = self._mes_da_data(data_final) if data_final else (9999, 12)
+                permitidos = set()
+                for chave, balde in self._indice_mes.items():
+                    if chave_ini <= chave <= chave_fim:
+                        permitidos.update(balde)
+            ids, total = self._busca.buscar(consulta, inicio, limite, tipo, data_inicial, data_final, permitidos)
+            return [self._por_id[i] for i in ids], total
+    
+    def pesquisar(self, consulta):
+        """Busca textual com saída no terminal (até 50 resultados)"""
+        transacoes, total = self.buscar_transacoes(consulta)
+        exibir_busca(consulta, transacoes, total)
+        return transacoes
     
     def dashboard_simples(self):
         """Exibe um dashboard textual completo"""
         analise = self.analisar_gastos()
         
         if not analise:
-            return
-        
-        print(f"\n{'='*90}")
-        print("📊 DASHBOARD FINTRACK".center(90))
-        print(f"{'='*90}\n")
-        
-        # Barra de progresso do orçamento
-        if analise['receitas'] > 0:
-            uso_orcamento = min((analise['despesas'] / analise['receitas']) * 100, 100)
-            barra_cheia = int(uso_orcamento / 2)
-            barra_vazia = 50 - barra_cheia
-            
-            print(f"💳 Uso do Orçamento Mensal: {uso_orcamento:.1f}%")
-            print(f"[{'█'*barra_cheia}{'░'*barra_vazia}] {analise['despesas']:,.2f}/{analise['receitas']:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-            
-            if uso_orcamento <= 70:
-                print("✅ Uso saudável do orçamento")
-            elif uso_orcamento <= 90:
-                print("⚠️  Atenção: Orçamento em 90%")
-            elif uso_orcamento <= 100:
-                print("🔴 ALERTA: Orçamento quase esgotado!")
-            else:
-                print("🔴🔴 CRÍTICO: Você excedeu seu orçamento!")
-            
-            print()
+            return None
         
-        # Status geral
-        print("📈 Status Financeiro:")
-        if analise['saldo'] > 0:
-            print(f"   ✅ Saldo positivo de R$ {analise['saldo']:,.2f}".replace(','))
+        exibir_dashboard(analise)
+        return analise
 
 
 def limpar_tela():
-    """Limpa a tela do terminal"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    """Limpa a tela do terminal (sequência ANSI, sem abrir um shell a cada tela)"""
+    if os.name == 'nt':
+        os.system('cls')
+    elif sys.stdout.isatty():
+        print("\033[2J\033[H", end="", flush=True)
 
 
 def pausar():
@@ -607,12 +1283,21 @@ def obter_inteiro(mensagem, permitir_vazio=False, valor_min=None, valor_max=None
 def menu_principal():
     """Interface de menu do sistema com validações robustas"""
     sistema = FinTrack()
+    alertas_vistos = len(sistema.orcamentos.alertas)
     
     while True:
+        # Pega alterações feitas pela versão web (ou outro terminal) enquanto o menu esperava
+        sistema.recarregar_se_alterado()
         limpar_tela()
         print(f"\n{'='*90}")
         print("💰 FINTRACK - Sistema Inteligente de Controle Financeiro".center(90))
         print(f"{'='*90}\n")
+        # Alertas de orçamento disparados desde a última tela (por esta sessão ou por outra)
+        total_alertas = len(sistema.orcamentos.alertas)
+        if total_alertas > alertas_vistos:
+            exibir_alertas(reversed(sistema.historico_alertas(limite=total_alertas - alertas_vistos)))
+            print()
+        alertas_vistos = total_alertas
         print("1. ➕ Adicionar Receita")
         print("2. ➖ Adicionar Despesa")
         print("3. 📋 Listar Transações")
@@ -622,6 +1307,10 @@ def menu_principal():
         print("7. 📈 Dashboard Completo")
         print("8. ✏️  Editar Transação")
         print("9. 🗑️  Deletar Transação")
+        print("10. 📥 Importar Extrato (CSV/OFX)")
+        print("11. 🔍 Buscar Transações")
+        print("12. 🔁 Transações Recorrentes")
+        print("13. 💰 Orçamentos e Alertas")
         print("0. 🚪 Sair")
         print(f"\n{'='*90}")
         
@@ -631,12 +1320,17 @@ def menu_principal():
             limpar_tela()
             print("\n➕ ADICIONAR RECEITA")
             print("="*90)
-            print(f"Categorias disponíveis: {', '.join(sistema.categorias_padrao['receita'])}")
+            print(f"Categorias disponíveis: {', '.join(sistema.categorias('receita'))}")
             print("-"*90)
             
             try:
                 valor = obter_numero("💵 Valor: R$ ", valor_min=0, valor_max=1000000000)
-                categoria = input("📁 Categoria: ").strip()
+                categoria = input("📁 Categoria (ENTER para sugerir pela descrição): ").strip()
+                descricao = None
+                if not categoria:
+                    descricao = input("📝 Descrição: ").strip()
+                    categoria = sistema.sugerir_categoria(descricao, 'receita') or 'Outros'
+                    print(f"🏷️  Categoria sugerida: {categoria}")
                 
                 categoria_validada, aviso = sistema.validar_categoria(categoria, 'receita')
                 if aviso:
@@ -647,7 +1341,8 @@ def menu_principal():
                         pausar()
                         continue
                 
-                descricao = input("📝 Descrição (opcional): ").strip()
+                if descricao is None:
+                    descricao = input("📝 Descrição (opcional): ").strip()
                 
                 data_input = input("📅 Data (DD/MM/AAAA ou ENTER para hoje): ").strip()
                 data_validada, erro_data = sistema.validar_data(data_input)
@@ -670,12 +1365,17 @@ def menu_principal():
             limpar_tela()
             print("\n➖ ADICIONAR DESPESA")
             print("="*90)
-            print(f"Categorias disponíveis: {', '.join(sistema.categorias_padrao['despesa'])}")
+            print(f"Categorias disponíveis: {', '.join(sistema.categorias('despesa'))}")
             print("-"*90)
             
             try:
                 valor = obter_numero("💵 Valor: R$ ", valor_min=0, valor_max=1000000000)
-                categoria = input("📁 Categoria: ").strip()
+                categoria = input("📁 Categoria (ENTER para sugerir pela descrição): ").strip()
+                descricao = None
+                if not categoria:
+                    descricao = input("📝 Descrição: ").strip()
+                    categoria = sistema.sugerir_categoria(descricao, 'despesa') or 'Outros'
+                    print(f"🏷️  Categoria sugerida: {categoria}")
                 
                 categoria_validada, aviso = sistema.validar_categoria(categoria, 'despesa')
                 if aviso:
@@ -686,7 +1386,8 @@ def menu_principal():
                         pausar()
                         continue
                 
-                descricao = input("📝 Descrição (opcional): ").strip()
+                if descricao is None:
+                    descricao = input("📝 Descrição (opcional): ").strip()
                 
                 data_input = input("📅 Data (DD/MM/AAAA ou ENTER para hoje): ").strip()
                 data_validada, erro_data = sistema.validar_data(data_input)
@@ -766,6 +1467,106 @@ def menu_principal():
             
             pausar()
         
+        elif opcao == '10':
+            limpar_tela()
+            print("\n📥 IMPORTAR EXTRATO")
+            print("="*90)
+            caminho = input("📄 Caminho do arquivo (.csv ou .ofx): ").strip().strip('"')
+            
+            try:
+                with open(caminho, 'rb') as f:
+                    relatorio = importar_extrato(sistema, f, caminho)
+                imprimir_relatorio(relatorio)
+            except (IOError, ValueError) as e:
+                print(f"❌ Erro ao importar: {e}")
+            
+            pausar()
+        
+        elif opcao == '11':
+            limpar_tela()
+            print("\n🔍 BUSCAR TRANSAÇÕES")
+            print("="*90)
+            consulta = input("🔎 Palavras da descrição ou categoria: ").strip()
+            if consulta:
+                sistema.pesquisar(consulta)
+            pausar()
+        
+        elif opcao == '12':
+            limpar_tela()
+            print("\n🔁 TRANSAÇÕES RECORRENTES")
+            print("="*90)
+            exibir_recorrentes(sistema.listar_recorrentes(), FREQUENCIAS)
+            print("\n1. ➕ Nova regra   2. 🗑️  Remover regra   0. Voltar")
+            escolha = input("👉 Escolha: ").strip()
+            
+            try:
+                if escolha == '1':
+                    tipo = 'receita' if input("💱 Receita ou despesa? (r/D): ").strip().lower() == 'r' else 'despesa'
+                    valor = obter_numero("💵 Valor: R$ ", valor_min=0, valor_max=1000000000)
+                    print(f"Categorias disponíveis: {', '.join(sistema.categorias(tipo))}")
+                    categoria, aviso = sistema.validar_categoria(input("📁 Categoria: "), tipo)
+                    if categoria is None:
+                        print(f"❌ {aviso}")
+                        pausar()
+                        continue
+                    if aviso:
+                        print(aviso)
+                    descricao = input("📝 Descrição: ").strip()
+                    frequencia = {'2': 'semanal', '3': 'dias'}.get(
+                        input("🔁 Frequência (1. Mensal  2. Semanal  3. A cada N dias) [1]: ").strip(), 'mensal')
+                    intervalo = obter_inteiro("🔢 Repetir a cada quantos períodos? (ENTER para 1): ",
+                                              permitir_vazio=True, valor_min=1, valor_max=365) or 1
+                    inicio, erro = sistema.validar_data(input("📅 Primeira data (DD/MM/AAAA ou ENTER para hoje): ").strip())
+                    fim_input = input("📅 Última data (ENTER para sem fim): ").strip()
+                    fim, erro_fim = sistema.validar_data(fim_input) if fim_input else (None, None)
+                    if erro or erro_fim:
+                        print(f"❌ {erro or erro_fim}")
+                    else:
+                        regra = sistema.criar_recorrente(tipo, valor, categoria, descricao, frequencia,
+                                                         inicio, intervalo, fim)
+                        print(f"\n✅ Regra #{regra['id']} criada!")
+                elif escolha == '2':
+                    regra_id = obter_inteiro("🔢 ID da regra (0 para cancelar): ", valor_min=0)
+                    if regra_id > 0:
+                        if sistema.remover_recorrente(regra_id):
+                            print("✅ Regra removida (as transações já geradas foram mantidas)")
+                        else:
+                            print(f"❌ Regra #{regra_id} não encontrada")
+            except ValueError as e:
+                print(f"❌ {e}")
+            
+            pausar()
+        
+        elif opcao == '13':
+            limpar_tela()
+            hoje = datetime.now()
+            exibir_orcamentos(sistema.situacao_orcamentos(), hoje.month, hoje.year)
+            print("\n1. ✏️  Definir limite   2. 📜 Histórico de alertas   0. Voltar")
+            escolha = input("👉 Escolha: ").strip()
+            
+            if escolha == '1':
+                print(f"Categorias: {', '.join(sistema.categorias('despesa'))}")
+                categoria = input("📁 Categoria (ENTER para o orçamento geral): ").strip()
+                if categoria:
+                    categoria, aviso = sistema.validar_categoria(categoria, 'despesa')
+                    if aviso:
+                        print(aviso)
+                limite = obter_numero("💵 Limite mensal (ENTER ou 0 remove): R$ ", permitir_vazio=True,
+                                      valor_min=0, valor_max=1000000000)
+                try:
+                    sistema.definir_orcamento(categoria or None, limite)
+                    print("✅ Orçamento atualizado")
+                except (ValueError, IOError) as e:
+                    print(f"❌ {e}")
+            elif escolha == '2':
+                alertas = sistema.historico_alertas(limite=30)
+                if not alertas:
+                    print("\n📭 Nenhum alerta disparado")
+                for alerta in alertas:
+                    print(f"{alerta['data_hora'].replace('T', ' ')}  {texto_alerta(alerta)}")
+            
+            pausar()
+        
         elif opcao == '0':
             limpar_tela()
             print("\n" + "="*90)
@@ -775,13 +1576,26 @@ def menu_principal():
             break
         
         else:
-            print("\n❌ Opção inválida! Escolha um número de 0 a 9")
+            print("\n❌ Opção inválida! Escolha um número de 0 a 13")
             pausar()
 
 
 if __name__ == "__main__":
+    # FINTRACK_PERFIL=cprofile (grava fintrack_perfil.prof) ou tracemalloc (fintrack_perfil.txt)
+    perfil = os.environ.get('FINTRACK_PERFIL')
     try:
-        menu_principal()
+        if sys.argv[1:]:
+            # Subcomandos não interativos: python fintrack.py listar --json ...
+            from fintrack_cli import main
+            sys.exit(main())
+        if perfil:
+            destino = 'fintrack_perfil.prof' if perfil == 'cprofile' else 'fintrack_perfil.txt'
+            with capturar_perfil(perfil, destino) as relatorio:
+                menu_principal()
+            print(relatorio['texto'])
+            print(f"📈 Perfil gravado em {destino}")
+        else:
+            menu_principal()
     except KeyboardInterrupt:
         print("\n\n👋 Programa encerrado pelo usuário. Até logo!")
     except Exception as e:
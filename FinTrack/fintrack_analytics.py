@@ -0,0 +1,130 @@
+# Motor de analytics vetorizado do FinTrack (períodos arbitrários)
+# Requisitos: pandas, numpy
+# pip install pandas numpy
+
+import calendar
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from fintrack_datas import ORDINAL_EPOCA
+from fintrack_incremental import VisaoIncremental
+
+COLUNAS = ['id', 'data', 'tipo', 'categoria', 'valor', 'descricao']
+
+PERIODOS = {
+    'mes': "Mês atual",
+    'trimestre': "Trimestre atual",
+    'ano_ate_hoje': "Ano até hoje",
+    'ultimos_90_dias': "Últimos 90 dias",
+    'ano_anterior': "Ano anterior",
+}
+
+
+def intervalo_periodo(periodo, hoje=None):
+    """Converte um período nomeado em (data_inicial, data_final) inclusivos"""
+    hoje = hoje or date.today()
+    if periodo == 'mes':
+        ultimo = calendar.monthrange(hoje.year, hoje.month)[1]
+        return hoje.replace(day=1), hoje.replace(day=ultimo)
+    if periodo == 'trimestre':
+        mes_inicial = 3 * ((hoje.month - 1) // 3) + 1
+        ultimo = calendar.monthrange(hoje.year, mes_inicial + 2)[1]
+        return date(hoje.year, mes_inicial, 1), date(hoje.year, mes_inicial + 2, ultimo)
+    if periodo == 'ano_ate_hoje':
+        return date(hoje.year, 1, 1), hoje
+    if periodo == 'ultimos_90_dias':
+        return hoje - timedelta(days=89), hoje
+    if periodo == 'ano_anterior':
+        return date(hoje.year - 1, 1, 1), date(hoje.year - 1, 12, 31)
+    raise ValueError(f"Período desconhecido: {periodo}")
+
+
+class MotorAnalytics(VisaoIncremental):
+    """Visão colunar (DataFrame) de todas as transações com agregações vetorizadas
+
+    A visão é construída uma vez e depois sincronizada pela versão do FinTrack,
+    aplicando só as transações alteradas (FinTrack.alteracoes_desde).
+    """
+    def __init__(self, sistema):
+        super().__init__(sistema)
+        self.df = None
+
+    def _construir(self, transacoes):
+        df = pd.DataFrame(transacoes, columns=COLUNAS)
+        # Usa o ordinal já calculado pelo FinTrack em vez de reinterpretar as strings
+        ordinais = np.fromiter((self.sistema.ordinal_da_transacao(t['id']) for t in transacoes),
+                               dtype=np.int64, count=len(transacoes))
+        df['data'] = pd.to_datetime(ordinais - ORDINAL_EPOCA, unit='D')
+        df['valor'] = df['valor'].astype(np.float64)
+        return df.set_index('id')
+
+    def _montar(self, transacoes):
+        self.df = self._construir(transacoes)
+
+    def _aplicar(self, atuais, removidas):
+        novas = []
+        for t in atuais:
+            if t['id'] in self.df.index:
+                self.df.loc[t['id'], ['data', 'tipo', 'categoria', 'valor', 'descricao']] = [
+                    pd.Timestamp(t['data']), t['tipo'], t['categoria'], float(t['valor']), t['descricao']]
+            else:
+                novas.append(t)
+        removidas = [transacao_id for transacao_id in removidas if transacao_id in self.df.index]
+        if removidas:
+            self.df = self.df.drop(removidas)
+        if novas:
+            self.df = pd.concat([self.df, self._construir(novas)])
+
+    def _no_periodo(self, data_inicial, data_final):
+        """Linhas com data entre os limites (inclusivos), por máscara vetorizada"""
+        self.sincronizar()
+        datas = self.df['data']
+        mascara = np.ones(len(self.df), dtype=bool)
+        if data_inicial is not None:
+            mascara &= (datas >= pd.Timestamp(data_inicial)).to_numpy()
+        if data_final is not None:
+            mascara &= (datas <= pd.Timestamp(data_final)).to_numpy()
+        return self.df[mascara]
+
+    def analisar_periodo(self, data_inicial=None, data_final=None):
+        """Receitas, despesas, saldo e quebra por categoria em um único group-by
+
+        Retorna None quando não há transações no período.
+        """
+        periodo = self._no_periodo(data_inicial, data_final)
+        if periodo.empty:
+            return None
+
+        somas = periodo.groupby(['tipo', 'categoria'], sort=False)['valor'].sum()
+        por_tipo = somas.groupby(level=0).sum()
+        receitas = float(por_tipo.get('receita', 0.0))
+        despesas = float(por_tipo.get('despesa', 0.0))
+
+        def por_categoria(tipo):
+            if tipo not in por_tipo.index:
+                return {}
+            return somas.xs(tipo, level='tipo').sort_values(ascending=False).to_dict()
+
+        return {
+            'data_inicial': periodo['data'].min().date() if data_inicial is None else pd.Timestamp(data_inicial).date(),
+            'data_final': periodo['data'].max().date() if data_final is None else pd.Timestamp(data_final).date(),
+            'quantidade': len(periodo),
+            'receitas': receitas,
+            'despesas': despesas,
+            'saldo': receitas - despesas,
+            'gastos_categoria': por_categoria('despesa'),
+            'receitas_categoria': por_categoria('receita'),
+        }
+
+    def serie_mensal(self, data_inicial=None, data_final=None):
+        """Tabela mês × tipo (receita/despesa) com os totais de cada mês do período"""
+        periodo = self._no_periodo(data_inicial, data_final)
+        if periodo.empty:
+            return pd.DataFrame(columns=['receita', 'despesa', 'saldo'])
+        meses = periodo['data'].dt.to_period('M')
+        tabela = periodo.groupby([meses, 'tipo'])['valor'].sum().unstack('tipo', fill_value=0.0)
+        tabela = tabela.reindex(columns=['receita', 'despesa'], fill_value=0.0)
+        tabela['saldo'] = tabela['receita'] - tabela['despesa']
+        return tabela
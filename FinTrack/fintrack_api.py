@@ -0,0 +1,403 @@
+# API HTTP local do FinTrack (JSON), para outros serviços e apps no celular
+# Só biblioteca padrão: o laço asyncio atende as conexões (keep-alive) e um único
+# thread executa as chamadas ao FinTrack, então todos os clientes compartilham o
+# mesmo armazenamento em memória sem disputar a trava. Listas saem em JSON com
+# Transfer-Encoding: chunked; análise, previsão e recomendações têm ETag (versão
+# dos dados + dia + parâmetros) e respondem 304 a um If-None-Match igual.
+# Uso: python fintrack_api.py [--arquivo fintrack_data.json] [--modo json] [--porta 8765]
+#   GET    /transacoes?inicio=0&limite=50&ordenar=data&crescente=1&tipo=&categoria=&de=&ate=&valor_min=&valor_max=
+#   GET    /transacoes/{id}
+#   POST   /transacoes              objeto ou lista {tipo, valor, categoria?, descricao?, data?} (tudo ou nada)
+#   PATCH  /transacoes/{id}         campos a alterar; If-Match: <versão> recusa (409) se mudou
+#   DELETE /transacoes/{id}         também aceita If-Match
+#   GET    /analise?mes=&ano=       GET /previsao?meses=3&horizonte=1&modelo=   GET /recomendacoes?mes=&ano=
+#   GET    /saude
+
+import argparse
+import asyncio
+import json
+import re
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from urllib.parse import parse_qs, urlsplit
+
+from fintrack import FinTrack
+from fintrack_armazenamento import MODOS_ARMAZENAMENTO, ConflitoDeVersao
+from fintrack_cli import validar_adicoes, validar_edicao
+from fintrack_previsao import MODELOS
+
+LIMITE_CORPO = 10 * 1024 * 1024     # bytes aceitos no corpo de um POST/PATCH
+LINHAS_POR_PARTE = 500              # transações por pedaço da resposta chunked
+INTERVALO_RECARGA = 1.0             # segundos entre verificações de gravação por outro processo
+TAMANHO_CACHE = 256                 # respostas com ETag guardadas
+
+STATUS = {200: 'OK', 201: 'Created', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+          405: 'Method Not Allowed', 409: 'Conflict', 413: 'Payload Too Large',
+          431: 'Request Header Fields Too Large', 500: 'Internal Server Error'}
+
+
+class ErroRequisicao(Exception):
+    """Erro com status HTTP, devolvido ao cliente como {"erro": ...}"""
+    def __init__(self, status, mensagem, **extras):
+        super().__init__(mensagem)
+        self.status = status
+        self.dados = {'erro': mensagem, **extras}
+
+
+class Requisicao:
+    def __init__(self, metodo, alvo, cabecalhos, corpo):
+        partes = urlsplit(alvo)
+        self.metodo = metodo
+        self.caminho = partes.path.rstrip('/') or '/'
+        self.parametros = {chave: valores[-1] for chave, valores in parse_qs(partes.query).items()}
+        self.cabecalhos = cabecalhos
+        self.corpo = corpo
+
+    def inteiro(self, nome, padrao=None, minimo=None, maximo=None):
+        texto = self.parametros.get(nome)
+        if texto in (None, ''):
+            return padrao
+        try:
+            valor = int(texto)
+        except ValueError:
+            raise ErroRequisicao(400, f"Parâmetro '{nome}' deve ser inteiro")
+        if (minimo is not None and valor < minimo) or (maximo is not None and valor > maximo):
+            raise ErroRequisicao(400, f"Parâmetro '{nome}' fora do intervalo")
+        return valor
+
+    def numero(self, nome):
+        texto = self.parametros.get(nome)
+        if texto in (None, ''):
+            return None
+        try:
+            return float(texto)
+        except ValueError:
+            raise ErroRequisicao(400, f"Parâmetro '{nome}' deve ser numérico")
+
+    def json(self):
+        try:
+            return json.loads(self.corpo or b'null')
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise ErroRequisicao(400, f"JSON inválido: {e}")
+
+
+class Resposta:
+    """Corpo em bytes (ou `partes`, gerador assíncrono de bytes, enviado em chunked)"""
+    def __init__(self, status=200, dados=None, cabecalhos=None, corpo=None, partes=None):
+        self.status = status
+        self.cabecalhos = cabecalhos or {}
+        self.corpo = corpo if corpo is not None else (b'' if dados is None else _json_bytes(dados))
+        self.partes = partes
+
+
+def _json_bytes(dados):
+    return json.dumps(dados, ensure_ascii=False).encode('utf-8')
+
+
+def previsao_para_json(previsao):
+    """calcular_previsao com as chaves (tipo, categoria) virando lista"""
+    if not previsao:
+        return previsao
+    return dict(previsao, categorias=[{'tipo': tipo, 'categoria': categoria, 'valores': valores}
+                                      for (tipo, categoria), valores in previsao['categorias'].items()])
+
+
+class ServidorAPI:
+    """Rotas da API sobre uma instância do FinTrack"""
+    def __init__(self, sistema):
+        self.sistema = sistema
+        # Um thread só: as chamadas ao FinTrack ficam em série, fora do laço de eventos
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fintrack-api')
+        self._cache = OrderedDict()          # ETag -> corpo
+        self._ultima_recarga = 0.0
+        self._rotas = [
+            ('GET', re.compile(r'/transacoes'), self.listar),
+            ('POST', re.compile(r'/transacoes'), self.adicionar),
+            ('GET', re.compile(r'/transacoes/(\d+)'), self.obter),
+            ('PATCH', re.compile(r'/transacoes/(\d+)'), self.atualizar),
+            ('DELETE', re.compile(r'/transacoes/(\d+)'), self.remover),
+            ('GET', re.compile(r'/analise'), self.analise),
+            ('GET', re.compile(r'/previsao'), self.previsao),
+            ('GET', re.compile(r'/recomendacoes'), self.recomendacoes),
+            ('GET', re.compile(r'/saude'), self.saude),
+        ]
+
+    async def executar(self, funcao, *args, **kwargs):
+        """Roda uma chamada ao FinTrack no thread da API"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, lambda: funcao(*args, **kwargs))
+
+    async def _sincronizar(self):
+        """Pega gravações de outros processos (CLI, web), no máximo uma vez por INTERVALO_RECARGA"""
+        agora = time.monotonic()
+        if agora - self._ultima_recarga >= INTERVALO_RECARGA:
+            self._ultima_recarga = agora
+            await self.executar(self.sistema.recarregar_se_alterado)
+
+    async def despachar(self, requisicao):
+        metodos = []
+        for metodo, padrao, funcao in self._rotas:
+            encontrado = padrao.fullmatch(requisicao.caminho)
+            if encontrado:
+                if metodo == requisicao.metodo:
+                    await self._sincronizar()
+                    return await funcao(requisicao, *encontrado.groups())
+                metodos.append(metodo)
+        if metodos:
+            raise ErroRequisicao(405, f"Método não permitido (use {', '.join(metodos)})")
+        raise ErroRequisicao(404, f"Rota não encontrada: {requisicao.caminho}")
+
+    # ---------- transações ----------
+
+    def _data(self, texto, nome):
+        if not texto:
+            return None
+        data, erro = self.sistema.validar_data(texto)
+        if erro:
+            raise ErroRequisicao(400, f"Parâmetro '{nome}': {erro}")
+        return data
+
+    async def listar(self, requisicao):
+        filtros = {
+            'inicio': requisicao.inteiro('inicio', 0, minimo=0),
+            'limite': requisicao.inteiro('limite', 50, minimo=1),
+            'ordenar_por': requisicao.parametros.get('ordenar', 'data'),
+            'decrescente': requisicao.parametros.get('crescente', '') not in ('1', 'true', 'sim'),
+            'tipo': requisicao.parametros.get('tipo') or None,
+            'categoria': requisicao.parametros.get('categoria') or None,
+            'data_inicial': self._data(requisicao.parametros.get('de'), 'de'),
+            'data_final': self._data(requisicao.parametros.get('ate'), 'ate'),
+            'valor_min': requisicao.numero('valor_min'),
+            'valor_max': requisicao.numero('valor_max'),
+        }
+        try:
+            transacoes, total = await self.executar(self.sistema.consultar_transacoes, **filtros)
+        except ValueError as e:
+            raise ErroRequisicao(400, str(e))
+
+        async def partes():
+            # Um pedaço por bloco de linhas: o cliente começa a ler antes do fim da serialização
+            yield f'{{"total": {total}, "transacoes": ['.encode('utf-8')
+            for i in range(0, len(transacoes), LINHAS_POR_PARTE):
+                bloco = ','.join(json.dumps(t, ensure_ascii=False) for t in transacoes[i:i + LINHAS_POR_PARTE])
+                yield ((',' if i else '') + bloco).encode('utf-8')
+            yield b']}'
+        return Resposta(200, partes=partes())
+
+    async def obter(self, requisicao, transacao_id):
+        transacao = await self.executar(self.sistema.obter_transacao, int(transacao_id))
+        if transacao is None:
+            raise ErroRequisicao(404, f"Transação #{transacao_id} não encontrada")
+        return Resposta(200, transacao, {'ETag': f'"{transacao["versao"]}"'})
+
+    async def adicionar(self, requisicao):
+        dados = requisicao.json()
+        itens = dados if isinstance(dados, list) else [dados]
+        if not itens or not all(isinstance(item, dict) for item in itens):
+            raise ErroRequisicao(400, "Envie um objeto ou uma lista de objetos")
+
+        def adicionar():
+            validas, erros, avisos = validar_adicoes(self.sistema, list(enumerate(itens)))
+            if erros:
+                return None, erros, avisos
+            return self.sistema.adicionar_em_lote(validas), erros, avisos
+        novas, erros, avisos = await self.executar(adicionar)
+        if novas is None:
+            raise ErroRequisicao(400, "Nenhuma transação gravada: há itens inválidos",
+                                 erros=[{'item': i, 'erro': motivo} for i, motivo in erros])
+        resultado = novas if isinstance(dados, list) else novas[0]
+        if avisos:
+            return Resposta(201, {'transacoes': resultado,
+                                  'avisos': [{'item': i, 'aviso': aviso} for i, aviso in avisos]})
+        return Resposta(201, resultado)
+
+    @staticmethod
+    def _versao_esperada(requisicao):
+        """Versão do cabeçalho If-Match (a ETag de GET /transacoes/{id}), ou None"""
+        versao = requisicao.cabecalhos.get('if-match', '').strip().strip('"')
+        if not versao:
+            return None
+        if not versao.isdigit():
+            raise ErroRequisicao(400, "If-Match deve ser a versão da transação")
+        return int(versao)
+
+    async def atualizar(self, requisicao, transacao_id):
+        campos = requisicao.json()
+        if not isinstance(campos, dict) or not campos:
+            raise ErroRequisicao(400, "Envie um objeto com os campos a alterar")
+        versao = self._versao_esperada(requisicao)
+
+        def atualizar():
+            atual = self.sistema.obter_transacao(int(transacao_id))
+            if atual is None:
+                raise ErroRequisicao(404, f"Transação #{transacao_id} não encontrada")
+            validados = validar_edicao(self.sistema, campos, atual['tipo'])
+            return self.sistema.atualizar_transacao(int(transacao_id), validados, versao_esperada=versao)
+        nova = await self.executar(atualizar)
+        return Resposta(200, nova, {'ETag': f'"{nova["versao"]}"'})
+
+    async def remover(self, requisicao, transacao_id):
+        removida = await self.executar(self.sistema.remover_transacao, int(transacao_id),
+                                       versao_esperada=self._versao_esperada(requisicao))
+        if removida is None:
+            raise ErroRequisicao(404, f"Transação #{transacao_id} não encontrada")
+        return Resposta(200, removida)
+
+    # ---------- análises (com ETag) ----------
+
+    async def _com_etag(self, requisicao, chave, calcular):
+        """Responde 304 se o cliente já tem esta versão; senão calcula (ou usa o cache) com ETag"""
+        def etag_atual():
+            assinatura = zlib.crc32(repr(chave).encode('utf-8'))
+            return f'"{self.sistema.versao:x}-{date.today().toordinal():x}-{assinatura:08x}"'
+
+        etag = etag_atual()
+        if etag in requisicao.cabecalhos.get('if-none-match', ''):
+            return Resposta(304, cabecalhos={'ETag': etag})
+        corpo = self._cache.get(etag)
+        if corpo is None:
+            def calcular_com_versao():
+                # A consulta pode materializar recorrentes: a ETag vale para a versão depois dela
+                return _json_bytes(calcular()), etag_atual()
+            corpo, etag = await self.executar(calcular_com_versao)
+            self._cache[etag] = corpo
+            while len(self._cache) > TAMANHO_CACHE:
+                self._cache.popitem(last=False)
+        return Resposta(200, cabecalhos={'ETag': etag, 'Cache-Control': 'no-cache'}, corpo=corpo)
+
+    def _mes_ano(self, requisicao):
+        hoje = datetime.now()
+        return (requisicao.inteiro('mes', hoje.month, minimo=1, maximo=12),
+                requisicao.inteiro('ano', hoje.year, minimo=1900, maximo=2100))
+
+    async def analise(self, requisicao):
+        mes, ano = self._mes_ano(requisicao)
+        return await self._com_etag(requisicao, ('analise', mes, ano),
+                                    lambda: self.sistema.calcular_analise(mes, ano))
+
+    async def previsao(self, requisicao):
+        meses = requisicao.inteiro('meses', 3, minimo=2, maximo=36)
+        horizonte = requisicao.inteiro('horizonte', 1, minimo=1, maximo=12)
+        modelo = requisicao.parametros.get('modelo', 'media_movel')
+        if modelo not in MODELOS:
+            raise ErroRequisicao(400, f"Modelo desconhecido (use {', '.join(MODELOS)})")
+        return await self._com_etag(requisicao, ('previsao', meses, horizonte, modelo), lambda: previsao_para_json(
+            self.sistema.calcular_previsao(meses, horizonte, modelo)))
+
+    async def recomendacoes(self, requisicao):
+        mes, ano = self._mes_ano(requisicao)
+        return await self._com_etag(requisicao, ('recomendacoes', mes, ano), lambda: self.sistema.calcular_recomendacoes(
+            self.sistema.calcular_analise(mes, ano)))
+
+    async def saude(self, requisicao):
+        return Resposta(200, {'status': 'ok', 'transacoes': len(self.sistema), 'versao': self.sistema.versao,
+                              'modo': self.sistema.modo_armazenamento})
+
+    # ---------- HTTP ----------
+
+    async def atender(self, leitor, escritor):
+        """Uma conexão: várias requisições seguidas enquanto o cliente mantiver keep-alive"""
+        try:
+            while True:
+                try:
+                    bruto = await leitor.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._enviar(escritor, Resposta(431, {'erro': "Cabeçalhos grandes demais"}), False)
+                    break
+                linhas = bruto.decode('latin-1').split('\r\n')
+                try:
+                    metodo, alvo, versao_http = linhas[0].split(' ', 2)
+                except ValueError:
+                    await self._enviar(escritor, Resposta(400, {'erro': "Requisição malformada"}), False)
+                    break
+                cabecalhos = {}
+                for linha in linhas[1:]:
+                    nome, _, valor = linha.partition(':')
+                    if nome:
+                        cabecalhos[nome.strip().lower()] = valor.strip()
+                conexao = cabecalhos.get('connection', '').lower()
+                manter = conexao == 'keep-alive' or (versao_http == 'HTTP/1.1' and conexao != 'close')
+
+                tamanho = cabecalhos.get('content-length') or '0'
+                if not tamanho.isdecimal():
+                    # Sem um tamanho confiável não dá para achar o início da próxima requisição
+                    await self._enviar(escritor, Resposta(400, {'erro': "Content-Length inválido"}), False)
+                    break
+                tamanho = int(tamanho)
+                if tamanho > LIMITE_CORPO:
+                    await self._enviar(escritor, Resposta(413, {'erro': "Corpo grande demais"}), False)
+                    break
+                corpo = await leitor.readexactly(tamanho) if tamanho else b''
+
+                resposta = await self._responder(Requisicao(metodo.upper(), alvo, cabecalhos, corpo))
+                await self._enviar(escritor, resposta, manter)
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _responder(self, requisicao):
+        try:
+            return await self.despachar(requisicao)
+        except ErroRequisicao as e:
+            return Resposta(e.status, e.dados)
+        except ConflitoDeVersao as e:
+            return Resposta(409, {'erro': str(e)})
+        except ValueError as e:
+            return Resposta(400, {'erro': str(e)})
+        except Exception as e:
+            print(f"❌ Erro na API ({requisicao.metodo} {requisicao.caminho}): {e}")
+            return Resposta(500, {'erro': "Erro interno"})
+
+    async def _enviar(self, escritor, resposta, manter):
+        cabecalho = [f"HTTP/1.1 {resposta.status} {STATUS.get(resposta.status, '')}",
+                     "Content-Type: application/json; charset=utf-8",
+                     f"Connection: {'keep-alive' if manter else 'close'}"]
+        cabecalho += [f"{nome}: {valor}" for nome, valor in resposta.cabecalhos.items()]
+        if resposta.partes is None:
+            cabecalho.append(f"Content-Length: {len(resposta.corpo)}")
+            escritor.write(('\r\n'.join(cabecalho) + '\r\n\r\n').encode('latin-1') + resposta.corpo)
+        else:
+            cabecalho.append("Transfer-Encoding: chunked")
+            escritor.write(('\r\n'.join(cabecalho) + '\r\n\r\n').encode('latin-1'))
+            async for parte in resposta.partes:
+                if parte:
+                    escritor.write(b'%x\r\n%s\r\n' % (len(parte), parte))
+                    await escritor.drain()   # cede o laço para as outras conexões a cada pedaço
+            escritor.write(b'0\r\n\r\n')
+        await escritor.drain()
+
+    async def servir(self, host='127.0.0.1', porta=8765):
+        servidor = await asyncio.start_server(self.atender, host, porta, limit=64 * 1024)
+        print(f"🌐 API do FinTrack em http://{host}:{porta} ({len(self.sistema)} transações)")
+        async with servidor:
+            await servidor.serve_forever()
+
+    def fechar(self):
+        self._executor.shutdown(wait=True)
+        self.sistema.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API HTTP local do FinTrack")
+    parser.add_argument('--arquivo', default='fintrack_data.json')
+    parser.add_argument('--modo', choices=list(MODOS_ARMAZENAMENTO))
+    parser.add_argument('--host', default='127.0.0.1', help="use 0.0.0.0 só em rede confiável (não há autenticação)")
+    parser.add_argument('--porta', type=int, default=8765)
+    parser.add_argument('--intervalo-gravacao', type=float, default=0.5,
+                        help="segundos do write-behind: várias requisições viram uma gravação (0 = síncrono)")
+    args = parser.parse_args()
+
+    api = ServidorAPI(FinTrack(args.arquivo, args.modo, intervalo_gravacao=args.intervalo_gravacao))
+    try:
+        asyncio.run(api.servir(args.host, args.porta))
+    except KeyboardInterrupt:
+        print("\n👋 API encerrada")
+    finally:
+        api.fechar()
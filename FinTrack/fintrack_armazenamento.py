@@ -0,0 +1,924 @@
+# Camada de armazenamento do FinTrack
+# Cada modo sabe carregar a lista de transações e persistir mutações.
+
+import atexit
+import json
+import os
+import signal
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+
+from fintrack_snapshot import codificar_snapshot, decodificar_snapshot
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def escrever_atomico(caminho, conteudo):
+    """Grava bytes em arquivo temporário e troca pelo destino (sem arquivo pela metade)"""
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, 'wb') as f:
+        f.write(conteudo)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, caminho)
+
+
+def assinatura_arquivos(caminhos):
+    """(mtime, tamanho, inode) de cada arquivo; muda quando alguém grava nele
+
+    Como as gravações completas trocam o arquivo (rename), o inode muda mesmo
+    quando duas gravações caem no mesmo instante com o mesmo tamanho.
+    """
+    estado = []
+    for caminho in caminhos:
+        try:
+            info = os.stat(caminho)
+            estado.append((info.st_mtime_ns, info.st_size, info.st_ino))
+        except FileNotFoundError:
+            estado.append(None)
+    return tuple(estado)
+
+
+class ConflitoDeVersao(ValueError):
+    """A transação foi alterada (ou removida) por outra sessão depois de lida"""
+
+
+@contextmanager
+def trava_arquivo(caminho):
+    """Trava exclusiva entre processos, liberada ao sair do bloco"""
+    with open(caminho, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def versao_anterior(operacao, transacao):
+    """Versão que o registro precisa ter no disco para a operação valer"""
+    if operacao == 'add':
+        return None
+    if operacao == 'edit':
+        return transacao['versao'] - 1
+    return transacao.get('versao', 1)
+
+
+def com_versao_anterior(operacao, transacoes):
+    """[(operação, transação, versão anterior)] para registrar_varios"""
+    return [(operacao, t, versao_anterior(operacao, t)) for t in transacoes]
+
+
+def aplicar_operacoes(transacoes, operacoes):
+    """Aplica [(operação, transação, versão anterior)] sobre a lista lida do disco
+
+    Edições e exclusões só valem se o registro no disco ainda está na versão
+    em que foi lido. Retorna (lista resultante, operações aplicadas, IDs em conflito).
+    """
+    posicoes = {t['id']: i for i, t in enumerate(transacoes)}
+    aplicadas = []
+    conflitos = []
+    for operacao, transacao, anterior in operacoes:
+        i = posicoes.get(transacao['id'])
+        no_disco = transacoes[i] if i is not None else None
+        if operacao == 'add':
+            if no_disco is not None:
+                conflitos.append(transacao['id'])
+                continue
+            posicoes[transacao['id']] = len(transacoes)
+            transacoes.append(transacao)
+        elif operacao == 'edit':
+            if no_disco is None or no_disco.get('versao', 1) != anterior:
+                conflitos.append(transacao['id'])
+                continue
+            transacoes[i] = transacao
+        elif operacao == 'delete':
+            if no_disco is None:
+                continue  # já removida em outra sessão
+            if no_disco.get('versao', 1) != anterior:
+                conflitos.append(transacao['id'])
+                continue
+            transacoes[i] = None
+        aplicadas.append((operacao, transacao, anterior))
+    return [t for t in transacoes if t is not None], aplicadas, conflitos
+
+
+class ArmazenamentoJSON:
+    """Modo original: lista completa em um único arquivo JSON
+
+    Toda gravação acontece sob uma trava entre processos (`<base>.lock`) e é
+    atômica (arquivo temporário + rename). Se outro processo gravou desde a
+    última leitura/gravação deste, as mutações são aplicadas sobre o que está
+    no disco (não sobre a cópia em memória), conferindo a versão de cada registro.
+    """
+    def __init__(self, arquivo_dados):
+        self.arquivo_dados = arquivo_dados
+        base = os.path.splitext(arquivo_dados)[0]
+        self.arquivo_meta = base + '.meta.json'
+        self.arquivo_trava = base + '.lock'
+        # Estado dos dados no disco depois da última leitura/gravação deste processo
+        self._assinatura_conhecida = None
+
+    @classmethod
+    def arquivos(cls, arquivo_dados):
+        """Caminhos que este modo usa para o nome base (sem abrir nem criar nada; travas em .lock)"""
+        base = os.path.splitext(arquivo_dados)[0]
+        return [arquivo_dados, base + '.meta.json', base + '.lock']
+
+    def assinatura(self):
+        """Estado dos arquivos de dados, para detectar gravações de outros processos"""
+        return assinatura_arquivos([self.arquivo_dados, self.arquivo_meta])
+
+    def _assinatura_dados(self):
+        """Como assinatura(), mas sem o contador (reservar IDs não altera as transações)"""
+        return assinatura_arquivos([self.arquivo_dados])
+
+    def ler_contador(self):
+        """Próximo ID persistido (1 se ainda não existe)"""
+        if not os.path.exists(self.arquivo_meta):
+            return 1
+        with open(self.arquivo_meta, 'r', encoding='utf-8') as f:
+            return json.load(f).get('proximo_id', 1)
+
+    def gravar_contador(self, proximo_id):
+        """Grava o próximo ID em um arquivo pequeno ao lado dos dados"""
+        escrever_atomico(self.arquivo_meta, json.dumps({'proximo_id': proximo_id}).encode('utf-8'))
+
+    def reservar_ids(self, quantidade, minimo=1):
+        """Reserva `quantidade` IDs consecutivos entre processos; retorna o primeiro"""
+        with trava_arquivo(self.arquivo_trava):
+            primeiro = max(self.ler_contador(), minimo)
+            self.gravar_contador(primeiro + quantidade)
+        return primeiro
+
+    def _ler(self):
+        """Lê todas as transações do arquivo JSON (chamado com a trava)"""
+        if not os.path.exists(self.arquivo_dados):
+            return []
+        with open(self.arquivo_dados, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def carregar(self):
+        """Lê todas as transações"""
+        with trava_arquivo(self.arquivo_trava):
+            transacoes = self._ler()
+            self._assinatura_conhecida = self._assinatura_dados()
+        return transacoes
+
+    def _gravar_tudo(self, transacoes):
+        """Reescreve o arquivo inteiro de forma atômica (chamado com a trava)"""
+        conteudo = json.dumps(list(transacoes), indent=2, ensure_ascii=False).encode('utf-8')
+        escrever_atomico(self.arquivo_dados, conteudo)
+
+    def _gravar(self, operacoes, transacoes):
+        """Persiste as operações já conferidas (no JSON simples isso exige reescrever tudo)"""
+        self._gravar_tudo(transacoes)
+
+    def salvar(self, transacoes):
+        """Reescreve o arquivo inteiro"""
+        with trava_arquivo(self.arquivo_trava):
+            self._gravar_tudo(transacoes)
+            self._assinatura_conhecida = self._assinatura_dados()
+
+    def registrar(self, operacao, transacao, transacoes):
+        """Persiste uma mutação; retorna os IDs em conflito (não gravados)"""
+        return self.registrar_varios(com_versao_anterior(operacao, [transacao]), transacoes)
+
+    def registrar_lote(self, operacao, lote, transacoes):
+        """Persiste várias mutações do mesmo tipo com uma única gravação"""
+        return self.registrar_varios(com_versao_anterior(operacao, lote), transacoes)
+
+    def registrar_varios(self, operacoes, transacoes):
+        """Persiste [(operação, transação, versão anterior)] com uma única gravação sob a trava
+
+        `transacoes` é o estado em memória já com as operações aplicadas; só é
+        usado se ninguém mais gravou desde a última leitura/gravação deste
+        processo. Retorna os IDs cujas operações conflitaram e foram descartadas.
+        """
+        with trava_arquivo(self.arquivo_trava):
+            conflitos = []
+            sincronizado = self._assinatura_dados() == self._assinatura_conhecida
+            if not sincronizado:
+                # Outro processo gravou: parte do que está no disco
+                transacoes, operacoes, conflitos = aplicar_operacoes(self._ler(), operacoes)
+            self._gravar(operacoes, transacoes)
+            # Depois de mesclar, a memória continua sem as gravações dos outros:
+            # só volta a ser confiável no próximo carregar()
+            self._assinatura_conhecida = self._assinatura_dados() if sincronizado else None
+        return conflitos
+
+
+class ArmazenamentoJournal(ArmazenamentoJSON):
+    """Snapshot JSON + journal append-only (JSONL) com eventos add/edit/delete
+
+    Cada mutação vira uma linha no journal (custo O(1) no tamanho do histórico).
+    A cada `limite_compactacao` eventos o estado é compactado no snapshot.
+    A primeira linha do journal guarda o CRC do snapshot a que ele se refere:
+    se o snapshot mudou (queda entre gravar snapshot e zerar journal), os
+    eventos já estão no snapshot e são ignorados.
+    """
+    def __init__(self, arquivo_dados, limite_compactacao=1000):
+        super().__init__(arquivo_dados)
+        self.arquivo_snapshot = arquivo_dados
+        self.arquivo_journal = os.path.splitext(arquivo_dados)[0] + '.journal.jsonl'
+        self.limite_compactacao = limite_compactacao
+        self.eventos = 0
+
+    @classmethod
+    def arquivos(cls, arquivo_dados):
+        return super().arquivos(arquivo_dados) + [os.path.splitext(arquivo_dados)[0] + '.journal.jsonl']
+
+    def assinatura(self):
+        """Estado do snapshot, do journal e do contador"""
+        return assinatura_arquivos([self.arquivo_snapshot, self.arquivo_journal, self.arquivo_meta])
+
+    def _assinatura_dados(self):
+        return assinatura_arquivos([self.arquivo_snapshot, self.arquivo_journal])
+
+    def _codificar(self, transacoes):
+        """Transações -> bytes do snapshot"""
+        return json.dumps(list(transacoes), indent=2, ensure_ascii=False).encode('utf-8')
+
+    def _decodificar(self, conteudo):
+        """Bytes do snapshot -> transações"""
+        return json.loads(conteudo.decode('utf-8'))
+
+    def _ler_snapshot(self):
+        """Retorna (transações, crc) do snapshot atual"""
+        if not os.path.exists(self.arquivo_snapshot):
+            return [], 0
+        with open(self.arquivo_snapshot, 'rb') as f:
+            conteudo = f.read()
+        return self._decodificar(conteudo), zlib.crc32(conteudo)
+
+    def _iniciar_journal(self, crc):
+        """Cria um journal vazio amarrado ao snapshot informado"""
+        cabecalho = json.dumps({'op': 'base', 'crc': crc}) + '\n'
+        escrever_atomico(self.arquivo_journal, cabecalho.encode('utf-8'))
+        self.eventos = 0
+
+    def _ler(self):
+        """Carrega o snapshot e reaplica os eventos do journal (chamado com a trava)"""
+        transacoes, crc = self._ler_snapshot()
+
+        if not os.path.exists(self.arquivo_journal):
+            self._iniciar_journal(crc)
+            return transacoes
+
+        with open(self.arquivo_journal, 'r', encoding='utf-8') as f:
+            linhas = f.readlines()
+
+        eventos = []
+        for numero, linha in enumerate(linhas, 1):
+            try:
+                eventos.append(json.loads(linha))
+            except json.JSONDecodeError:
+                # Só a última linha pode estar truncada (queda no meio da escrita)
+                print(f"⚠️  Journal: linha {numero} corrompida ignorada")
+
+        if not eventos or eventos[0].get('op') != 'base' or eventos[0].get('crc') != crc:
+            # Journal de um snapshot anterior: eventos já compactados
+            self._iniciar_journal(crc)
+            return transacoes
+
+        posicoes = {}
+        for i, t in enumerate(transacoes):
+            posicoes.setdefault(t['id'], i)
+
+        for evento in eventos[1:]:
+            op = evento.get('op')
+            if op == 'add':
+                posicoes.setdefault(evento['transacao']['id'], len(transacoes))
+                transacoes.append(evento['transacao'])
+            elif op == 'edit':
+                i = posicoes.get(evento['transacao']['id'])
+                if i is not None:
+                    transacoes[i] = evento['transacao']
+            elif op == 'delete':
+                i = posicoes.pop(evento['id'], None)
+                if i is not None:
+                    transacoes[i] = None
+
+        self.eventos = len(eventos) - 1
+        return [t for t in transacoes if t is not None]
+
+    def carregar(self):
+        """Carrega snapshot + journal; compacta se o journal passou do limite"""
+        with trava_arquivo(self.arquivo_trava):
+            transacoes = self._ler()
+            if self.eventos >= self.limite_compactacao:
+                self._gravar_tudo(transacoes)
+            self._assinatura_conhecida = self._assinatura_dados()
+        return transacoes
+
+    def _gravar_tudo(self, transacoes):
+        """Compacta: grava o snapshot completo e zera o journal"""
+        conteudo = self._codificar(transacoes)
+        escrever_atomico(self.arquivo_snapshot, conteudo)
+        self._iniciar_journal(zlib.crc32(conteudo))
+
+    def _gravar(self, operacoes, transacoes):
+        """Lote grande (ou journal cheio) vai para o snapshot; senão um único append"""
+        if self.eventos + len(operacoes) >= self.limite_compactacao:
+            self._gravar_tudo(transacoes)
+            return
+        eventos = [{'op': 'delete', 'id': t['id']} if operacao == 'delete' else {'op': operacao, 'transacao': t}
+                   for operacao, t, _ in operacoes]
+        with open(self.arquivo_journal, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in eventos))
+        self.eventos += len(eventos)
+
+
+class ArmazenamentoBinario(ArmazenamentoJournal):
+    """Snapshot binário colunar (`<base>.fts`, ver fintrack_snapshot) + journal
+
+    Funciona como o modo journal, mas o snapshot é lido com frombytes em vez
+    de json.load, então abrir um histórico grande leva uma fração do tempo.
+    O JSON (`arquivo_dados`) fica para importar/exportar: na primeira
+    abertura o conteúdo dele é importado para o snapshot.
+    """
+    def __init__(self, arquivo_dados, limite_compactacao=1000):
+        super().__init__(arquivo_dados, limite_compactacao)
+        base = os.path.splitext(arquivo_dados)[0]
+        self.arquivo_snapshot = base + '.fts'
+        self.arquivo_journal = base + '.fts.journal.jsonl'
+        with trava_arquivo(self.arquivo_trava):
+            if not os.path.exists(self.arquivo_snapshot) and os.path.exists(arquivo_dados):
+                # Importação única do formato JSON
+                self._gravar_tudo(ArmazenamentoJSON(arquivo_dados)._ler())
+
+    @classmethod
+    def arquivos(cls, arquivo_dados):
+        base = os.path.splitext(arquivo_dados)[0]
+        return ArmazenamentoJSON.arquivos(arquivo_dados) + [base + '.fts', base + '.fts.journal.jsonl']
+
+    def _codificar(self, transacoes):
+        return codificar_snapshot(transacoes)
+
+    def _decodificar(self, conteudo):
+        return decodificar_snapshot(conteudo)
+
+
+class ArmazenamentoParticionado(ArmazenamentoJSON):
+    """Uma partição por ano (`<base>.anos/AAAA.fts`, no formato de fintrack_snapshot)
+
+    O índice `<base>.anos/indice.json` guarda, por ano, a quantidade de
+    transações e os totais mensais por (tipo, categoria): o FinTrack monta
+    resumos e previsões sem abrir as partições e só carrega um ano
+    (carregar_ano) quando uma consulta precisa das transações dele. Cada
+    gravação relê e reescreve apenas as partições dos anos afetados.
+    """
+    particionado = True
+
+    def __init__(self, arquivo_dados):
+        super().__init__(arquivo_dados)
+        self.pasta = os.path.splitext(arquivo_dados)[0] + '.anos'
+        self.arquivo_indice = os.path.join(self.pasta, 'indice.json')
+        # Ano de cada transação já lida/gravada, para achar a partição de uma edição que muda de ano
+        self._ano_do_id = {}
+        with trava_arquivo(self.arquivo_trava):
+            if not os.path.exists(self.arquivo_indice):
+                # Importação única do formato JSON (o contador passa a ser a fonte dos IDs)
+                os.makedirs(self.pasta, exist_ok=True)
+                transacoes = ArmazenamentoJSON(arquivo_dados)._ler()
+                self._gravar_tudo(transacoes)
+                if transacoes:
+                    self.gravar_contador(max(self.ler_contador(), max(t['id'] for t in transacoes) + 1))
+
+    @classmethod
+    def arquivos(cls, arquivo_dados):
+        """Como no JSON, mais a pasta das partições (com o índice dentro)"""
+        return super().arquivos(arquivo_dados) + [os.path.splitext(arquivo_dados)[0] + '.anos']
+
+    def assinatura(self):
+        """Estado do índice (reescrito a cada gravação) e do contador"""
+        return assinatura_arquivos([self.arquivo_indice, self.arquivo_meta])
+
+    def _assinatura_dados(self):
+        return assinatura_arquivos([self.arquivo_indice])
+
+    def _arquivo_ano(self, ano):
+        return os.path.join(self.pasta, f"{ano}.fts")
+
+    def _ler_indice(self):
+        """{ano: {'transacoes': n, 'meses': {'mes': [[tipo, categoria, total, quantidade], ...]}}}"""
+        if not os.path.exists(self.arquivo_indice):
+            return {}
+        with open(self.arquivo_indice, 'r', encoding='utf-8') as f:
+            return {int(ano): dados for ano, dados in json.load(f)['anos'].items()}
+
+    def _ler_ano(self, ano):
+        """Transações de uma partição (chamado com a trava)"""
+        caminho = self._arquivo_ano(ano)
+        if not os.path.exists(caminho):
+            return []
+        with open(caminho, 'rb') as f:
+            transacoes = decodificar_snapshot(f.read())
+        for t in transacoes:
+            self._ano_do_id[t['id']] = ano
+        return transacoes
+
+    @staticmethod
+    def _resumir(transacoes):
+        """Entrada do índice para uma partição: quantidade e totais mensais por (tipo, categoria)"""
+        meses = {}
+        for t in transacoes:
+            por_chave = meses.setdefault(int(t['data'][5:7]), {})
+            acumulado = por_chave.setdefault((t['tipo'], t['categoria']), [0.0, 0])
+            acumulado[0] += t['valor']
+            acumulado[1] += 1
+        return {
+            'transacoes': len(transacoes),
+            'meses': {str(mes): [[tipo, categoria, total, quantidade]
+                                 for (tipo, categoria), (total, quantidade) in por_chave.items()]
+                      for mes, por_chave in sorted(meses.items())},
+        }
+
+    def indice(self):
+        """{ano: (quantidade, {(ano, mes): {(tipo, categoria): [total, quantidade]}})} sem ler partições"""
+        with trava_arquivo(self.arquivo_trava):
+            bruto = self._ler_indice()
+        return {
+            ano: (dados['transacoes'],
+                  {(ano, int(mes)): {(tipo, categoria): [total, quantidade]
+                                     for tipo, categoria, total, quantidade in linhas}
+                   for mes, linhas in dados['meses'].items()})
+            for ano, dados in bruto.items()
+        }
+
+    def carregar_ano(self, ano):
+        """Transações de um ano"""
+        with trava_arquivo(self.arquivo_trava):
+            return self._ler_ano(ano)
+
+    def carregar(self):
+        """Todas as partições (exportação, migração e modos sem carga sob demanda)"""
+        with trava_arquivo(self.arquivo_trava):
+            return [t for ano in sorted(self._ler_indice()) for t in self._ler_ano(ano)]
+
+    def _gravar_anos(self, indice, por_ano):
+        """Reescreve as partições de {ano: transações} e o índice (chamado com a trava)"""
+        for ano, transacoes in por_ano.items():
+            if transacoes:
+                escrever_atomico(self._arquivo_ano(ano), codificar_snapshot(transacoes))
+                indice[ano] = self._resumir(transacoes)
+                for t in transacoes:
+                    self._ano_do_id[t['id']] = ano
+            else:
+                if os.path.exists(self._arquivo_ano(ano)):
+                    os.remove(self._arquivo_ano(ano))
+                indice.pop(ano, None)
+        conteudo = {'formato': 1, 'anos': {str(ano): dados for ano, dados in sorted(indice.items())}}
+        escrever_atomico(self.arquivo_indice, json.dumps(conteudo, ensure_ascii=False).encode('utf-8'))
+
+    def _gravar_tudo(self, transacoes):
+        """Redistribui todas as transações pelas partições (chamado com a trava)"""
+        por_ano = {ano: [] for ano in self._ler_indice()}
+        for t in transacoes:
+            por_ano.setdefault(int(t['data'][:4]), []).append(t)
+        self._gravar_anos({}, por_ano)
+
+    def registrar_varios(self, operacoes, transacoes):
+        """Aplica [(operação, transação, versão anterior)] relendo e reescrevendo só os anos afetados
+
+        `transacoes` (a memória do FinTrack, que pode ter só alguns anos) não é usado.
+        """
+        with trava_arquivo(self.arquivo_trava):
+            indice = self._ler_indice()
+            anos = set()
+            for operacao, t, _ in operacoes:
+                if t['id'] in self._ano_do_id:
+                    anos.add(self._ano_do_id[t['id']])
+                if operacao != 'delete':
+                    anos.add(int(t['data'][:4]))
+            atuais = [t for ano in sorted(anos) if ano in indice for t in self._ler_ano(ano)]
+            resultado, _, conflitos = aplicar_operacoes(atuais, operacoes)
+            por_ano = {ano: [] for ano in anos}
+            for t in resultado:
+                por_ano[int(t['data'][:4])].append(t)
+            self._gravar_anos(indice, por_ano)
+        return conflitos
+
+
+class ArmazenamentoSQLite:
+    """Banco SQLite local, com carga sob demanda por ano como o particionado
+
+    Na abertura só os totais mensais por (tipo, categoria) saem do banco, num
+    GROUP BY (indice); as transações de um ano são lidas pelo índice em data
+    (carregar_ano) quando uma consulta precisa delas. Um recarregamento após
+    gravação de outro processo refaz o mesmo caminho, então listagem e resumos
+    continuam vendo o mesmo estado. Gravações usam BEGIN IMMEDIATE (trava de
+    escrita do próprio SQLite entre processos) e conferem a versão de cada
+    registro antes de alterar.
+    """
+    COLUNAS = ('id', 'tipo', 'valor', 'categoria', 'descricao', 'data', 'versao')
+    particionado = True
+
+    def __init__(self, arquivo_dados):
+        self.arquivo_dados = arquivo_dados
+        self.arquivo_banco = os.path.splitext(arquivo_dados)[0] + '.db'
+        novo = not os.path.exists(self.arquivo_banco)
+        # O write-behind grava a partir de outra thread (sempre sob a trava do FinTrack);
+        # timeout: espera a trava de escrita de outro processo em vez de falhar na hora
+        self.conexao = sqlite3.connect(self.arquivo_banco, timeout=30, check_same_thread=False)
+        self.conexao.row_factory = sqlite3.Row
+        self._criar_tabelas()
+        if novo and os.path.exists(self.arquivo_dados):
+            # Migração única do formato JSON na primeira abertura
+            self.salvar(ArmazenamentoJSON(self.arquivo_dados).carregar())
+
+    @classmethod
+    def arquivos(cls, arquivo_dados):
+        """O banco e o JSON de onde ele é migrado na primeira abertura"""
+        return [arquivo_dados, os.path.splitext(arquivo_dados)[0] + '.db']
+
+    TABELA_TRANSACOES = """
+        CREATE TABLE IF NOT EXISTS {nome} (
+            id INTEGER PRIMARY KEY,
+            tipo TEXT NOT NULL,
+            valor REAL NOT NULL,
+            categoria TEXT NOT NULL,
+            descricao TEXT NOT NULL DEFAULT '',
+            data TEXT NOT NULL,
+            versao INTEGER NOT NULL DEFAULT 1
+        )"""
+
+    def _criar_tabelas(self):
+        with self.conexao:
+            self.conexao.execute(self.TABELA_TRANSACOES.format(nome='transacoes'))
+            self.conexao.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    chave TEXT PRIMARY KEY,
+                    valor INTEGER NOT NULL
+                )""")
+            colunas = {linha['name']: linha for linha in self.conexao.execute("PRAGMA table_info(transacoes)")}
+            if 'versao' not in colunas:
+                # Bancos criados antes do controle de versão
+                self.conexao.execute("ALTER TABLE transacoes ADD COLUMN versao INTEGER NOT NULL DEFAULT 1")
+            if not colunas['id']['pk']:
+                self._migrar_chave_primaria()
+            # Nenhuma consulta filtra só por tipo ou categoria (os totais saem de um GROUP BY)
+            self.conexao.executescript("""
+                CREATE INDEX IF NOT EXISTS idx_transacoes_data ON transacoes (data);
+                DROP INDEX IF EXISTS idx_transacoes_tipo;
+                DROP INDEX IF EXISTS idx_transacoes_categoria;
+            """)
+
+    def _migrar_chave_primaria(self):
+        """Bancos antigos tinham `id` sem restrição (só um índice comum): recria a tabela
+        com `id` como chave primária; IDs repetidos recebem IDs novos do contador
+        """
+        self.conexao.execute("BEGIN IMMEDIATE")
+        if any(linha['name'] == 'id' and linha['pk'] for linha in self.conexao.execute("PRAGMA table_info(transacoes)")):
+            return  # outro processo migrou enquanto este esperava a trava
+        linhas = [dict(linha) for linha in self.conexao.execute(
+            "SELECT id, tipo, valor, categoria, descricao, data, versao FROM transacoes ORDER BY rowid")]
+        proximo_id = max([self.ler_contador()] + [t['id'] + 1 for t in linhas])
+        vistos = set()
+        for t in linhas:
+            if t['id'] in vistos:
+                t['id'] = proximo_id
+                proximo_id += 1
+            vistos.add(t['id'])
+        self.conexao.execute("DROP TABLE IF EXISTS transacoes_nova")
+        self.conexao.execute(self.TABELA_TRANSACOES.format(nome='transacoes_nova'))
+        self.conexao.executemany(
+            "INSERT INTO transacoes_nova (id, tipo, valor, categoria, descricao, data, versao) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self._linha(t) for t in linhas))
+        # Os índices da tabela antiga (inclusive idx_transacoes_id) vão junto com ela
+        self.conexao.execute("DROP TABLE transacoes")
+        self.conexao.execute("ALTER TABLE transacoes_nova RENAME TO transacoes")
+        self.conexao.execute("INSERT OR REPLACE INTO meta (chave, valor) VALUES ('proximo_id', ?)", (proximo_id,))
+
+    @classmethod
+    def _linha(cls, transacao):
+        return [transacao.get(c, 1) if c == 'versao' else transacao[c] for c in cls.COLUNAS]
+
+    def assinatura(self):
+        """Estado do arquivo do banco"""
+        return assinatura_arquivos([self.arquivo_banco])
+
+    def ler_contador(self):
+        """Próximo ID persistido (1 se ainda não existe), nunca atrás do maior ID gravado
+
+        Com a carga sob demanda o FinTrack não vê todos os IDs na abertura; bancos
+        migrados do JSON não tinham o contador na tabela meta.
+        """
+        linha = self.conexao.execute(
+            "SELECT (SELECT valor FROM meta WHERE chave = 'proximo_id') AS contador,"
+            " (SELECT MAX(id) FROM transacoes) AS maior").fetchone()
+        return max(linha['contador'] or 1, (linha['maior'] or 0) + 1)
+
+    def gravar_contador(self, proximo_id):
+        """Grava o próximo ID na tabela meta"""
+        with self.conexao:
+            self.conexao.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('proximo_id', ?)", (proximo_id,))
+
+    def reservar_ids(self, quantidade, minimo=1):
+        """Reserva `quantidade` IDs consecutivos entre processos; retorna o primeiro"""
+        with self.conexao:
+            self.conexao.execute("BEGIN IMMEDIATE")
+            primeiro = max(self.ler_contador(), minimo)
+            self.conexao.execute(
+                "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('proximo_id', ?)", (primeiro + quantidade,))
+        return primeiro
+
+    def indice(self):
+        """{ano: (quantidade, {(ano, mes): {(tipo, categoria): [total, quantidade]}})} sem ler as linhas"""
+        indice = {}
+        cursor = self.conexao.execute("""
+            SELECT CAST(substr(data, 1, 4) AS INTEGER) AS ano, CAST(substr(data, 6, 2) AS INTEGER) AS mes,
+                   tipo, categoria, SUM(valor) AS total, COUNT(*) AS quantidade
+            FROM transacoes GROUP BY ano, mes, tipo, categoria""")
+        for linha in cursor:
+            dados = indice.setdefault(linha['ano'], [0, {}])
+            dados[0] += linha['quantidade']
+            dados[1].setdefault((linha['ano'], linha['mes']), {})[(linha['tipo'], linha['categoria'])] = \
+                [linha['total'], linha['quantidade']]
+        return {ano: tuple(dados) for ano, dados in indice.items()}
+
+    def carregar_ano(self, ano):
+        """Transações de um ano (intervalo no índice em data)"""
+        cursor = self.conexao.execute(
+            "SELECT id, tipo, valor, categoria, descricao, data, versao FROM transacoes"
+            " WHERE data >= ? AND data < ? ORDER BY id", (f"{ano:04d}-01-01", f"{ano + 1:04d}-01-01"))
+        return [dict(linha) for linha in cursor]
+
+    def carregar(self):
+        """Lê todas as transações na ordem de inserção (exportação e migração)"""
+        cursor = self.conexao.execute(
+            "SELECT id, tipo, valor, categoria, descricao, data, versao FROM transacoes ORDER BY rowid")
+        return [dict(linha) for linha in cursor]
+
+    def salvar(self, transacoes):
+        """Substitui todo o conteúdo da tabela em uma única transação"""
+        with self.conexao:
+            self.conexao.execute("BEGIN IMMEDIATE")
+            self.conexao.execute("DELETE FROM transacoes")
+            self.conexao.executemany(
+                "INSERT INTO transacoes (id, tipo, valor, categoria, descricao, data, versao) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self._linha(t) for t in transacoes))
+
+    def registrar(self, operacao, transacao, transacoes):
+        """Aplica a mutação; retorna os IDs em conflito (não gravados)"""
+        return self.registrar_varios(com_versao_anterior(operacao, [transacao]), transacoes)
+
+    def registrar_lote(self, operacao, lote, transacoes):
+        """Aplica todas as mutações do lote em uma única transação SQL"""
+        return self.registrar_varios(com_versao_anterior(operacao, lote), transacoes)
+
+    def _versoes(self, ids):
+        """Versão atual no banco de cada ID (ausentes ficam de fora)"""
+        versoes = {}
+        for i in range(0, len(ids), 500):
+            parte = ids[i:i + 500]
+            cursor = self.conexao.execute(
+                f"SELECT id, versao FROM transacoes WHERE id IN ({','.join('?' * len(parte))})", parte)
+            versoes.update((linha['id'], linha['versao']) for linha in cursor)
+        return versoes
+
+    def registrar_varios(self, operacoes, transacoes):
+        """Aplica [(operação, transação, versão anterior)] em uma transação SQL, conferindo as versões"""
+        conflitos = []
+        with self.conexao:
+            self.conexao.execute("BEGIN IMMEDIATE")
+            versoes = self._versoes([t['id'] for _, t, _ in operacoes])
+            inserir, atualizar, remover = [], [], []
+            for operacao, t, anterior in operacoes:
+                no_banco = versoes.get(t['id'])
+                if operacao == 'add':
+                    if no_banco is not None:
+                        conflitos.append(t['id'])
+                    else:
+                        inserir.append(self._linha(t))
+                elif operacao == 'edit':
+                    if no_banco is None or no_banco != anterior:
+                        conflitos.append(t['id'])
+                    else:
+                        atualizar.append(self._linha(t)[1:] + [t['id']])
+                elif operacao == 'delete' and no_banco is not None:
+                    if no_banco != anterior:
+                        conflitos.append(t['id'])
+                    else:
+                        remover.append((t['id'],))
+            self.conexao.executemany(
+                "INSERT INTO transacoes (id, tipo, valor, categoria, descricao, data, versao) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                inserir)
+            self.conexao.executemany(
+                "UPDATE transacoes SET tipo = ?, valor = ?, categoria = ?, descricao = ?, data = ?, versao = ? WHERE id = ?",
+                atualizar)
+            self.conexao.executemany("DELETE FROM transacoes WHERE id = ?", remover)
+        return conflitos
+
+
+class ArmazenamentoAdiado:
+    """Write-behind: guarda as mutações em memória e grava em segundo plano
+
+    Envolve qualquer outro armazenamento. As mutações de uma mesma transação
+    são combinadas (add + edit = add, add + delete = nada) e uma thread grava
+    tudo de uma vez a cada `intervalo` segundos ou quando `tamanho_lote`
+    mutações se acumulam. `flush()` grava na hora; a saída do processo
+    (atexit ou SIGTERM) também grava o que estiver pendente.
+
+    `trava` é a mesma trava que o FinTrack usa ao alterar suas transações;
+    `ao_gravar(antes, depois, conflitos)` recebe as assinaturas dos arquivos
+    em volta de cada gravação e os IDs rejeitados por conflito de versão.
+    """
+    def __init__(self, interno, trava, intervalo=2.0, tamanho_lote=100, ao_gravar=None):
+        self.interno = interno
+        self.arquivo_dados = interno.arquivo_dados
+        self.trava = trava
+        self.intervalo = intervalo
+        self.tamanho_lote = tamanho_lote
+        self.ao_gravar = ao_gravar
+        self.particionado = getattr(interno, 'particionado', False)
+        self._pendentes = {}          # id -> (operação, transação, versão anterior), já combinadas
+        self._transacoes = ()         # visão atual de todas as transações (para JSON/compactação)
+        self._acordar = threading.Event()
+        self._encerrar = False
+        self._thread = None
+        atexit.register(self.fechar)
+        _instalar_sinal_de_saida()
+
+    @property
+    def pendentes(self):
+        """Quantidade de mutações ainda não gravadas"""
+        return len(self._pendentes)
+
+    def assinatura(self):
+        return self.interno.assinatura()
+
+    def carregar(self):
+        """Grava o que estiver pendente e relê do armazenamento real"""
+        self.flush()
+        with self.trava:
+            return self.interno.carregar()
+
+    def indice(self):
+        """Totais por ano e mês (só nos armazenamentos com carga sob demanda)"""
+        self.flush()
+        with self.trava:
+            return self.interno.indice()
+
+    def carregar_ano(self, ano):
+        """Grava o que estiver pendente e lê a partição do ano"""
+        self.flush()
+        with self.trava:
+            return self.interno.carregar_ano(ano)
+
+    def ler_contador(self):
+        return self.interno.ler_contador()
+
+    def gravar_contador(self, proximo_id):
+        self.interno.gravar_contador(proximo_id)
+
+    def reservar_ids(self, quantidade, minimo=1):
+        """IDs são reservados na hora (precisam ser únicos entre processos)"""
+        return self.interno.reservar_ids(quantidade, minimo)
+
+    def salvar(self, transacoes):
+        """Gravação completa explícita: síncrona, descarta as mutações pendentes"""
+        with self.trava:
+            self._pendentes.clear()
+            self.interno.salvar(transacoes)
+
+    def _combinar(self, operacao, transacao):
+        # A versão anterior é a da primeira mutação pendente (a que está no disco)
+        pendente = self._pendentes.get(transacao['id'])
+        if pendente is None:
+            self._pendentes[transacao['id']] = (operacao, transacao, versao_anterior(operacao, transacao))
+        elif pendente[0] == 'add':
+            if operacao == 'delete':
+                del self._pendentes[transacao['id']]
+            else:
+                self._pendentes[transacao['id']] = ('add', transacao, None)
+        else:
+            self._pendentes[transacao['id']] = (operacao, transacao, pendente[2])
+
+    def registrar(self, operacao, transacao, transacoes):
+        """Enfileira a mutação; conflitos só aparecem na gravação (via ao_gravar)"""
+        with self.trava:
+            self._combinar(operacao, transacao)
+            self._transacoes = transacoes
+        self._agendar()
+        return []
+
+    def registrar_lote(self, operacao, lote, transacoes):
+        with self.trava:
+            for transacao in lote:
+                self._combinar(operacao, transacao)
+            self._transacoes = transacoes
+        self._agendar()
+        return []
+
+    def _agendar(self):
+        """Inicia a thread na primeira mutação; acorda antes do prazo se o lote encheu"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._laco, name='fintrack-gravacao', daemon=True)
+            self._thread.start()
+        if self.pendentes >= self.tamanho_lote:
+            self._acordar.set()
+
+    def _laco(self):
+        while not self._encerrar:
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            try:
+                self.flush()
+            except (IOError, sqlite3.Error) as e:
+                # Mantém as pendências para a próxima tentativa
+                print(f"❌ Erro ao salvar dados: {e}")
+
+    def flush(self):
+        """Grava agora todas as mutações pendentes em uma única gravação"""
+        with self.trava:
+            if not self._pendentes:
+                return
+            antes = self.interno.assinatura()
+            conflitos = self.interno.registrar_varios(list(self._pendentes.values()), self._transacoes)
+            self._pendentes.clear()
+            if self.ao_gravar:
+                self.ao_gravar(antes, self.interno.assinatura(), conflitos)
+
+    def fechar(self):
+        """Para a thread e grava o que faltar (chamado também na saída do processo)"""
+        self._encerrar = True
+        self._acordar.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.intervalo + 5)
+        self.flush()
+
+
+def _encerrar_por_sinal(numero, quadro):
+    # SystemExit faz os handlers do atexit rodarem (o padrão do SIGTERM não roda)
+    raise SystemExit(128 + numero)
+
+
+def _instalar_sinal_de_saida():
+    """Liga SIGTERM ao atexit, se ninguém instalou outro handler (só na thread principal)"""
+    if threading.current_thread() is not threading.main_thread():
+        return
+    if signal.getsignal(signal.SIGTERM) is signal.SIG_DFL:
+        signal.signal(signal.SIGTERM, _encerrar_por_sinal)
+
+
+def migrar_json_para_sqlite(arquivo_dados):
+    """Copia o conteúdo atual do JSON para o banco SQLite (sobrescreve o banco)"""
+    transacoes = ArmazenamentoJSON(arquivo_dados).carregar()
+    banco = ArmazenamentoSQLite(arquivo_dados)
+    banco.salvar(transacoes)
+    return len(transacoes), banco.arquivo_banco
+
+
+def exportar_para_json(modo, arquivo_dados, destino):
+    """Grava o conteúdo atual de qualquer modo em um JSON portátil (lista de transações)"""
+    transacoes = criar_armazenamento(modo, arquivo_dados).carregar()
+    ArmazenamentoJSON(destino).salvar(transacoes)
+    return len(transacoes)
+
+
+MODOS_ARMAZENAMENTO = {
+    'json': ArmazenamentoJSON,
+    'journal': ArmazenamentoJournal,
+    'binario': ArmazenamentoBinario,
+    'particionado': ArmazenamentoParticionado,
+    'sqlite': ArmazenamentoSQLite,
+}
+
+
+def criar_armazenamento(modo, arquivo_dados):
+    """Instancia o armazenamento pelo nome do modo"""
+    if modo not in MODOS_ARMAZENAMENTO:
+        raise ValueError(f"Modo de armazenamento desconhecido: {modo}")
+    return MODOS_ARMAZENAMENTO[modo](arquivo_dados)
+
+
+if __name__ == "__main__":
+    # Uso: python fintrack_armazenamento.py migrar [arquivo.json]
+    #      python fintrack_armazenamento.py exportar <modo> <destino.json> [arquivo.json]
+    import sys
+    if len(sys.argv) >= 2 and sys.argv[1] == 'migrar':
+        origem = sys.argv[2] if len(sys.argv) > 2 else 'fintrack_data.json'
+        total, destino = migrar_json_para_sqlite(origem)
+        print(f"✅ {total} transações migradas de {origem} para {destino}")
+    elif len(sys.argv) >= 4 and sys.argv[1] == 'exportar':
+        origem = sys.argv[4] if len(sys.argv) > 4 else 'fintrack_data.json'
+        total = exportar_para_json(sys.argv[2], origem, sys.argv[3])
+        print(f"✅ {total} transações exportadas para {sys.argv[3]}")
+    else:
+        print("Uso: python fintrack_armazenamento.py migrar [arquivo.json]")
+        print("     python fintrack_armazenamento.py exportar <modo> <destino.json> [arquivo.json]")
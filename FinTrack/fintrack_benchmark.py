@@ -0,0 +1,248 @@
+# Benchmark do FinTrack: latência, vazão e pico de memória de cada operação
+# Os dados vêm de fintrack_sinteticos (mesma semente e data final = mesmo histórico),
+# cada operação é medida em cada modo de armazenamento e o resultado pode ser
+# gravado em JSON para comparar versões.
+# Uso: python fintrack_benchmark.py [--linhas 1000000] [--modos json,binario,sqlite]
+#          [--pasta fintrack_bench] [--saida resultado.json] [--rotulo v0.0012]
+#      python fintrack_benchmark.py --comparar antes.json depois.json [--tolerancia 0.2]
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+
+from fintrack import FinTrack
+from fintrack_armazenamento import MODOS_ARMAZENAMENTO
+from fintrack_analytics import MotorAnalytics
+from fintrack_exibicao import QuadroTransacoes
+from fintrack_importacao import importar_linhas
+from fintrack_sinteticos import gerar_transacoes, gravar_sinteticos
+
+VERSAO_RESULTADO = 1
+TAMANHO_LOTE = 1000
+
+
+def _sem_saida(funcao):
+    """Executa a função sem saída no terminal"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return funcao()
+
+
+def medir(funcao, repeticoes=1, itens=1, memoria=True):
+    """Mede uma operação: mediana e mínimo do tempo, vazão (itens/s) e pico de memória
+
+    O pico (tracemalloc) é medido numa execução extra, para não distorcer o tempo.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        _sem_saida(funcao)
+        tempos.append(time.perf_counter() - inicio)
+    latencia = statistics.median(tempos)
+    medida = {
+        'latencia': latencia,
+        'minimo': min(tempos),
+        'repeticoes': repeticoes,
+        'itens': itens,
+        'vazao': itens / latencia if latencia > 0 else None,
+    }
+    if memoria:
+        tracemalloc.start()
+        try:
+            _sem_saida(funcao)
+            medida['pico_memoria'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return medida
+
+
+def _limpar(arquivo):
+    """Remove os arquivos de todos os modos (e os cadastros ao lado) para o mesmo nome base"""
+    for modo in MODOS_ARMAZENAMENTO:
+        for caminho in FinTrack.arquivos(arquivo, modo):
+            if os.path.isdir(caminho):
+                shutil.rmtree(caminho)
+            elif os.path.exists(caminho):
+                os.remove(caminho)
+
+
+def _linhas_extrato(quantidade, fim):
+    """Linhas brutas (como as de um CSV) para medir a importação, com datas até `fim`"""
+    for numero, t in enumerate(gerar_transacoes(quantidade, anos=1, semente=7, fim=fim), 2):
+        valor = f"{'-' if t['tipo'] == 'despesa' else ''}{t['valor']:.2f}"
+        # Sem categoria: passa pelo rotulador automático da importação
+        yield numero, {'data': t['data'], 'valor': valor, 'descricao': f"{t['descricao']} #{numero}"}
+
+
+def operacoes(sistema, arquivo, modo, fim, repeticoes):
+    """Lista de (nome, função, repetições, itens processados por chamada)"""
+    mes, ano = fim.month, fim.year
+    do_mes = len(sistema.consultar_mes(mes, ano)['transacoes'])
+    recentes = [t['id'] for t in sistema.consultar_transacoes(limite=2 * repeticoes + 2)[0]]
+    para_editar = iter(recentes[:repeticoes + 1])
+    para_remover = iter(recentes[repeticoes + 1:])
+    lote = [{'tipo': 'despesa', 'valor': 10.0, 'categoria': 'Outros', 'descricao': 'bench lote',
+             'data': fim.isoformat()} for _ in range(TAMANHO_LOTE)]
+    extrato = list(_linhas_extrato(TAMANHO_LOTE, fim))
+
+    def web_analytics():
+        motor = MotorAnalytics(sistema)
+        motor.analisar_periodo(f"{ano}-01-01", fim.isoformat())
+        motor.serie_mensal()
+
+    quadro = QuadroTransacoes()
+
+    def web_pagina():
+        transacoes, _ = sistema.consultar_transacoes(limite=50)
+        quadro.pagina(sistema, transacoes)
+
+    def validar_categorias():
+        for nome in ('alimentacao', 'Transprte', 'Mercado'):
+            sistema.validar_categoria(nome, 'despesa')
+
+    return [
+        ('abrir', lambda: FinTrack(arquivo, modo), 1, len(sistema)),
+        ('carregar_dados', sistema.carregar_dados, 1, len(sistema)),
+        ('listar_transacoes', lambda: sistema.listar_transacoes(mes, ano), repeticoes, do_mes),
+        ('listar_para_gerenciar', lambda: sistema.listar_transacoes_para_gerenciar(mes, ano), repeticoes, do_mes),
+        ('analisar_gastos', lambda: sistema.analisar_gastos(mes, ano), repeticoes, 1),
+        ('prever_proximo_mes', sistema.prever_proximo_mes, repeticoes, 1),
+        ('previsao_holt_6m', lambda: sistema.calcular_previsao(12, 6, 'holt'), repeticoes, 1),
+        ('gerar_recomendacoes', sistema.gerar_recomendacoes, repeticoes, 1),
+        ('dashboard_simples', sistema.dashboard_simples, repeticoes, 1),
+        ('consultar_pagina', lambda: sistema.consultar_transacoes(limite=50), repeticoes, 50),
+        ('consultar_filtros', lambda: sistema.consultar_transacoes(
+            categoria='Alimentação', valor_min=100, data_inicial=f"{ano}-01-01", limite=50), repeticoes, 50),
+        ('buscar_transacoes', lambda: sistema.buscar_transacoes('posto shell'), repeticoes, 1),
+        ('validar_categoria', validar_categorias, repeticoes, 3),
+        ('sugerir_categoria', lambda: sistema.sugerir_categoria('UBER *TRIP', 'despesa'), repeticoes, 1),
+        ('adicionar_transacao', lambda: sistema.adicionar_transacao(
+            'despesa', 10.0, 'Outros', 'bench', fim.isoformat()), repeticoes, 1),
+        ('adicionar_em_lote', lambda: sistema.adicionar_em_lote([dict(t) for t in lote]), 1, TAMANHO_LOTE),
+        ('atualizar_transacao', lambda: sistema.atualizar_transacao(next(para_editar), {'valor': 11.0}),
+         repeticoes, 1),
+        ('remover_transacao', lambda: sistema.remover_transacao(next(para_remover)), repeticoes, 1),
+        ('importar_linhas', lambda: importar_linhas(sistema, extrato), 1, TAMANHO_LOTE),
+        ('web_pagina', web_pagina, repeticoes, 50),
+        ('web_analytics', web_analytics, repeticoes, 1),
+        ('salvar_dados', sistema.salvar_dados, 1, len(sistema)),
+    ]
+
+
+def executar_suite(quantidade, pasta, modos, anos=5, semente=42, fim=None, repeticoes=5, memoria=True):
+    """Gera o histórico uma vez e mede todas as operações em cada modo"""
+    fim = fim or date.today()
+    os.makedirs(pasta, exist_ok=True)
+    arquivo = os.path.join(pasta, 'bench.json')
+    resultado = {
+        'versao_resultado': VERSAO_RESULTADO,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'parametros': {'linhas': quantidade, 'anos': anos, 'semente': semente, 'fim': fim.isoformat(),
+                       'repeticoes': repeticoes, 'memoria': memoria},
+        'modos': {},
+    }
+    for modo in modos:
+        print(f"⏳ {modo}: gerando {quantidade:,} transações...".replace(',', '.'))
+        _limpar(arquivo)
+        gravar_sinteticos(arquivo, quantidade, modo, anos, semente, fim)
+        # Primeira abertura fora da medição (aquece o cache de disco do sistema operacional)
+        sistema = _sem_saida(lambda: FinTrack(arquivo, modo))
+        medidas = {}
+        for nome, funcao, vezes, itens in operacoes(sistema, arquivo, modo, fim, repeticoes):
+            medidas[nome] = medir(funcao, vezes, itens, memoria)
+        resultado['modos'][modo] = medidas
+        sistema.flush()
+    _limpar(arquivo)
+    return resultado
+
+
+def imprimir_resultado(resultado):
+    """Tabelas de latência (e pico de memória, se medido) por operação e modo"""
+    modos = list(resultado['modos'])
+    operacoes_medidas = list(resultado['modos'][modos[0]])
+    print(f"\n{'Operação':<24}" + ''.join(f"{modo + ' (s)':>18}" for modo in modos))
+    print("-" * (24 + 18 * len(modos)))
+    for operacao in operacoes_medidas:
+        print(f"{operacao:<24}" + ''.join(
+            f"{resultado['modos'][modo][operacao]['latencia']:>18.4f}" for modo in modos))
+    if resultado['parametros']['memoria']:
+        print(f"\n{'Pico de memória':<24}" + ''.join(f"{modo + ' (MB)':>18}" for modo in modos))
+        print("-" * (24 + 18 * len(modos)))
+        for operacao in operacoes_medidas:
+            print(f"{operacao:<24}" + ''.join(
+                f"{resultado['modos'][modo][operacao]['pico_memoria'] / 2**20:>18.1f}" for modo in modos))
+
+
+def comparar_resultados(antes, depois, tolerancia=0.2):
+    """Compara dois JSON de resultado; retorna [(modo, operação, antes, depois, razão)] das regressões
+
+    Regressão = latência mínima mais de `tolerancia` (20%) acima da anterior.
+    Usa o mínimo de cada medida, menos sensível a ruído que a mediana.
+    """
+    diferentes = [p for p in ('linhas', 'anos', 'semente', 'fim')
+                  if antes['parametros'].get(p) != depois['parametros'].get(p)]
+    if diferentes:
+        print(f"⚠️  Históricos gerados com {', '.join(diferentes)} diferentes; a comparação é só indicativa")
+    regressoes = []
+    print(f"\n{'Modo':<14}{'Operação':<24}{'antes (s)':>12}{'depois (s)':>12}{'razão':>9}")
+    print("-" * 71)
+    for modo, medidas in depois['modos'].items():
+        for operacao, medida in medidas.items():
+            anterior = antes['modos'].get(modo, {}).get(operacao)
+            if anterior is None:
+                continue
+            razao = medida['minimo'] / anterior['minimo'] if anterior['minimo'] > 0 else float('inf')
+            marca = ''
+            if razao > 1 + tolerancia:
+                marca = ' 🔴'
+                regressoes.append((modo, operacao, anterior['minimo'], medida['minimo'], razao))
+            elif razao < 1 - tolerancia:
+                marca = ' 🟢'
+            print(f"{modo:<14}{operacao:<24}{anterior['minimo']:>12.4f}{medida['minimo']:>12.4f}{razao:>8.2f}x{marca}")
+    return regressoes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark das operações do FinTrack")
+    parser.add_argument('--linhas', type=int, default=1_000_000)
+    parser.add_argument('--anos', type=int, default=5)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--fim', type=date.fromisoformat, default=None,
+                        help="data final AAAA-MM-DD (padrão: hoje; previsão e dashboard usam o mês atual)")
+    parser.add_argument('--modos', default='json,binario,sqlite', help="separados por vírgula")
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--sem-memoria', action='store_true', help="não mede o pico de memória (mais rápido)")
+    parser.add_argument('--pasta', default='fintrack_bench')
+    parser.add_argument('--saida', help="grava o resultado em JSON")
+    parser.add_argument('--rotulo', default='', help="identifica a versão medida no JSON")
+    parser.add_argument('--comparar', nargs=2, metavar=('ANTES', 'DEPOIS'))
+    parser.add_argument('--tolerancia', type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.comparar:
+        with open(args.comparar[0], 'r', encoding='utf-8') as f:
+            antes = json.load(f)
+        with open(args.comparar[1], 'r', encoding='utf-8') as f:
+            depois = json.load(f)
+        regressoes = comparar_resultados(antes, depois, args.tolerancia)
+        print(f"\n{'🔴' if regressoes else '✅'} {len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}")
+        sys.exit(1 if regressoes else 0)
+
+    resultado = executar_suite(args.linhas, args.pasta, args.modos.split(','), args.anos, args.semente,
+                               args.fim, args.repeticoes, not args.sem_memoria)
+    resultado['rotulo'] = args.rotulo
+    imprimir_resultado(resultado)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultado gravado em {args.saida}")
@@ -0,0 +1,152 @@
+# Busca textual do FinTrack: índice invertido sobre descrição e categoria
+# Sem acentos e sem diferença de maiúsculas ("alimentação" == "alimentacao");
+# cada termo da consulta casa com as palavras que começam com ele.
+
+import bisect
+import gc
+import heapq
+import re
+import unicodedata
+
+from fintrack_datas import ordinal_da_data
+from fintrack_incremental import VisaoIncremental
+
+_PALAVRA = re.compile(r'\w+')
+
+
+def _tabela_sem_acentos():
+    """Tabela para str.translate: letras latinas acentuadas -> letra base"""
+    tabela = {}
+    for codigo in range(0xC0, 0x250):
+        decomposto = unicodedata.normalize('NFKD', chr(codigo))
+        base = ''.join(c for c in decomposto if not unicodedata.combining(c))
+        if base and base != chr(codigo):
+            tabela[codigo] = base
+    return tabela
+
+
+_SEM_ACENTOS = _tabela_sem_acentos()
+
+
+def normalizar_texto(texto):
+    """Minúsculas e sem acentos: 'Alimentação' -> 'alimentacao'"""
+    texto = texto.lower()
+    if texto.isascii():
+        return texto
+    return texto.translate(_SEM_ACENTOS)
+
+
+def palavras(texto):
+    """Palavras normalizadas de um texto, sem repetição"""
+    return set(_PALAVRA.findall(normalizar_texto(texto)))
+
+
+class IndiceBusca(VisaoIncremental):
+    """Índice invertido palavra -> IDs, sincronizado pela versão do FinTrack
+
+    Como o MotorAnalytics, é montado uma vez e depois atualizado só com as
+    transações alteradas (FinTrack.alteracoes_desde). As consultas por
+    prefixo usam o vocabulário ordenado (bisect) em vez de varrer palavras.
+    """
+    def __init__(self, sistema):
+        super().__init__(sistema)
+        self._ids_da_palavra = {}     # palavra -> set de IDs
+        self._palavras_do_id = {}     # id -> palavras indexadas (para remover na edição)
+        self._vocabulario = []        # palavras em ordem, refeito só quando muda
+        self._vocabulario_mudou = False
+        self._cache = {}              # texto -> palavras (descrições e categorias se repetem)
+
+    def _palavras_do_texto(self, texto):
+        encontradas = self._cache.get(texto)
+        if encontradas is None:
+            if len(self._cache) >= 100000:
+                self._cache.clear()
+            encontradas = self._cache[texto] = frozenset(_PALAVRA.findall(normalizar_texto(texto)))
+        return encontradas
+
+    def _adicionar(self, transacao):
+        encontradas = self._palavras_do_texto(transacao['descricao']) | self._palavras_do_texto(transacao['categoria'])
+        self._palavras_do_id[transacao['id']] = encontradas
+        for palavra in encontradas:
+            ids = self._ids_da_palavra.get(palavra)
+            if ids is None:
+                ids = self._ids_da_palavra[palavra] = set()
+                self._vocabulario_mudou = True
+            ids.add(transacao['id'])
+
+    def _remover(self, transacao_id):
+        for palavra in self._palavras_do_id.pop(transacao_id, ()):
+            ids = self._ids_da_palavra[palavra]
+            ids.discard(transacao_id)
+            if not ids:
+                del self._ids_da_palavra[palavra]
+                self._vocabulario_mudou = True
+
+    def _montar(self, transacoes):
+        self._ids_da_palavra = {}
+        self._palavras_do_id = {}
+        # Milhares de sets pequenos de uma vez: o coletor de ciclos só atrasaria a montagem
+        coletor_ativo = gc.isenabled()
+        gc.disable()
+        try:
+            for t in transacoes:
+                self._adicionar(t)
+        finally:
+            if coletor_ativo:
+                gc.enable()
+        self._vocabulario_mudou = True
+
+    def _aplicar(self, atuais, removidas):
+        for transacao_id in removidas:
+            self._remover(transacao_id)
+        for t in atuais:
+            self._remover(t['id'])
+            self._adicionar(t)
+
+    def _ids_com_prefixo(self, prefixo):
+        """IDs de todas as palavras que começam com o prefixo"""
+        if self._vocabulario_mudou:
+            self._vocabulario = sorted(self._ids_da_palavra)
+            self._vocabulario_mudou = False
+        inicio = bisect.bisect_left(self._vocabulario, prefixo)
+        fim = bisect.bisect_left(self._vocabulario, prefixo + '\U0010ffff', inicio)
+        if fim - inicio == 1:
+            return self._ids_da_palavra[self._vocabulario[inicio]]
+        ids = set()
+        for palavra in self._vocabulario[inicio:fim]:
+            ids.update(self._ids_da_palavra[palavra])
+        return ids
+
+    def buscar(self, consulta, inicio=0, limite=50, tipo=None, data_inicial=None, data_final=None,
+               ids_permitidos=None):
+        """IDs que casam com todos os termos, filtrados e ordenados por data (mais recentes primeiro)
+
+        Retorna (IDs da página, total encontrado). Datas 'AAAA-MM-DD', limites inclusivos.
+        `ids_permitidos` (ex.: os IDs dos meses do período) restringe antes dos filtros linha a linha.
+        """
+        self.sincronizar()
+        termos = sorted(set(_PALAVRA.findall(normalizar_texto(consulta))))
+        if not termos:
+            return [], 0
+
+        conjuntos = sorted((self._ids_com_prefixo(termo) for termo in termos), key=len)
+        if ids_permitidos is not None:
+            conjuntos.insert(0, ids_permitidos)
+        encontrados = conjuntos[0]
+        for ids in conjuntos[1:]:
+            encontrados = encontrados & ids
+            if not encontrados:
+                return [], 0
+
+        ordinal = self.sistema.ordinal_da_transacao
+        if tipo is not None or data_inicial or data_final:
+            ordinal_ini = ordinal_da_data(data_inicial) if data_inicial else None
+            ordinal_fim = ordinal_da_data(data_final) if data_final else None
+            obter = self.sistema.obter_transacao
+            encontrados = [i for i in encontrados
+                           if (tipo is None or obter(i)['tipo'] == tipo)
+                           and (ordinal_ini is None or ordinal(i) >= ordinal_ini)
+                           and (ordinal_fim is None or ordinal(i) <= ordinal_fim)]
+
+        pagina = heapq.nlargest(inicio + limite, encontrados, key=lambda i: (ordinal(i), i))[inicio:]
+        return pagina, len(encontrados)
@@ -0,0 +1,223 @@
+# Categorias do FinTrack: cadastro aprendido, busca aproximada e sugestão automática
+# O cadastro junta as categorias padrão, as criadas pelo usuário (gravadas em
+# <base>.categorias.json) e as que aparecem nos dados. Nomes digitados são
+# comparados sem acentos/maiúsculas e por trigramas ("Alimentacao", "Alimentaçao"
+# e "Alimentção" chegam a "Alimentação"). O classificador aprende descrição ->
+# categoria com as próprias transações (Naive Bayes) e rotula importações em lote.
+
+import json
+import math
+from collections import Counter, defaultdict
+
+from fintrack_armazenamento import escrever_atomico, trava_arquivo
+from fintrack_busca import normalizar_texto, palavras
+from fintrack_incremental import VisaoIncremental
+
+# Semelhança mínima (coeficiente de Dice dos trigramas) para sugerir uma categoria
+SEMELHANCA_MINIMA = 0.45
+
+
+def chave_categoria(nome):
+    """Forma usada para comparar nomes: 'Alimentação ' -> 'alimentacao'"""
+    return ' '.join(normalizar_texto(nome).split())
+
+
+def _trigramas(chave):
+    """Trigramas da chave com bordas ('  alimentacao ' -> '  a', ' al', 'ali', ...)"""
+    texto = f"  {chave} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class RegistroCategorias:
+    """Categorias conhecidas por tipo, com índice de trigramas para a busca aproximada
+
+    `conhecer` só inclui em memória (padrão e categorias vindas dos dados);
+    `registrar` também grava as novas em disco, sob a trava do FinTrack.
+    """
+    def __init__(self, arquivo, padrao, arquivo_trava=None):
+        self.arquivo = arquivo
+        self.arquivo_trava = arquivo_trava or arquivo + '.lock'
+        self._padrao = padrao
+        self.recarregar()
+
+    def _ler(self):
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"⚠️  Erro ao carregar categorias: {e}")
+            return {}
+
+    def recarregar(self):
+        """Volta ao padrão + categorias gravadas (as vindas dos dados são conhecidas de novo)"""
+        self._nomes = defaultdict(dict)                           # tipo -> {chave: nome}
+        self._indice = defaultdict(lambda: defaultdict(set))      # tipo -> trigrama -> chaves
+        for tipo, nomes in self._padrao.items():
+            for nome in nomes:
+                self.conhecer(tipo, nome)
+        for tipo, nomes in self._ler().items():
+            for nome in nomes:
+                self.conhecer(tipo, nome)
+
+    def conhecer(self, tipo, nome):
+        """Inclui a categoria em memória; retorna True se ela era nova"""
+        chave = chave_categoria(nome)
+        nomes = self._nomes[tipo]
+        if not chave or chave in nomes:
+            return False
+        nomes[chave] = nome
+        indice = self._indice[tipo]
+        for trigrama in _trigramas(chave):
+            indice[trigrama].add(chave)
+        return True
+
+    def registrar(self, pares):
+        """Aprende categorias (tipo, nome) usadas em transações; grava só se houver novas"""
+        novas = [(tipo, nome) for tipo, nome in set(pares) if self.conhecer(tipo, nome)]
+        if not novas:
+            return []
+        with trava_arquivo(self.arquivo_trava):
+            # Relê para não apagar o que outra sessão registrou
+            gravadas = self._ler()
+            for tipo, nome in novas:
+                lista = gravadas.setdefault(tipo, [])
+                if chave_categoria(nome) not in map(chave_categoria, lista):
+                    lista.append(nome)
+            escrever_atomico(self.arquivo, json.dumps(gravadas, indent=2, ensure_ascii=False).encode('utf-8'))
+        return novas
+
+    def categorias(self, tipo):
+        """Nomes conhecidos do tipo: padrão primeiro, depois as aprendidas"""
+        return list(self._nomes[tipo].values())
+
+    def procurar(self, nome, tipo, limite=3):
+        """Retorna (nome cadastrado, []) se existir, senão (None, sugestões parecidas)"""
+        chave = chave_categoria(nome)
+        nomes = self._nomes[tipo]
+        if chave in nomes:
+            return nomes[chave], []
+
+        # Conta trigramas em comum só com as categorias que compartilham algum
+        trigramas = _trigramas(chave)
+        comuns = Counter()
+        indice = self._indice[tipo]
+        for trigrama in trigramas:
+            comuns.update(indice.get(trigrama, ()))
+        pontuacoes = []
+        for candidata, quantidade in comuns.items():
+            semelhanca = 2 * quantidade / (len(trigramas) + len(_trigramas(candidata)))
+            # Uma contida na outra ("Alim" / "Alimentação") também é sugestão
+            if semelhanca >= SEMELHANCA_MINIMA or (len(chave) >= 3 and (chave in candidata or candidata in chave)):
+                pontuacoes.append((-semelhanca, nomes[candidata]))
+        pontuacoes.sort()
+        return None, [nome for _, nome in pontuacoes[:limite]]
+
+
+class ClassificadorCategorias(VisaoIncremental):
+    """Naive Bayes (multinomial) palavras da descrição -> categoria, separado por tipo
+
+    Treinado com as transações do próprio FinTrack e, como o IndiceBusca,
+    sincronizado pela versão: depois da montagem só as transações alteradas
+    são retiradas/recontadas.
+    """
+    def __init__(self, sistema):
+        super().__init__(sistema)
+        self._zerar()
+
+    def _zerar(self):
+        self._exemplo_do_id = {}                      # id -> (tipo, categoria, palavras)
+        self._documentos = defaultdict(Counter)       # tipo -> categoria -> transações
+        self._palavras = defaultdict(Counter)         # (tipo, categoria) -> palavra -> ocorrências
+        self._total_palavras = Counter()              # (tipo, categoria) -> soma das ocorrências
+        self._vocabulario = defaultdict(Counter)      # tipo -> palavra -> ocorrências
+        self._cache = {}                              # descrição -> palavras úteis
+
+    def _palavras_uteis(self, texto):
+        """Palavras da descrição sem números soltos e letras isoladas"""
+        encontradas = self._cache.get(texto)
+        if encontradas is None:
+            if len(self._cache) >= 100000:
+                self._cache.clear()
+            encontradas = self._cache[texto] = frozenset(
+                p for p in palavras(texto) if len(p) > 1 and not p.isdigit())
+        return encontradas
+
+    def _contar(self, tipo, categoria, encontradas, sinal):
+        self._documentos[tipo][categoria] += sinal
+        if not self._documentos[tipo][categoria]:
+            del self._documentos[tipo][categoria]
+        contagem = self._palavras[(tipo, categoria)]
+        vocabulario = self._vocabulario[tipo]
+        for palavra in encontradas:
+            contagem[palavra] += sinal
+            vocabulario[palavra] += sinal
+            if not vocabulario[palavra]:
+                del vocabulario[palavra]
+        self._total_palavras[(tipo, categoria)] += sinal * len(encontradas)
+
+    def _exemplo(self, transacao):
+        return transacao['tipo'], transacao['categoria'], self._palavras_uteis(transacao.get('descricao') or '')
+
+    def _adicionar(self, transacao):
+        exemplo = self._exemplo_do_id[transacao['id']] = self._exemplo(transacao)
+        self._contar(*exemplo, 1)
+
+    def _remover(self, transacao_id):
+        exemplo = self._exemplo_do_id.pop(transacao_id, None)
+        if exemplo is not None:
+            self._contar(*exemplo, -1)
+
+    def _montar(self, transacoes):
+        self._zerar()
+        # Exemplos iguais (mesma categoria e palavras) são contados de uma vez
+        repeticoes = Counter()
+        for t in transacoes:
+            exemplo = self._exemplo_do_id[t['id']] = self._exemplo(t)
+            repeticoes[exemplo] += 1
+        for exemplo, quantidade in repeticoes.items():
+            self._contar(*exemplo, quantidade)
+
+    def _aplicar(self, atuais, removidas):
+        for transacao_id in removidas:
+            self._remover(transacao_id)
+        for t in atuais:
+            self._remover(t['id'])
+            self._adicionar(t)
+
+    def _prever(self, tipo, encontradas):
+        """(categoria, probabilidade) mais provável, ou None sem palavras já vistas no tipo"""
+        vocabulario = self._vocabulario.get(tipo)
+        documentos = self._documentos.get(tipo)
+        if not vocabulario or not documentos:
+            return None
+        conhecidas = [p for p in encontradas if p in vocabulario]
+        if not conhecidas:
+            return None
+
+        total_documentos = sum(documentos.values())
+        tamanho_vocabulario = len(vocabulario)
+        pontuacoes = {}
+        for categoria, quantidade in documentos.items():
+            contagem = self._palavras[(tipo, categoria)]
+            denominador = self._total_palavras[(tipo, categoria)] + tamanho_vocabulario
+            pontuacoes[categoria] = math.log(quantidade / total_documentos) + sum(
+                math.log((contagem[p] + 1) / denominador) for p in conhecidas)
+        melhor = max(pontuacoes, key=pontuacoes.get)
+        maior = pontuacoes[melhor]
+        probabilidade = 1 / sum(math.exp(p - maior) for p in pontuacoes.values())
+        return melhor, probabilidade
+
+    def classificar(self, itens, confianca_minima=0.5):
+        """Lista de (descrição, tipo) -> categorias previstas (None quando incerto)"""
+        self.sincronizar()
+        previstas = {}
+        resultado = []
+        for descricao, tipo in itens:
+            chave = (tipo, self._palavras_uteis(descricao or ''))
+            if chave not in previstas:
+                previsao = self._prever(*chave)
+                previstas[chave] = previsao[0] if previsao and previsao[1] >= confianca_minima else None
+            resultado.append(previstas[chave])
+        return resultado
@@ -0,0 +1,426 @@
+# Linha de comando não interativa do FinTrack (scripts, cron, jobs em lote)
+# Cada chamada abre os dados uma vez, executa o subcomando e sai; com --json a
+# saída é JSON e as mensagens do FinTrack vão para o stderr.
+# Uso: python fintrack_cli.py [--arquivo fintrack_data.json] [--modo json] [--json] <subcomando> ...
+#   adicionar (add)     receita|despesa VALOR [--categoria C] [--descricao D] [--data DD/MM/AAAA]
+#   listar (list)       [--mes M --ano A | --de DATA --ate DATA] [--tipo] [--categoria] [--limite 50] ...
+#   relatorio (report)  [--mes M] [--ano A]
+#   previsao (forecast) [--meses 3] [--horizonte 1] [--modelo media_movel]
+#   remover (delete)    ID [ID ...]
+#   importar (import)   extrato.csv|extrato.ofx
+#   exportar (export)   [--formato json|csv] [--saida arquivo] [--de DATA] [--ate DATA] [--tipo T]
+#   lote (batch)        operacoes.jsonl|-   (uma operação JSON por linha, gravadas em lote)
+#   alertas (alerts)    [--mes M] [--ano A] [--categoria C | --geral] [--limite 50]
+# Também funciona como `python fintrack.py <subcomando> ...`.
+# Códigos de saída: 0 ok, 1 erro em alguma operação, 2 uso incorreto.
+
+import argparse
+import calendar
+import contextlib
+import csv
+import json
+import sys
+from datetime import datetime
+
+from fintrack import FinTrack
+from fintrack_armazenamento import MODOS_ARMAZENAMENTO
+from fintrack_exibicao import exibir_alertas, exibir_analise, exibir_previsao, formatar_brl, formatar_data, texto_alerta
+from fintrack_importacao import importar_extrato, imprimir_relatorio
+from fintrack_previsao import MODELOS
+
+CAMPOS_EXPORTACAO = ['id', 'data', 'tipo', 'categoria', 'valor', 'descricao']
+CAMPOS_EDITAVEIS = ('tipo', 'valor', 'categoria', 'descricao', 'data')
+
+# Nomes aceitos no campo "op" do arquivo de lote
+OPERACOES_LOTE = {
+    'adicionar': 'adicionar', 'add': 'adicionar',
+    'editar': 'editar', 'edit': 'editar',
+    'remover': 'remover', 'delete': 'remover',
+}
+
+
+class ErroComando(ValueError):
+    """Entrada inválida para um subcomando (vira código de saída 1)"""
+
+
+def _emitir(args, dados, texto=None):
+    """JSON no stdout com --json; senão imprime o texto (ou chama a função que imprime)"""
+    if args.json:
+        json.dump(dados, args.stdout, ensure_ascii=False, indent=2)
+        args.stdout.write('\n')
+    elif callable(texto):
+        texto()
+    elif texto is not None:
+        print(texto)
+
+
+def _imprimir_tabela(transacoes, total):
+    print(f"{'ID':>7}  {'Data':<10}  {'Tipo':<8} {'Categoria':<18} {'Valor':>16}  Descrição")
+    for t in transacoes:
+        print(f"{t['id']:>7}  {formatar_data(t['data']):<10}  {t['tipo']:<8} {t['categoria'][:18]:<18} "
+              f"{formatar_brl(t['valor'], 13):>16}  {t['descricao']}")
+    print(f"-- {len(transacoes)} de {total} transação(ões)")
+
+
+def _data(sistema, texto):
+    data, erro = sistema.validar_data(texto)
+    if erro:
+        raise ErroComando(f"{erro}: {texto}")
+    return data
+
+
+def validar_adicoes(sistema, itens):
+    """[(linha, campos)] -> (transações válidas, [(linha, motivo)], [(linha, aviso)])
+
+    As datas são validadas de uma vez; sem categoria, a sugestão vem da descrição
+    (classificador em lote) e o que ficar incerto vira 'Outros'.
+    """
+    datas = sistema.validar_datas([str(campos.get('data') or '') for _, campos in itens])
+    validas, erros, avisos = [], [], []
+    for (linha, campos), (data, erro_data) in zip(itens, datas):
+        try:
+            tipo = str(campos.get('tipo', '')).strip().lower()
+            if tipo not in ('receita', 'despesa'):
+                raise ErroComando(f"Tipo inválido: {campos.get('tipo')!r} (use receita ou despesa)")
+            valor = sistema.validar_valor(campos.get('valor', ''))
+            if erro_data:
+                raise ErroComando(erro_data)
+            categoria = str(campos.get('categoria') or '').strip() or None
+            if categoria:
+                categoria, aviso = sistema.validar_categoria(categoria, tipo)
+                if aviso:
+                    avisos.append((linha, aviso))
+        except ValueError as e:
+            erros.append((linha, str(e)))
+            continue
+        validas.append({'tipo': tipo, 'valor': valor, 'categoria': categoria,
+                        'descricao': str(campos.get('descricao') or '').strip()[:200], 'data': data})
+
+    sem_categoria = [t for t in validas if t['categoria'] is None]
+    if sem_categoria:
+        sugeridas = sistema.classificar_descricoes([(t['descricao'], t['tipo']) for t in sem_categoria])
+        for transacao, categoria in zip(sem_categoria, sugeridas):
+            transacao['categoria'] = categoria or 'Outros'
+    return validas, erros, avisos
+
+
+def validar_edicao(sistema, campos, tipo_atual):
+    """Campos de uma edição de lote -> campos validados (só os informados)"""
+    desconhecidos = set(campos) - set(CAMPOS_EDITAVEIS)
+    if desconhecidos:
+        raise ErroComando(f"Campos não editáveis: {', '.join(sorted(desconhecidos))}")
+    validados = {}
+    if 'tipo' in campos:
+        if campos['tipo'] not in ('receita', 'despesa'):
+            raise ErroComando(f"Tipo inválido: {campos['tipo']!r}")
+        validados['tipo'] = campos['tipo']
+    if 'valor' in campos:
+        validados['valor'] = sistema.validar_valor(campos['valor'])
+    if 'data' in campos:
+        validados['data'] = _data(sistema, str(campos['data']))
+    if 'descricao' in campos:
+        validados['descricao'] = str(campos['descricao']).strip()[:200]
+    if 'categoria' in campos:
+        categoria, aviso = sistema.validar_categoria(str(campos['categoria']), validados.get('tipo', tipo_atual))
+        if categoria is None:
+            raise ErroComando(aviso)
+        validados['categoria'] = categoria
+    return validados
+
+
+def _filtros(sistema, args):
+    """Filtros de consultar_transacoes a partir das opções comuns de listar/exportar"""
+    filtros = {campo: getattr(args, campo) for campo in ('tipo', 'categoria', 'valor_min', 'valor_max')
+               if getattr(args, campo, None) is not None}
+    if args.mes or args.ano:
+        if not (args.mes and args.ano):
+            raise ErroComando("Informe --mes e --ano juntos")
+        filtros['data_inicial'] = f"{args.ano:04d}-{args.mes:02d}-01"
+        filtros['data_final'] = f"{args.ano:04d}-{args.mes:02d}-{calendar.monthrange(args.ano, args.mes)[1]:02d}"
+    if args.de:
+        filtros['data_inicial'] = _data(sistema, args.de)
+    if args.ate:
+        filtros['data_final'] = _data(sistema, args.ate)
+    return filtros
+
+
+def cmd_adicionar(sistema, args):
+    validas, erros, avisos = validar_adicoes(sistema, [(1, {
+        'tipo': args.tipo, 'valor': args.valor, 'categoria': args.categoria,
+        'descricao': args.descricao, 'data': args.data})])
+    if erros:
+        raise ErroComando(erros[0][1])
+    for _, aviso in avisos:
+        print(aviso, file=sys.stderr)
+    transacao = sistema.adicionar_em_lote(validas)[0]
+    _emitir(args, transacao, f"✅ #{transacao['id']} {transacao['tipo']} {formatar_brl(transacao['valor'])} "
+                             f"| {transacao['categoria']} | {formatar_data(transacao['data'])}")
+    return 0
+
+
+def cmd_listar(sistema, args):
+    transacoes, total = sistema.consultar_transacoes(
+        inicio=args.inicio, limite=args.limite, ordenar_por=args.ordenar, decrescente=not args.crescente,
+        **_filtros(sistema, args))
+    _emitir(args, {'total': total, 'transacoes': transacoes}, lambda: _imprimir_tabela(transacoes, total))
+    return 0
+
+
+def cmd_relatorio(sistema, args):
+    hoje = datetime.now()
+    mes, ano = args.mes or hoje.month, args.ano or hoje.year
+    analise = sistema.calcular_analise(mes, ano)
+    _emitir(args, analise, lambda: exibir_analise(analise, mes, ano))
+    return 0
+
+
+def cmd_previsao(sistema, args):
+    previsao = sistema.calcular_previsao(args.meses, args.horizonte, args.modelo)
+    dados = previsao
+    if previsao:
+        # Chaves (tipo, categoria) não existem em JSON
+        dados = dict(previsao, categorias=[{'tipo': tipo, 'categoria': categoria, 'valores': valores}
+                                           for (tipo, categoria), valores in previsao['categorias'].items()])
+    _emitir(args, dados, lambda: exibir_previsao(previsao))
+    return 0
+
+
+def cmd_remover(sistema, args):
+    removidas = sistema.remover_em_lote(args.ids)
+    encontrados = {t['id'] for t in removidas}
+    nao_encontradas = [i for i in args.ids if i not in encontrados]
+    _emitir(args, {'removidas': [t['id'] for t in removidas], 'nao_encontradas': nao_encontradas},
+            f"🗑️  {len(removidas)} transação(ões) removida(s)"
+            + (f"; não encontrada(s): {', '.join(map(str, nao_encontradas))}" if nao_encontradas else ""))
+    return 1 if nao_encontradas else 0
+
+
+def cmd_importar(sistema, args):
+    with open(args.extrato, 'rb') as f:
+        relatorio = importar_extrato(sistema, f, args.extrato)
+    _emitir(args, relatorio, lambda: imprimir_relatorio(relatorio))
+    return 1 if relatorio['erros'] else 0
+
+
+def cmd_exportar(sistema, args):
+    transacoes, total = sistema.consultar_transacoes(
+        limite=max(len(sistema), 1), ordenar_por='data', decrescente=False, **_filtros(sistema, args))
+    saida = open(args.saida, 'w', encoding='utf-8', newline='') if args.saida else args.stdout
+    try:
+        if args.formato == 'csv':
+            escritor = csv.writer(saida)
+            escritor.writerow(CAMPOS_EXPORTACAO)
+            escritor.writerows([t[campo] for campo in CAMPOS_EXPORTACAO] for t in transacoes)
+        else:
+            json.dump([{campo: t[campo] for campo in CAMPOS_EXPORTACAO} for t in transacoes],
+                      saida, ensure_ascii=False, indent=2)
+            saida.write('\n')
+    finally:
+        if args.saida:
+            saida.close()
+    print(f"✅ {total} transação(ões) exportada(s)" + (f" para {args.saida}" if args.saida else ""),
+          file=sys.stderr)
+    return 0
+
+
+def ler_operacoes(arquivo):
+    """Gera (linha, operação) de um arquivo JSON Lines (ou com uma lista JSON); '#' comenta"""
+    conteudo = arquivo.read()
+    if conteudo.lstrip().startswith('['):
+        yield from enumerate(json.loads(conteudo), 1)
+        return
+    for numero, linha in enumerate(conteudo.splitlines(), 1):
+        linha = linha.strip()
+        if linha and not linha.startswith('#'):
+            try:
+                yield numero, json.loads(linha)
+            except json.JSONDecodeError as e:
+                yield numero, ErroComando(f"JSON inválido: {e}")
+
+
+def _aplicar_grupo(sistema, operacao, itens, resultado):
+    """Aplica uma sequência de operações do mesmo tipo com uma única gravação"""
+    if operacao == 'adicionar':
+        validas, erros, avisos = validar_adicoes(sistema, itens)
+        resultado['erros'] += erros
+        resultado['avisos'] += avisos
+        resultado['adicionadas'] += [t['id'] for t in sistema.adicionar_em_lote(validas)]
+    elif operacao == 'remover':
+        ids = {}
+        for linha, campos in itens:
+            try:
+                ids[int(campos['id'])] = linha
+            except (KeyError, TypeError, ValueError):
+                resultado['erros'].append((linha, "Campo 'id' ausente ou inválido"))
+        removidas = {t['id'] for t in sistema.remover_em_lote(list(ids))}
+        resultado['removidas'] += sorted(removidas)
+        resultado['erros'] += [(linha, f"Transação #{i} não encontrada") for i, linha in ids.items()
+                               if i not in removidas]
+    else:
+        alteracoes = []
+        for linha, campos in itens:
+            try:
+                transacao_id = int(campos['id'])
+            except (KeyError, TypeError, ValueError):
+                resultado['erros'].append((linha, "Campo 'id' ausente ou inválido"))
+                continue
+            try:
+                atual = sistema.obter_transacao(transacao_id)
+                if atual is None:
+                    raise ErroComando(f"Transação #{transacao_id} não encontrada")
+                novos = {k: v for k, v in campos.items() if k not in ('op', 'id')}
+                alteracoes.append((transacao_id, validar_edicao(sistema, novos, atual['tipo'])))
+            except ValueError as e:
+                resultado['erros'].append((linha, str(e)))
+        resultado['editadas'] += [t['id'] for t in sistema.atualizar_em_lote(alteracoes)]
+
+
+def cmd_lote(sistema, args):
+    if args.operacoes == '-':
+        operacoes = list(ler_operacoes(sys.stdin))
+    else:
+        with open(args.operacoes, 'r', encoding='utf-8') as arquivo:
+            operacoes = list(ler_operacoes(arquivo))
+
+    resultado = {'adicionadas': [], 'editadas': [], 'removidas': [], 'erros': [], 'avisos': []}
+    # Operações seguidas do mesmo tipo são gravadas juntas; a ordem entre grupos é mantida
+    grupo, itens = None, []
+    for linha, campos in operacoes + [(None, None)]:
+        operacao = None
+        if isinstance(campos, ErroComando):
+            resultado['erros'].append((linha, str(campos)))
+            continue
+        if campos is not None:
+            operacao = OPERACOES_LOTE.get(str(campos.get('op', '')).lower()) if isinstance(campos, dict) else None
+            if operacao is None:
+                resultado['erros'].append((linha, f"Operação desconhecida: {campos!r:.60}"))
+                continue
+        if operacao != grupo and itens:
+            _aplicar_grupo(sistema, grupo, itens, resultado)
+            itens = []
+        grupo = operacao
+        if campos is not None:
+            itens.append((linha, campos))
+
+    resultado['erros'].sort()
+
+    def imprimir():
+        print(f"✅ {len(resultado['adicionadas'])} adicionada(s), {len(resultado['editadas'])} editada(s), "
+              f"{len(resultado['removidas'])} removida(s)")
+        for linha, motivo in resultado['erros']:
+            print(f"❌ Linha {linha}: {motivo}")
+        if resultado['avisos']:
+            print(f"⚠️  {len(resultado['avisos'])} aviso(s) de categoria")
+    _emitir(args, resultado, imprimir)
+    return 1 if resultado['erros'] else 0
+
+
+def cmd_alertas(sistema, args):
+    alertas = sistema.historico_alertas(args.ano, args.mes, '' if args.geral else args.categoria, args.limite)
+
+    def imprimir():
+        if not alertas:
+            print("📭 Nenhum alerta de orçamento")
+        for alerta in alertas:
+            print(f"{alerta['data_hora'].replace('T', ' ')}  {texto_alerta(alerta)}")
+    _emitir(args, alertas, imprimir)
+    return 0
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog='fintrack', description="FinTrack pela linha de comando")
+    parser.add_argument('--arquivo', default='fintrack_data.json', help="arquivo de dados (padrão: %(default)s)")
+    parser.add_argument('--modo', choices=list(MODOS_ARMAZENAMENTO), help="modo de armazenamento")
+    parser.add_argument('--json', action='store_true', help="saída em JSON")
+    sub = parser.add_subparsers(dest='comando', required=True, metavar='subcomando')
+
+    def filtros(p, periodo_mensal=True):
+        if periodo_mensal:
+            p.add_argument('--mes', type=int, choices=range(1, 13), metavar='1-12')
+            p.add_argument('--ano', type=int)
+        p.add_argument('--de', help="data inicial (DD/MM/AAAA ou AAAA-MM-DD)")
+        p.add_argument('--ate', help="data final (inclusiva)")
+        p.add_argument('--tipo', choices=['receita', 'despesa'])
+        p.add_argument('--categoria')
+        p.add_argument('--valor-min', dest='valor_min', type=float)
+        p.add_argument('--valor-max', dest='valor_max', type=float)
+
+    p = sub.add_parser('adicionar', aliases=['add'], help="adiciona uma receita ou despesa")
+    p.add_argument('tipo', choices=['receita', 'despesa'])
+    p.add_argument('valor')
+    p.add_argument('--categoria', help="em branco: sugerida pela descrição")
+    p.add_argument('--descricao', default='')
+    p.add_argument('--data', default='', help="DD/MM/AAAA ou AAAA-MM-DD (padrão: hoje)")
+    p.set_defaults(funcao=cmd_adicionar)
+
+    p = sub.add_parser('listar', aliases=['list'], help="lista transações com filtros e paginação")
+    filtros(p)
+    p.add_argument('--inicio', type=int, default=0)
+    p.add_argument('--limite', type=int, default=50)
+    p.add_argument('--ordenar', choices=['data', 'valor', 'id', 'categoria', 'tipo'], default='data')
+    p.add_argument('--crescente', action='store_true')
+    p.set_defaults(funcao=cmd_listar)
+
+    p = sub.add_parser('relatorio', aliases=['report'], help="análise de gastos do mês")
+    p.add_argument('--mes', type=int, choices=range(1, 13), metavar='1-12')
+    p.add_argument('--ano', type=int)
+    p.set_defaults(funcao=cmd_relatorio)
+
+    p = sub.add_parser('previsao', aliases=['forecast'], help="previsão dos próximos meses")
+    p.add_argument('--meses', type=int, default=3, help="meses de histórico")
+    p.add_argument('--horizonte', type=int, default=1, choices=range(1, 13), metavar='1-12')
+    p.add_argument('--modelo', choices=list(MODELOS), default='media_movel')
+    p.set_defaults(funcao=cmd_previsao)
+
+    p = sub.add_parser('remover', aliases=['delete'], help="remove transações pelo ID (sem confirmação)")
+    p.add_argument('ids', type=int, nargs='+')
+    p.set_defaults(funcao=cmd_remover)
+
+    p = sub.add_parser('importar', aliases=['import'], help="importa extrato CSV/OFX")
+    p.add_argument('extrato')
+    p.set_defaults(funcao=cmd_importar)
+
+    p = sub.add_parser('exportar', aliases=['export'], help="exporta transações em JSON ou CSV")
+    filtros(p)
+    p.add_argument('--formato', choices=['json', 'csv'], default='json')
+    p.add_argument('--saida', help="arquivo de destino (padrão: stdout)")
+    p.set_defaults(funcao=cmd_exportar)
+
+    p = sub.add_parser('lote', aliases=['batch'], help="aplica um arquivo de operações (JSON Lines) de uma vez")
+    p.add_argument('operacoes', help="arquivo .jsonl ou - para stdin")
+    p.set_defaults(funcao=cmd_lote)
+
+    p = sub.add_parser('alertas', aliases=['alerts'], help="histórico de alertas de orçamento")
+    p.add_argument('--mes', type=int, choices=range(1, 13), metavar='1-12')
+    p.add_argument('--ano', type=int)
+    p.add_argument('--categoria')
+    p.add_argument('--geral', action='store_true', help="só o orçamento geral")
+    p.add_argument('--limite', type=int, default=50)
+    p.set_defaults(funcao=cmd_alertas)
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    args.stdout = sys.stdout
+    # Com --json, qualquer mensagem do FinTrack vai para o stderr e o stdout fica só com o JSON
+    desvio = contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext()
+    with desvio:
+        try:
+            sistema = FinTrack(args.arquivo, args.modo)
+            alertas_vistos = len(sistema.orcamentos.alertas)
+            codigo = args.funcao(sistema, args)
+            sistema.flush()
+            # Alertas de orçamento disparados pelo comando (no stderr quando --json)
+            novos = len(sistema.orcamentos.alertas) - alertas_vistos
+            if novos > 0:
+                exibir_alertas(reversed(sistema.historico_alertas(limite=novos)))
+            return codigo
+        except (ValueError, OSError) as e:
+            # ErroComando, ConflitoDeVersao e valores inválidos são ValueError
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+# Datas do FinTrack: validação sem strptime e forma ordinal para comparar/ordenar
+# As transações continuam gravadas como 'AAAA-MM-DD'; o ordinal (date.toordinal)
+# é calculado uma vez ao carregar/inserir e usado nos filtros e ordenações.
+
+import re
+from datetime import date
+
+# Ordinal de 01/01/1970, para converter ordinais em datetime64 (dias desde a época)
+ORDINAL_EPOCA = date(1970, 1, 1).toordinal()
+
+# Compilados uma vez (antes eram recompilados por re.match a cada validação)
+_PADRAO_DMA = re.compile(r'(\d{2})[/-](\d{2})[/-](\d{4})')   # DD/MM/AAAA ou DD-MM-AAAA
+_PADRAO_AMD = re.compile(r'(\d{4})[/-](\d{2})[/-](\d{2})')   # AAAA-MM-DD
+
+
+def ordinal_da_data(data):
+    """'AAAA-MM-DD' -> número de dias (date.toordinal), sem passar por strptime"""
+    return date(int(data[:4]), int(data[5:7]), int(data[8:10])).toordinal()
+
+
+def data_do_ordinal(ordinal):
+    """Ordinal -> 'AAAA-MM-DD'"""
+    return date.fromordinal(ordinal).isoformat()
+
+
+def normalizar_data(texto, ano_maximo):
+    """Converte DD/MM/AAAA, DD-MM-AAAA ou AAAA-MM-DD em 'AAAA-MM-DD'
+
+    Retorna (data, None) ou (None, mensagem de erro).
+    """
+    texto = texto.strip()
+    match = _PADRAO_DMA.match(texto)
+    if match:
+        dia, mes, ano = match.groups()
+    else:
+        match = _PADRAO_AMD.fullmatch(texto)
+        if not match:
+            return None, "Formato inválido. Use: DD/MM/AAAA ou AAAA-MM-DD"
+        ano, mes, dia = match.groups()
+
+    try:
+        data = date(int(ano), int(mes), int(dia))
+    except ValueError:
+        return None, "Data inválida (dia/mês incorretos)"
+
+    # Verifica se data não é muito antiga ou futura
+    if data.year < 2000 or data.year > ano_maximo:
+        return None, f"Ano inválido: {data.year}"
+
+    return data.isoformat(), None
+
+
+def validar_datas(textos, hoje=None):
+    """Valida várias datas de uma vez; retorna uma lista de (data, erro) na mesma ordem
+
+    Textos vazios viram a data de hoje. Cada texto distinto é validado uma só vez
+    (extratos e lotes costumam repetir as mesmas datas).
+    """
+    hoje = hoje or date.today()
+    ano_maximo = hoje.year + 1
+    vistos = {}
+    resultado = []
+    for texto in textos:
+        validado = vistos.get(texto)
+        if validado is None:
+            if not texto or not texto.strip():
+                validado = (hoje.isoformat(), None)
+            else:
+                validado = normalizar_data(texto, ano_maximo)
+            vistos[texto] = validado
+        resultado.append(validado)
+    return resultado
@@ -0,0 +1,298 @@
+# Renderização dos resultados do FinTrack (terminal e texto para a web)
+# As funções aqui só formatam; os números vêm dos métodos calcular_* do FinTrack.
+
+# Troca separadores do formato americano (1,234.56) pelo brasileiro (1.234,56) em uma passada
+_TABELA_BRL = str.maketrans({',': '.', '.': ','})
+
+
+def formatar_numero(valor, largura=0):
+    """Número com 2 casas no padrão brasileiro, alinhado à direita em `largura`"""
+    return f"{valor:>{largura},.2f}".translate(_TABELA_BRL)
+
+
+def formatar_brl(valor, largura=0):
+    """Valor monetário: R$ 1.234,56"""
+    return f"R$ {formatar_numero(valor, largura)}"
+
+
+def formatar_data(data):
+    """'AAAA-MM-DD' -> 'DD/MM/AAAA'"""
+    return f"{data[8:10]}/{data[5:7]}/{data[:4]}"
+
+
+# Colunas da tabela de transações na web
+COLUNAS_TABELA = ['id', 'data', 'tipo', 'categoria', 'valor', 'descricao']
+
+
+class QuadroTransacoes:
+    """DataFrame colunar (índice id) das linhas que já passaram pela tela, sincronizado pela versão do FinTrack
+
+    A consulta paginada escolhe a página; o quadro reaproveita as linhas já
+    montadas e, quando a versão muda, descarta só as alteradas desde a última
+    (alteracoes_desde), que voltam atualizadas na próxima página em que
+    aparecerem. A data é formatada apenas na fatia visível.
+    """
+    LIMITE_LINHAS = 10000
+
+    def __init__(self):
+        self.versao = None
+        self.df = None
+
+    def sincronizar(self, sistema):
+        if self.versao == sistema.versao:
+            return
+        alteradas = None if self.versao is None else sistema.alteracoes_desde(self.versao)
+        if alteradas is None or self.df is None or len(self.df) > self.LIMITE_LINHAS:
+            # Recarga do arquivo (ou quadro grande demais): recomeça vazio
+            self.df = None
+        else:
+            presentes = [transacao_id for transacao_id in dict.fromkeys(alteradas) if transacao_id in self.df.index]
+            if presentes:
+                self.df = self.df.drop(presentes)
+        self.versao = sistema.versao
+
+    def pagina(self, sistema, transacoes):
+        """Página da consulta (na ordem recebida) -> DataFrame com a data formatada"""
+        import pandas as pd   # só a interface web depende do pandas
+
+        self.sincronizar(sistema)
+        if not transacoes:
+            return pd.DataFrame(columns=COLUNAS_TABELA)
+        novas = [t for t in transacoes if self.df is None or t['id'] not in self.df.index]
+        if novas:
+            extra = pd.DataFrame(novas, columns=COLUNAS_TABELA).set_index('id')
+            self.df = extra if self.df is None else pd.concat([self.df, extra])
+        fatia = self.df.loc[[t['id'] for t in transacoes]].reset_index()
+        fatia['data'] = fatia['data'].map(formatar_data)
+        return fatia[COLUNAS_TABELA]
+
+
+def exibir_transacoes(resultado):
+    """Tabela de transações do mês (tela 'Listar Transações')"""
+    mes, ano, transacoes = resultado['mes'], resultado['ano'], resultado['transacoes']
+    if not transacoes:
+        print(f"\n📭 Nenhuma transação encontrada para {mes:02d}/{ano}")
+        return
+
+    print(f"\n📊 Transações de {mes:02d}/{ano}:")
+    print("-" * 90)
+    print(f"{'Data':<12} {'Tipo':<10} {'Categoria':<18} {'Valor':>12} {'Descrição':<30}")
+    print("-" * 90)
+
+    for t in transacoes:
+        simbolo = "➕ Receita" if t['tipo'] == 'receita' else "➖ Despesa"
+        valor_fmt = f"R$ {t['valor']:>8.2f}"
+        desc = t['descricao'][:27] + '...' if len(t['descricao']) > 30 else t['descricao']
+        print(f"{formatar_data(t['data']):<12} {simbolo:<10} {t['categoria']:<18} {valor_fmt:>12} {desc:<30}")
+
+    print("-" * 90)
+
+
+def exibir_transacoes_gerenciar(resultado):
+    """Tabela de transações com IDs (telas de editar/deletar)"""
+    mes, ano, transacoes = resultado['mes'], resultado['ano'], resultado['transacoes']
+    if not transacoes:
+        print(f"\n📭 Nenhuma transação encontrada para {mes:02d}/{ano}")
+        return
+
+    print(f"\n📋 Transações de {mes:02d}/{ano}:")
+    print("=" * 90)
+    print(f"{'ID':<5} {'Data':<12} {'Tipo':<10} {'Categoria':<18} {'Valor':>12} {'Descrição':<25}")
+    print("-" * 90)
+
+    for t in transacoes:
+        simbolo = "Receita" if t['tipo'] == 'receita' else "Despesa"
+        valor_fmt = f"R$ {t['valor']:>8.2f}"
+        desc = t['descricao'][:22] + '...' if len(t['descricao']) > 25 else t['descricao']
+        print(f"{t['id']:<5} {formatar_data(t['data']):<12} {simbolo:<10} {t['categoria']:<18} {valor_fmt:>12} {desc:<25}")
+
+    print("=" * 90)
+
+
+def exibir_busca(consulta, transacoes, total):
+    """Resultados da busca textual (mais recentes primeiro, com IDs)"""
+    if not transacoes:
+        print(f"\n📭 Nenhuma transação encontrada para '{consulta}'")
+        return
+
+    print(f"\n🔍 {total} transação(ões) para '{consulta}'" + (f" (mostrando {len(transacoes)})" if total > len(transacoes) else ""))
+    print("=" * 90)
+    print(f"{'ID':<5} {'Data':<12} {'Tipo':<10} {'Categoria':<18} {'Valor':>12} {'Descrição':<25}")
+    print("-" * 90)
+
+    for t in transacoes:
+        simbolo = "Receita" if t['tipo'] == 'receita' else "Despesa"
+        valor_fmt = f"R$ {t['valor']:>8.2f}"
+        desc = t['descricao'][:22] + '...' if len(t['descricao']) > 25 else t['descricao']
+        print(f"{t['id']:<5} {formatar_data(t['data']):<12} {simbolo:<10} {t['categoria']:<18} {valor_fmt:>12} {desc:<25}")
+
+    print("=" * 90)
+
+
+def exibir_analise(analise, mes, ano):
+    """Relatório do módulo Analytics"""
+    if not analise:
+        print(f"\n📭 Nenhuma transação para analisar em {mes:02d}/{ano}")
+        return
+
+    print(f"\n{'='*90}")
+    print(f"💰 ANÁLISE FINANCEIRA - {mes:02d}/{ano}".center(90))
+    print(f"{'='*90}")
+    print(f"\n{'Receitas:':<20} {formatar_brl(analise['receitas'], 12)}")
+    print(f"{'Despesas:':<20} {formatar_brl(analise['despesas'], 12)}")
+    print(f"{'-'*90}")
+
+    saldo_fmt = formatar_brl(abs(analise['saldo']), 12)
+    if analise['saldo'] >= 0:
+        print(f"{'Saldo Positivo:':<20} {saldo_fmt} ✅")
+    else:
+        print(f"{'Saldo Negativo:':<20} {saldo_fmt} ⚠️")
+
+    if analise['despesas'] > 0:
+        print(f"\n📈 Distribuição de Gastos por Categoria:")
+        print("-" * 90)
+        for cat, valor, percentual in analise['categorias_ordenadas']:
+            barra = '█' * int(percentual / 2)
+            print(f"  {cat:<18} {formatar_brl(valor, 8):>15} ({percentual:5.1f}%) {barra}")
+
+        cat_maior, valor_maior = analise['maior_categoria']
+        print(f"\n🔍 INSIGHT: Maior gasto em '{cat_maior}' - {formatar_brl(valor_maior)}")
+
+        if analise['alerta_concentracao']:
+            print(f"⚠️  ALERTA: '{cat_maior}' representa {(valor_maior / analise['despesas'] * 100):.1f}% dos gastos!")
+
+        if analise['taxa_economia'] is not None:
+            print(f"\n💹 Taxa de Economia: {analise['taxa_economia']:.1f}% {analise['classificacao_economia']}")
+
+
+def exibir_previsao(previsao):
+    """Relatório do módulo Preditivo"""
+    if not previsao:
+        print(f"\n{'='*90}")
+        print("🔮 PREVISÃO PARA O PRÓXIMO MÊS".center(90))
+        print(f"{'='*90}")
+        print("\n⚠️  Dados insuficientes para fazer previsão precisa.")
+        print("💡 Dica: Registre transações por pelo menos 2 meses para ativar este recurso.")
+        return
+
+    saldo_previsto = previsao['saldo_previsto']
+    print(f"\n{'='*90}")
+    print(f"🔮 PREVISÃO PARA {previsao['meses'][0]['mes']}".center(90))
+    print(f"{'='*90}")
+    print(f"\n📊 Baseado em {len(previsao['historico'])} meses de histórico: {', '.join(previsao['historico'])}")
+    print(f"\n{'Receita esperada:':<25} {formatar_brl(previsao['receita_prevista'], 12)} (±{formatar_numero(previsao['desvio_receitas'])})")
+    print(f"{'Despesa esperada:':<25} {formatar_brl(previsao['despesa_prevista'], 12)} (±{formatar_numero(previsao['desvio_despesas'])})")
+    proximo = previsao['meses'][0]
+    if proximo.get('receita_recorrente') or proximo.get('despesa_recorrente'):
+        print(f"🔁 Recorrentes já conhecidas: receitas {formatar_brl(proximo['receita_recorrente'])}, "
+              f"despesas {formatar_brl(proximo['despesa_recorrente'])}")
+    print(f"{'-'*90}")
+
+    if saldo_previsto >= 0:
+        print(f"{'Saldo previsto:':<25} {formatar_brl(saldo_previsto, 12)} ✅")
+        print(f"\n🎉 Parabéns! Você deve terminar o mês com saldo positivo!")
+    else:
+        print(f"{'Déficit previsto:':<25} {formatar_brl(abs(saldo_previsto), 12)} ⚠️")
+        print(f"\n⚠️  ALERTA: Possível déficit de {formatar_brl(abs(saldo_previsto))}!")
+        print(f"💡 Sugestão: Reduza gastos ou busque receita extra de {formatar_brl(abs(saldo_previsto))}")
+
+    if len(previsao['meses']) > 1:
+        print(f"\n📅 Próximos {len(previsao['meses'])} meses ({previsao['nome_modelo']}):")
+        print("-" * 90)
+        print(f"{'Mês':<10} {'Receita':>18} {'Despesa':>18} {'Saldo':>18}")
+        for m in previsao['meses']:
+            print(f"{m['mes']:<10} {formatar_numero(m['receita'], 18)} {formatar_numero(m['despesa'], 18)} {formatar_numero(m['saldo'], 18)}")
+
+
+def exibir_recorrentes(regras, frequencias):
+    """Tabela das regras recorrentes"""
+    if not regras:
+        print("\n📭 Nenhuma transação recorrente cadastrada")
+        return
+
+    print(f"\n{'ID':<5} {'Tipo':<8} {'Categoria':<16} {'Valor':>16}  {'Frequência':<18} {'Início':<10}  {'Fim':<10}  Descrição")
+    print("-" * 110)
+    for r in regras:
+        frequencia = frequencias[r['frequencia']]
+        if r['intervalo'] > 1:
+            frequencia = f"{frequencia} (x{r['intervalo']})" if r['frequencia'] != 'dias' else f"A cada {r['intervalo']} dias"
+        fim = formatar_data(r['fim']) if r['fim'] else '-'
+        print(f"{r['id']:<5} {r['tipo']:<8} {r['categoria'][:16]:<16} {formatar_brl(r['valor'], 13):>16}  "
+              f"{frequencia:<18} {formatar_data(r['inicio']):<10}  {fim:<10}  {r['descricao']}")
+
+
+def texto_alerta(alerta):
+    """Frase de um alerta de orçamento (terminal e notificação da web)"""
+    nome = alerta['categoria'] or 'geral'
+    icone = '🚨' if alerta['limiar'] >= 100 else '⚠️ '
+    return (f"{icone} Orçamento {nome} de {alerta['mes']:02d}/{alerta['ano']} em {alerta['percentual']:.0f}% "
+            f"({formatar_brl(alerta['gasto'])} de {formatar_brl(alerta['limite'])})")
+
+
+def exibir_alertas(alertas):
+    """Alertas recém-disparados (sem saída quando não há nenhum)"""
+    for alerta in alertas:
+        print(texto_alerta(alerta))
+
+
+def exibir_orcamentos(situacao, mes, ano):
+    """Gasto de cada orçamento no mês, com barra de uso"""
+    if not situacao:
+        print("\n📭 Nenhum orçamento definido")
+        return
+
+    print(f"\n💰 ORÇAMENTOS - {mes:02d}/{ano}")
+    print("-" * 90)
+    for item in situacao:
+        nome = item['categoria'] or 'GERAL'
+        preenchido = min(int(item['percentual'] / 5), 20)
+        status = "🔴" if item['percentual'] >= 100 else ("🟡" if item['percentual'] >= 70 else "🟢")
+        print(f"{status} {nome[:18]:<18} {formatar_brl(item['gasto'], 12)} de {formatar_brl(item['limite'], 12)} "
+              f"[{'█' * preenchido}{'░' * (20 - preenchido)}] {item['percentual']:5.1f}%")
+
+
+def exibir_recomendacoes(recomendacoes):
+    """Lista do módulo Recomendador"""
+    print(f"\n{'='*90}")
+    print("💡 RECOMENDAÇÕES INTELIGENTES".center(90))
+    print(f"{'='*90}\n")
+
+    for i, rec in enumerate(recomendacoes, 1):
+        print(f"{i}. {rec['prioridade']} | {rec['titulo']}")
+        print(f"   → {rec['acao']}\n")
+
+    if not recomendacoes:
+        print("✅ Suas finanças estão equilibradas! Continue assim! 🎉\n")
+
+
+def exibir_dashboard(analise):
+    """Dashboard textual (uso do orçamento e status)"""
+    print(f"\n{'='*90}")
+    print("📊 DASHBOARD FINTRACK".center(90))
+    print(f"{'='*90}\n")
+
+    uso_orcamento = analise['uso_orcamento']
+    if uso_orcamento is not None:
+        barra_cheia = int(min(uso_orcamento, 100) / 2)
+        barra_vazia = 50 - barra_cheia
+
+        print(f"💳 Uso do Orçamento Mensal: {uso_orcamento:.1f}%")
+        print(f"[{'█'*barra_cheia}{'░'*barra_vazia}] {formatar_numero(analise['despesas'])}/{formatar_numero(analise['receitas'])}")
+
+        if uso_orcamento <= 70:
+            print("✅ Uso saudável do orçamento")
+        elif uso_orcamento <= 90:
+            print("⚠️  Atenção: Orçamento em 90%")
+        elif uso_orcamento <= 100:
+            print("🔴 ALERTA: Orçamento quase esgotado!")
+        else:
+            print("🔴🔴 CRÍTICO: Você excedeu seu orçamento!")
+
+        print()
+
+    # Status geral
+    print("📈 Status Financeiro:")
+    if analise['saldo'] >= 0:
+        print(f"   ✅ Saldo positivo de {formatar_brl(analise['saldo'])}")
+    else:
+        print(f"   ⚠️  Saldo negativo de {formatar_brl(abs(analise['saldo']))}")
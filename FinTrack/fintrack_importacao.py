@@ -0,0 +1,231 @@
+# Importação em lote de extratos bancários (CSV/OFX) para o FinTrack
+# Uso: python fintrack_importacao.py extrato.csv|extrato.ofx
+
+import csv
+import io
+import re
+import unicodedata
+from collections import Counter
+
+# Nomes de coluna aceitos no cabeçalho do CSV (comparados sem acento e em minúsculas)
+ALIASES_COLUNAS = {
+    'data': ['data', 'date', 'dt', 'data lancamento', 'data movimento', 'data da transacao'],
+    'valor': ['valor', 'value', 'amount', 'quantia', 'valor (r$)', 'valor r$'],
+    'descricao': ['descricao', 'historico', 'description', 'memo', 'lancamento', 'detalhes'],
+    'categoria': ['categoria', 'category'],
+    'tipo': ['tipo', 'type'],
+}
+
+TIPOS_ACEITOS = {
+    'receita': 'receita', 'credito': 'receita', 'credit': 'receita', 'c': 'receita', 'entrada': 'receita',
+    'despesa': 'despesa', 'debito': 'despesa', 'debit': 'despesa', 'd': 'despesa', 'saida': 'despesa',
+}
+
+
+def _normalizar(texto):
+    """Minúsculas e sem acentos (para comparar cabeçalhos e descrições)"""
+    texto = unicodedata.normalize('NFKD', str(texto).strip().lower())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def abrir_texto(arquivo_binario):
+    """Envolve um arquivo binário em texto, detectando UTF-8 ou Latin-1 pelo início"""
+    inicio = arquivo_binario.read(65536)
+    arquivo_binario.seek(0)
+    try:
+        inicio.decode('utf-8-sig')
+        codificacao = 'utf-8-sig'
+    except UnicodeDecodeError:
+        codificacao = 'latin-1'
+    return io.TextIOWrapper(arquivo_binario, encoding=codificacao, newline='')
+
+
+def ler_csv(arquivo):
+    """Gera (número da linha, campos brutos) de um CSV, uma linha por vez"""
+    amostra = arquivo.read(8192)
+    arquivo.seek(0)
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=';,\t')
+    except csv.Error:
+        dialeto = csv.excel
+
+    leitor = csv.reader(arquivo, dialeto)
+    cabecalho = next(leitor, None)
+    if not cabecalho:
+        return
+
+    colunas = {}
+    for posicao, nome in enumerate(cabecalho):
+        nome = _normalizar(nome)
+        for campo, aliases in ALIASES_COLUNAS.items():
+            if nome in aliases and campo not in colunas:
+                colunas[campo] = posicao
+
+    faltando = [c for c in ('data', 'valor') if c not in colunas]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes no CSV: {', '.join(faltando)}")
+
+    for numero, linha in enumerate(leitor, 2):
+        if not any(c.strip() for c in linha):
+            continue
+        yield numero, {campo: linha[posicao] if posicao < len(linha) else ''
+                       for campo, posicao in colunas.items()}
+
+
+def ler_ofx(arquivo):
+    """Gera (número da linha, campos brutos) para cada <STMTTRN> de um OFX (SGML ou XML)"""
+    padrao_tag = re.compile(r'<(\w+)>([^<\r\n]*)')
+    atual = None
+    inicio = 0
+    for numero, linha in enumerate(arquivo, 1):
+        for tag, valor in padrao_tag.findall(linha):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                atual, inicio = {}, numero
+            elif atual is not None and valor.strip():
+                atual[tag] = valor.strip()
+        if atual is not None and '</STMTTRN>' in linha.upper():
+            data = atual.get('DTPOSTED', '')[:8]
+            yield inicio, {
+                'data': f"{data[:4]}-{data[4:6]}-{data[6:8]}" if len(data) == 8 else data,
+                'valor': atual.get('TRNAMT', ''),
+                'descricao': atual.get('MEMO') or atual.get('NAME', ''),
+                'tipo': atual.get('TRNTYPE', ''),
+            }
+            atual = None
+
+
+def _chave_duplicata(transacao):
+    """Identifica a mesma movimentação vinda de fontes diferentes"""
+    return (transacao['data'], transacao['tipo'], round(float(transacao['valor']), 2),
+            _normalizar(transacao.get('descricao', '')))
+
+
+def validar_linha(sistema, campos, datas_validadas=None):
+    """Converte campos brutos em transação usando as validações do FinTrack
+
+    Retorna (transação, aviso) ou lança ValueError com o motivo da rejeição.
+    `datas_validadas` (opcional) guarda as datas já validadas entre linhas.
+    """
+    bruto = str(campos.get('valor', '')).strip()
+    negativo = bruto.startswith('-') or bruto.endswith('-') or (bruto.startswith('(') and bruto.endswith(')'))
+    valor = sistema.validar_valor(bruto.strip('-()'))
+    if valor == 0:
+        raise ValueError("Valor zerado")
+
+    tipo_informado = _normalizar(campos.get('tipo', ''))
+    if tipo_informado in TIPOS_ACEITOS:
+        tipo = TIPOS_ACEITOS[tipo_informado]
+    else:
+        # Extratos normalmente trazem débitos com sinal negativo
+        tipo = 'despesa' if negativo else 'receita'
+
+    texto_data = str(campos.get('data', ''))
+    if datas_validadas is None:
+        data, erro_data = sistema.validar_data(texto_data)
+    else:
+        if texto_data not in datas_validadas:
+            datas_validadas[texto_data] = sistema.validar_data(texto_data)
+        data, erro_data = datas_validadas[texto_data]
+    if erro_data or not texto_data.strip():
+        raise ValueError(erro_data or "Data ausente")
+
+    # Sem categoria no extrato: fica None e importar_linhas rotula pela descrição
+    categoria, aviso = None, None
+    if str(campos.get('categoria') or '').strip():
+        categoria, aviso = sistema.validar_categoria(campos['categoria'], tipo)
+        if categoria is None:
+            raise ValueError(aviso)
+
+    transacao = {
+        'tipo': tipo,
+        'valor': valor,
+        'categoria': categoria,
+        'descricao': str(campos.get('descricao', '')).strip()[:200],
+        'data': data,
+    }
+    return transacao, aviso
+
+
+def importar_linhas(sistema, linhas):
+    """Valida um fluxo de (número, campos), ignora duplicatas e grava tudo de uma vez
+
+    Retorna um relatório com importadas, duplicadas, erros [(linha, motivo)], avisos
+    e categorizadas (linhas sem categoria rotuladas pelo classificador; o resto vira 'Outros').
+    """
+    # (ano, mes) -> chaves já gravadas; só os meses que aparecem no extrato são lidos
+    existentes = {}
+    datas_validadas = {}
+    validas = []
+    relatorio = {'importadas': 0, 'duplicadas': 0, 'erros': [], 'avisos': [], 'categorizadas': 0}
+
+    for numero, campos in linhas:
+        try:
+            transacao, aviso = validar_linha(sistema, campos, datas_validadas)
+        except (ValueError, KeyError) as e:
+            relatorio['erros'].append((numero, str(e)))
+            continue
+
+        # Cada linha existente "absorve" uma linha igual do extrato (reimportar não duplica)
+        mes = (int(transacao['data'][:4]), int(transacao['data'][5:7]))
+        if mes not in existentes:
+            existentes[mes] = Counter(map(_chave_duplicata, sistema.transacoes_do_mes(mes[1], mes[0])))
+        chave = _chave_duplicata(transacao)
+        if existentes[mes][chave] > 0:
+            existentes[mes][chave] -= 1
+            relatorio['duplicadas'] += 1
+            continue
+
+        if aviso:
+            relatorio['avisos'].append((numero, aviso))
+        validas.append(transacao)
+
+    sem_categoria = [t for t in validas if t['categoria'] is None]
+    if sem_categoria:
+        sugeridas = sistema.classificar_descricoes([(t['descricao'], t['tipo']) for t in sem_categoria])
+        for transacao, categoria in zip(sem_categoria, sugeridas):
+            transacao['categoria'] = categoria or 'Outros'
+        relatorio['categorizadas'] = sum(1 for categoria in sugeridas if categoria)
+
+    sistema.adicionar_em_lote(validas)
+    relatorio['importadas'] = len(validas)
+    return relatorio
+
+
+def importar_extrato(sistema, arquivo_binario, nome_arquivo):
+    """Importa um arquivo CSV ou OFX (decidido pela extensão) já aberto em modo binário"""
+    texto = abrir_texto(arquivo_binario)
+    if nome_arquivo.lower().endswith('.ofx'):
+        linhas = ler_ofx(texto)
+    else:
+        linhas = ler_csv(texto)
+    return importar_linhas(sistema, linhas)
+
+
+def imprimir_relatorio(relatorio, max_erros=20):
+    """Resumo da importação no terminal"""
+    print(f"\n✅ {relatorio['importadas']} transação(ões) importada(s)")
+    if relatorio['duplicadas']:
+        print(f"🔁 {relatorio['duplicadas']} duplicada(s) ignorada(s)")
+    if relatorio.get('categorizadas'):
+        print(f"🏷️  {relatorio['categorizadas']} categorizada(s) automaticamente pela descrição")
+    if relatorio['erros']:
+        print(f"❌ {len(relatorio['erros'])} linha(s) com erro:")
+        for numero, motivo in relatorio['erros'][:max_erros]:
+            print(f"   Linha {numero}: {motivo}")
+        if len(relatorio['erros']) > max_erros:
+            print(f"   ... e mais {len(relatorio['erros']) - max_erros}")
+    if relatorio['avisos']:
+        print(f"⚠️  {len(relatorio['avisos'])} aviso(s) de categoria")
+
+
+if __name__ == "__main__":
+    import sys
+    from fintrack import FinTrack
+
+    if len(sys.argv) < 2:
+        print("Uso: python fintrack_importacao.py extrato.csv|extrato.ofx")
+        sys.exit(1)
+    sistema = FinTrack()
+    with open(sys.argv[1], 'rb') as f:
+        imprimir_relatorio(importar_extrato(sistema, f, sys.argv[1]))
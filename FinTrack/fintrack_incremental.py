@@ -0,0 +1,45 @@
+# Base das visões derivadas das transações do FinTrack (analytics, busca, classificador)
+# Cada visão é montada uma vez e depois sincronizada pela versão dos dados: só as
+# transações alteradas desde a última versão vista (FinTrack.alteracoes_desde) são
+# reaplicadas; sem esse histórico (recarga do arquivo, base nova) é remontada inteira.
+
+
+class VisaoIncremental:
+    """Sincronização pela versão do FinTrack
+
+    As subclasses implementam `_montar(transacoes)` (todas as transações) e
+    `_aplicar(atuais, removidas)` (versões atuais das alteradas e IDs que
+    deixaram de existir) e chamam `sincronizar()` antes de cada consulta.
+    """
+    def __init__(self, sistema):
+        self.sistema = sistema
+        self.versao = None
+
+    def sincronizar(self):
+        """Atualiza a visão com as mudanças desde a última versão vista"""
+        if self.versao == self.sistema.versao:
+            return
+        alteradas = None if self.versao is None else self.sistema.alteracoes_desde(self.versao)
+        if alteradas is None:
+            # Carrega todos os anos: a versão depois disso já inclui as transações lidas
+            transacoes = self.sistema.transacoes
+            versao = self.sistema.versao
+            self._montar(transacoes)
+        else:
+            # Versão de antes: anos carregados durante a leitura entram na próxima sincronização
+            versao = self.sistema.versao
+            atuais, removidas = [], []
+            for transacao_id in dict.fromkeys(alteradas):
+                transacao = self.sistema.obter_transacao(transacao_id)
+                if transacao is None:
+                    removidas.append(transacao_id)
+                else:
+                    atuais.append(transacao)
+            self._aplicar(atuais, removidas)
+        self.versao = versao
+
+    def _montar(self, transacoes):
+        raise NotImplementedError
+
+    def _aplicar(self, atuais, removidas):
+        raise NotImplementedError
@@ -0,0 +1,313 @@
+# Instrumentação do FinTrack: tempos por operação, erros, tamanho dos arquivos e perfis
+# Desligada, não custa nada: os métodos só são embrulhados com cronômetro quando
+# ativar() é chamado (ou com FINTRACK_METRICAS=1), e desativar() devolve os originais.
+# As métricas saem no formato texto do Prometheus: em arquivo (FINTRACK_METRICAS_ARQUIVO,
+# para o textfile collector do node_exporter) e/ou em http://localhost:<porta>/metrics
+# (FINTRACK_METRICAS_PORTA). Perfis sob demanda: FINTRACK_PERFIL=cprofile|tracemalloc
+# no CLI ou capturar_perfil() em volta de qualquer bloco.
+
+import atexit
+import bisect
+import cProfile
+import functools
+import inspect
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import weakref
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limites (segundos) dos baldes do histograma de duração
+BALDES = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Métodos de E/S medidos em cada classe de armazenamento (os que ela mesma define)
+METODOS_ARMAZENAMENTO = ('carregar', 'salvar', 'registrar', 'registrar_lote', 'registrar_varios',
+                         'indice', 'carregar_ano', 'flush',
+                         '_ler', '_gravar', '_gravar_tudo', '_ler_snapshot', '_ler_ano')
+
+
+def _alvos():
+    """[(dono, nome do atributo, rótulo)] de tudo que é medido quando ativado"""
+    # Importados aqui: os módulos do FinTrack também importam este
+    import fintrack
+    import fintrack_armazenamento
+    import fintrack_exibicao
+
+    alvos = []
+    for nome, valor in vars(fintrack.FinTrack).items():
+        if not nome.startswith('_') and inspect.isfunction(valor):
+            alvos.append((fintrack.FinTrack, nome, f"FinTrack.{nome}"))
+    classes = list(fintrack_armazenamento.MODOS_ARMAZENAMENTO.values()) + [fintrack_armazenamento.ArmazenamentoAdiado]
+    for classe in classes:
+        for nome in METODOS_ARMAZENAMENTO:
+            if inspect.isfunction(vars(classe).get(nome)):
+                alvos.append((classe, nome, f"{classe.__name__}.{nome}"))
+    alvos.append((fintrack_exibicao.QuadroTransacoes, 'pagina', 'QuadroTransacoes.pagina'))
+    return alvos
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metricas:
+    """Registro das medidas do processo (um só: METRICAS)"""
+    def __init__(self):
+        self.ativo = False
+        self._trava = threading.Lock()
+        self._duracoes = {}            # operação -> {'baldes', 'soma', 'quantidade', 'maximo'}
+        self._erros = {}               # (operação, tipo do erro) -> quantidade
+        self._originais = {}           # (dono, nome) -> atributo original
+        self._sistemas = weakref.WeakSet()
+        self._exportando = False
+
+    def observar(self, operacao, segundos):
+        """Registra a duração de uma chamada"""
+        with self._trava:
+            medida = self._duracoes.get(operacao)
+            if medida is None:
+                medida = self._duracoes[operacao] = {'baldes': [0] * (len(BALDES) + 1), 'soma': 0.0,
+                                                     'quantidade': 0, 'maximo': 0.0}
+            medida['baldes'][bisect.bisect_left(BALDES, segundos)] += 1
+            medida['soma'] += segundos
+            medida['quantidade'] += 1
+            if segundos > medida['maximo']:
+                medida['maximo'] = segundos
+
+    def contar_erro(self, operacao, erro):
+        with self._trava:
+            chave = (operacao, type(erro).__name__)
+            self._erros[chave] = self._erros.get(chave, 0) + 1
+
+    def _cronometrar(self, rotulo, funcao):
+        @functools.wraps(funcao)
+        def cronometrada(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            except Exception as e:
+                self.contar_erro(rotulo, e)
+                raise
+            finally:
+                self.observar(rotulo, time.perf_counter() - inicio)
+        return cronometrada
+
+    def ativar(self):
+        """Passa a medir os métodos públicos do FinTrack e a E/S dos armazenamentos"""
+        with self._trava:
+            if self.ativo:
+                return
+            for dono, nome, rotulo in _alvos():
+                original = getattr(dono, nome)
+                self._originais[(dono, nome)] = original
+                setattr(dono, nome, self._cronometrar(rotulo, original))
+            self.ativo = True
+
+    def desativar(self):
+        """Devolve os métodos originais (as medidas já coletadas continuam)"""
+        with self._trava:
+            for (dono, nome), original in self._originais.items():
+                setattr(dono, nome, original)
+            self._originais.clear()
+            self.ativo = False
+
+    def zerar(self):
+        with self._trava:
+            self._duracoes.clear()
+            self._erros.clear()
+
+    def acompanhar(self, sistema):
+        """Inclui as medidas de estado do FinTrack (transações, arquivos, pendências)"""
+        self._sistemas.add(sistema)
+
+    def _copiar_duracoes(self):
+        with self._trava:
+            return {operacao: dict(medida, baldes=list(medida['baldes']))
+                    for operacao, medida in self._duracoes.items()}
+
+    def resumo(self):
+        """{operação: {'chamadas', 'total', 'media', 'maximo'}} em segundos, mais chamadas primeiro"""
+        duracoes = self._copiar_duracoes()
+        resumo = {}
+        for operacao in sorted(duracoes, key=lambda o: -duracoes[o]['quantidade']):
+            medida = duracoes[operacao]
+            resumo[operacao] = {
+                'chamadas': medida['quantidade'],
+                'total': medida['soma'],
+                'media': medida['soma'] / medida['quantidade'],
+                'maximo': medida['maximo'],
+            }
+        return resumo
+
+    def estado_dos_sistemas(self):
+        """[(arquivo de dados, modo, transações, gravações pendentes, {arquivo: bytes})]"""
+        estado = []
+        for sistema in list(self._sistemas):
+            armazenamento = sistema.armazenamento
+            pendentes = getattr(armazenamento, 'pendentes', 0)
+            estado.append((sistema.arquivo_dados, sistema.modo_armazenamento, len(sistema), pendentes,
+                           tamanhos_dos_arquivos(getattr(armazenamento, 'interno', armazenamento))))
+        return estado
+
+    def prometheus(self):
+        """Texto no formato de exposição do Prometheus"""
+        duracoes = self._copiar_duracoes()
+        with self._trava:
+            erros = dict(self._erros)
+        linhas = [
+            "# HELP fintrack_operacao_segundos Duração das chamadas (FinTrack e E/S do armazenamento)",
+            "# TYPE fintrack_operacao_segundos histogram",
+        ]
+        for operacao in sorted(duracoes):
+            medida = duracoes[operacao]
+            rotulo = f'operacao="{_escapar(operacao)}"'
+            acumulado = 0
+            for limite, quantidade in zip(BALDES + ('+Inf',), medida['baldes']):
+                acumulado += quantidade
+                linhas.append(f'fintrack_operacao_segundos_bucket{{{rotulo},le="{limite}"}} {acumulado}')
+            linhas.append(f"fintrack_operacao_segundos_sum{{{rotulo}}} {medida['soma']:.6f}")
+            linhas.append(f"fintrack_operacao_segundos_count{{{rotulo}}} {medida['quantidade']}")
+
+        linhas += ["# HELP fintrack_erros_total Exceções por operação e tipo",
+                   "# TYPE fintrack_erros_total counter"]
+        for (operacao, erro), quantidade in sorted(erros.items()):
+            linhas.append(f'fintrack_erros_total{{operacao="{_escapar(operacao)}",erro="{_escapar(erro)}"}} {quantidade}')
+
+        estado = self.estado_dos_sistemas()
+        linhas += ["# HELP fintrack_transacoes Transações no sistema",
+                   "# TYPE fintrack_transacoes gauge"]
+        for arquivo, modo, transacoes, _, _ in estado:
+            linhas.append(f'fintrack_transacoes{{arquivo="{_escapar(arquivo)}",modo="{modo}"}} {transacoes}')
+        linhas += ["# HELP fintrack_gravacoes_pendentes Mutações aguardando a gravação adiada",
+                   "# TYPE fintrack_gravacoes_pendentes gauge"]
+        for arquivo, modo, _, pendentes, _ in estado:
+            linhas.append(f'fintrack_gravacoes_pendentes{{arquivo="{_escapar(arquivo)}",modo="{modo}"}} {pendentes}')
+        linhas += ["# HELP fintrack_arquivo_bytes Tamanho dos arquivos de dados",
+                   "# TYPE fintrack_arquivo_bytes gauge"]
+        for _, _, _, _, tamanhos in estado:
+            for caminho, tamanho in sorted(tamanhos.items()):
+                linhas.append(f'fintrack_arquivo_bytes{{arquivo="{_escapar(caminho)}"}} {tamanho}')
+        return '\n'.join(linhas) + '\n'
+
+    def gravar_prometheus(self, caminho):
+        """Grava o texto de forma atômica (o coletor nunca lê um arquivo pela metade)"""
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+        os.replace(temporario, caminho)
+
+    def exportar(self, arquivo=None, intervalo=15.0, porta=None):
+        """Inicia (uma vez por processo) a gravação periódica do arquivo e/ou o endpoint /metrics"""
+        with self._trava:
+            if self._exportando:
+                return
+            self._exportando = True
+        if arquivo:
+            def gravar_periodicamente():
+                while True:
+                    time.sleep(intervalo)
+                    self._gravar_sem_erro(arquivo)
+            threading.Thread(target=gravar_periodicamente, name='fintrack-metricas', daemon=True).start()
+            atexit.register(self._gravar_sem_erro, arquivo)
+        if porta:
+            servidor = ThreadingHTTPServer(('127.0.0.1', int(porta)), _criar_manipulador(self))
+            threading.Thread(target=servidor.serve_forever, name='fintrack-metricas-http', daemon=True).start()
+
+    def _gravar_sem_erro(self, arquivo):
+        try:
+            self.gravar_prometheus(arquivo)
+        except OSError as e:
+            print(f"⚠️  Erro ao gravar métricas: {e}")
+
+
+def _criar_manipulador(metricas):
+    class ManipuladorMetricas(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            corpo = metricas.prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, formato, *args):
+            pass   # sem uma linha no terminal a cada coleta
+
+    return ManipuladorMetricas
+
+
+def tamanhos_dos_arquivos(armazenamento):
+    """{caminho: bytes} dos arquivos de dados de um armazenamento (os que existem)"""
+    caminhos = [valor for nome, valor in vars(armazenamento).items()
+                if nome.startswith('arquivo_') and isinstance(valor, str) and not valor.endswith('.lock')]
+    pasta = getattr(armazenamento, 'pasta', None)
+    if pasta and os.path.isdir(pasta):
+        caminhos += [os.path.join(pasta, nome) for nome in os.listdir(pasta)]
+    tamanhos = {}
+    for caminho in dict.fromkeys(caminhos):
+        try:
+            tamanhos[caminho] = os.path.getsize(caminho)
+        except OSError:
+            pass
+    return tamanhos
+
+
+METRICAS = Metricas()
+
+
+def configurar_pelo_ambiente():
+    """Liga as métricas conforme as variáveis FINTRACK_METRICAS* (chamado pelo FinTrack)"""
+    arquivo = os.environ.get('FINTRACK_METRICAS_ARQUIVO')
+    porta = os.environ.get('FINTRACK_METRICAS_PORTA')
+    if os.environ.get('FINTRACK_METRICAS', '') not in ('', '0') or arquivo or porta:
+        METRICAS.ativar()
+        if arquivo or porta:
+            METRICAS.exportar(arquivo, float(os.environ.get('FINTRACK_METRICAS_INTERVALO', 15)), porta)
+
+
+@contextmanager
+def capturar_perfil(modo='cprofile', destino=None, linhas=25):
+    """Perfil de CPU (cProfile) ou de memória (tracemalloc) do bloco
+
+    Entrega um dict que, na saída do bloco, recebe 'texto' (as `linhas` mais
+    pesadas). Com `destino`, grava o .prof do cProfile ou o texto do tracemalloc.
+    """
+    relatorio = {}
+    if modo == 'cprofile':
+        perfil = cProfile.Profile()
+        perfil.enable()
+        try:
+            yield relatorio
+        finally:
+            perfil.disable()
+            texto = io.StringIO()
+            pstats.Stats(perfil, stream=texto).sort_stats('cumulative').print_stats(linhas)
+            relatorio['texto'] = texto.getvalue()
+            if destino:
+                perfil.dump_stats(destino)
+    elif modo == 'tracemalloc':
+        ja_ativo = tracemalloc.is_tracing()
+        if not ja_ativo:
+            tracemalloc.start(10)
+        try:
+            yield relatorio
+        finally:
+            foto = tracemalloc.take_snapshot()
+            atual, pico = tracemalloc.get_traced_memory()
+            if not ja_ativo:
+                tracemalloc.stop()
+            maiores = foto.statistics('lineno')[:linhas]
+            relatorio['texto'] = (f"Memória atual: {atual / 2**20:.1f} MB | pico: {pico / 2**20:.1f} MB\n"
+                                  + '\n'.join(map(str, maiores)))
+            if destino:
+                with open(destino, 'w', encoding='utf-8') as f:
+                    f.write(relatorio['texto'])
+    else:
+        raise ValueError(f"Modo de perfil desconhecido: {modo} (use 'cprofile' ou 'tracemalloc')")
@@ -0,0 +1,123 @@
+# Orçamentos mensais do FinTrack, por categoria de despesa e geral
+# Os limites ficam em <base>.orcamentos.json e os alertas disparados em
+# <base>.alertas.jsonl (um por linha, só acrescentados). A verificação usa os
+# totais mensais que o FinTrack já mantém a cada mutação: custo O(1) por
+# categoria alterada, sem recalcular o mês.
+
+import json
+from datetime import datetime
+
+from fintrack_armazenamento import escrever_atomico, trava_arquivo
+
+# Percentuais do limite que disparam alerta (cada um uma vez por mês e orçamento)
+LIMIARES = (70, 90, 100)
+
+
+class ControleOrcamentos:
+    """Limites por categoria (e geral, categoria None) e histórico de alertas"""
+    def __init__(self, arquivo, arquivo_alertas, arquivo_trava=None):
+        self.arquivo = arquivo
+        self.arquivo_alertas = arquivo_alertas
+        self.arquivo_trava = arquivo_trava or arquivo + '.lock'
+        self.recarregar()
+
+    def _ler_limites(self):
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"⚠️  Erro ao carregar orçamentos: {e}")
+            return {}
+
+    def _ler_alertas(self):
+        alertas = []
+        try:
+            with open(self.arquivo_alertas, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    try:
+                        alertas.append(json.loads(linha))
+                    except json.JSONDecodeError:
+                        continue  # linha cortada por uma gravação interrompida
+        except FileNotFoundError:
+            pass
+        return alertas
+
+    @staticmethod
+    def _chaves(alerta):
+        """Limiares cobertos pelo alerta: o disparado e os abaixo dele"""
+        return {(alerta['ano'], alerta['mes'], alerta['categoria'], l) for l in LIMIARES if l <= alerta['limiar']}
+
+    def _cobertos(self, alertas):
+        return set().union(*map(self._chaves, alertas))
+
+    def recarregar(self):
+        dados = self._ler_limites()
+        self.limites = dict(dados.get('categorias', {}))
+        self.geral = dados.get('geral')
+        self.alertas = self._ler_alertas()
+        self._disparados = self._cobertos(self.alertas)
+
+    def definir(self, categoria, limite):
+        """Define o limite mensal da categoria (None = orçamento geral); limite vazio/0 remove"""
+        limite = float(limite) if limite else None
+        if limite is not None and limite < 0:
+            raise ValueError("Limite não pode ser negativo")
+        with trava_arquivo(self.arquivo_trava):
+            dados = self._ler_limites()
+            categorias = dados.setdefault('categorias', {})
+            if categoria is None:
+                dados['geral'] = limite
+            elif limite is None:
+                categorias.pop(categoria, None)
+            else:
+                categorias[categoria] = limite
+            escrever_atomico(self.arquivo, json.dumps(dados, indent=2, ensure_ascii=False).encode('utf-8'))
+        self.limites = dict(dados['categorias'])
+        self.geral = dados.get('geral')
+
+    def limite(self, categoria):
+        return self.geral if categoria is None else self.limites.get(categoria)
+
+    def avaliar(self, ano, mes, categoria, gasto):
+        """Alerta do maior limiar recém-atingido pelo gasto, ou None
+
+        Um salto direto de 50% para 105% gera só o alerta de 100%; os limiares
+        abaixo contam como disparados.
+        """
+        limite = self.limite(categoria)
+        if not limite:
+            return None
+        percentual = gasto / limite * 100
+        atingidos = [l for l in LIMIARES if percentual >= l and (ano, mes, categoria, l) not in self._disparados]
+        if not atingidos:
+            return None
+        self._disparados.update((ano, mes, categoria, l) for l in atingidos)
+        return {'data_hora': datetime.now().isoformat(timespec='seconds'), 'ano': ano, 'mes': mes,
+                'categoria': categoria, 'limiar': atingidos[-1], 'gasto': round(gasto, 2),
+                'limite': limite, 'percentual': round(percentual, 1)}
+
+    def registrar(self, alertas):
+        """Acrescenta os alertas ao histórico; retorna os que nenhuma outra sessão já gravou"""
+        if not alertas:
+            return []
+        with trava_arquivo(self.arquivo_trava):
+            # Outra sessão pode ter disparado o mesmo alerta desde a última leitura
+            gravados = self._cobertos(self._ler_alertas())
+            novos = [a for a in alertas if not self._chaves(a) <= gravados]
+            if novos:
+                with open(self.arquivo_alertas, 'a', encoding='utf-8') as f:
+                    f.writelines(json.dumps(a, ensure_ascii=False) + '\n' for a in novos)
+        self.alertas.extend(novos)
+        return novos
+
+    def historico(self, ano=None, mes=None, categoria=None, limite=None):
+        """Alertas do mais recente para o mais antigo, com filtros opcionais
+
+        `categoria` '' (texto vazio) seleciona só o orçamento geral.
+        """
+        selecionados = [a for a in reversed(self.alertas)
+                        if (ano is None or a['ano'] == ano) and (mes is None or a['mes'] == mes)
+                        and (categoria is None or a['categoria'] == (categoria or None))]
+        return selecionados[:limite] if limite else selecionados
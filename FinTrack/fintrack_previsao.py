@@ -0,0 +1,154 @@
+# Motor de previsão do FinTrack: vários meses à frente, por categoria
+# Usa os resumos mensais já materializados pelo FinTrack (não relê o histórico).
+# Transações recorrentes conhecidas entram pelo valor exato, fora da estimativa.
+
+import calendar
+import statistics
+from datetime import date, datetime
+
+MODELOS = {
+    'media_movel': "Média móvel",
+    'suavizacao_exponencial': "Suavização exponencial",
+    'holt': "Holt (nível + tendência)",
+}
+
+
+def somar_meses(ano, mes, quantidade):
+    """Avança (ou recua, se negativo) meses de calendário: (2025, 1) - 1 = (2024, 12)"""
+    indice = ano * 12 + (mes - 1) + quantidade
+    return indice // 12, indice % 12 + 1
+
+
+def _media_movel(serie, alpha, beta, horizonte):
+    media = sum(serie) / len(serie)
+    return [media] * horizonte
+
+
+def _suavizacao_exponencial(serie, alpha, beta, horizonte):
+    nivel = serie[0]
+    for valor in serie[1:]:
+        nivel = alpha * valor + (1 - alpha) * nivel
+    return [nivel] * horizonte
+
+
+def _holt(serie, alpha, beta, horizonte):
+    if len(serie) < 2:
+        return [serie[0]] * horizonte
+    nivel, tendencia = serie[0], serie[1] - serie[0]
+    for valor in serie[1:]:
+        nivel_anterior = nivel
+        nivel = alpha * valor + (1 - alpha) * (nivel + tendencia)
+        tendencia = beta * (nivel - nivel_anterior) + (1 - beta) * tendencia
+    return [max(nivel + passo * tendencia, 0.0) for passo in range(1, horizonte + 1)]
+
+
+FUNCOES_MODELO = {
+    'media_movel': _media_movel,
+    'suavizacao_exponencial': _suavizacao_exponencial,
+    'holt': _holt,
+}
+
+
+class MotorPrevisao:
+    """Previsões de receitas e despesas por categoria para os próximos 1–12 meses
+
+    O histórico são os últimos `meses_historico` meses completos (antes do mês
+    atual) que tenham transações; cada categoria vira uma série mensal montada
+    a partir de FinTrack.resumo_do_mes, sem percorrer transações.
+
+    As regras recorrentes do sistema (se houver) saem do histórico antes de
+    estimar (inclusive nos meses anteriores à regra, quando eram lançadas à mão)
+    e as ocorrências de cada mês previsto são somadas pelo valor exato.
+    """
+    def __init__(self, sistema, meses_historico=3, modelo='media_movel', alpha=0.5, beta=0.3):
+        if modelo not in FUNCOES_MODELO:
+            raise ValueError(f"Modelo desconhecido: {modelo}")
+        self.sistema = sistema
+        self.meses_historico = meses_historico
+        self.modelo = modelo
+        self.alpha = alpha
+        self.beta = beta
+
+    def _historico(self, hoje):
+        """Meses do histórico (mais antigo primeiro) e seus resumos por (tipo, categoria)"""
+        meses, resumos = [], []
+        for i in range(self.meses_historico, 0, -1):
+            ano, mes = somar_meses(hoje.year, hoje.month, -i)
+            resumo = self.sistema.resumo_do_mes(mes, ano)
+            if resumo:
+                meses.append((ano, mes))
+                resumos.append(resumo)
+        return meses, resumos
+
+    def prever(self, horizonte=1, hoje=None):
+        """Retorna as previsões ou None se houver menos de 2 meses de histórico"""
+        if not 1 <= horizonte <= 12:
+            raise ValueError("Horizonte deve estar entre 1 e 12 meses")
+        hoje = hoje or datetime.now()
+        meses, resumos = self._historico(hoje)
+        if len(meses) < 2:
+            return None
+
+        funcao = FUNCOES_MODELO[self.modelo]
+        meses_previstos = [somar_meses(hoje.year, hoje.month, passo) for passo in range(1, horizonte + 1)]
+        conhecidas_historico, conhecidas = self._recorrentes(meses, meses_previstos)
+        residuos = [{chave: max(total - conhecidas_historico.get(mes, {}).get(chave, 0.0), 0.0)
+                     for chave, total in resumo.items()}
+                    for mes, resumo in zip(meses, resumos)]
+        chaves = set()
+        for resumo in resumos:
+            chaves.update(resumo)
+        for mes in meses_previstos:
+            chaves.update(conhecidas.get(mes, ()))
+
+        # Uma série por (tipo, categoria); meses sem a categoria contam como zero.
+        # O histórico termina no mês passado: o 1º passo é o mês atual, que é descartado.
+        categorias = {}
+        for chave in chaves:
+            serie = [residuo.get(chave, 0.0) for residuo in residuos]
+            estimadas = funcao(serie, self.alpha, self.beta, horizonte + 1)[1:]
+            categorias[chave] = [valor + conhecidas.get(mes, {}).get(chave, 0.0)
+                                 for valor, mes in zip(estimadas, meses_previstos)]
+
+        receitas = [0.0] * horizonte
+        despesas = [0.0] * horizonte
+        for (tipo, _), previsoes in categorias.items():
+            destino = receitas if tipo == 'receita' else despesas
+            for passo, valor in enumerate(previsoes):
+                destino[passo] += valor
+
+        recorrentes_receitas = [sum(v for (t, _), v in conhecidas.get(mes, {}).items() if t == 'receita')
+                                for mes in meses_previstos]
+        recorrentes_despesas = [sum(v for (t, _), v in conhecidas.get(mes, {}).items() if t == 'despesa')
+                                for mes in meses_previstos]
+
+        historico_receitas = [sum(v for (t, _), v in r.items() if t == 'receita') for r in resumos]
+        historico_despesas = [sum(v for (t, _), v in r.items() if t == 'despesa') for r in resumos]
+
+        return {
+            'modelo': self.modelo,
+            'meses_historico': meses,
+            'meses_previstos': meses_previstos,
+            'receitas': receitas,
+            'despesas': despesas,
+            'saldos': [r - d for r, d in zip(receitas, despesas)],
+            'desvio_receitas': statistics.stdev(historico_receitas),
+            'desvio_despesas': statistics.stdev(historico_despesas),
+            'categorias': categorias,
+            'recorrentes_receitas': recorrentes_receitas,
+            'recorrentes_despesas': recorrentes_despesas,
+        }
+
+    def _recorrentes(self, meses, meses_previstos):
+        """Totais das regras recorrentes por mês: (projetados no histórico, exatos nos meses previstos)"""
+        agenda = getattr(self.sistema, 'recorrentes', None)
+        if agenda is None or not agenda.regras:
+            return {}, {}
+        (ano_ini, mes_ini), (ano_fim, mes_fim) = meses[0], meses[-1]
+        historico = agenda.totais_por_mes(date(ano_ini, mes_ini, 1),
+                                          date(ano_fim, mes_fim, calendar.monthrange(ano_fim, mes_fim)[1]),
+                                          projetar=True)
+        (ano_ini, mes_ini), (ano_fim, mes_fim) = meses_previstos[0], meses_previstos[-1]
+        previstas = agenda.totais_por_mes(date(ano_ini, mes_ini, 1),
+                                          date(ano_fim, mes_fim, calendar.monthrange(ano_fim, mes_fim)[1]))
+        return historico, previstas
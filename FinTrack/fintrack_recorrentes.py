@@ -0,0 +1,174 @@
+# Transações recorrentes do FinTrack (salário, aluguel, assinaturas)
+# As regras ficam em <base>.recorrentes.json; cada uma guarda até que data já
+# foi materializada ('gerada_ate'). As ocorrências vencidas viram transações só
+# quando um período consultado precisa delas, todas numa única gravação, e o
+# cursor avança junto: materializar de novo não duplica nada.
+
+import calendar
+import json
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from fintrack_armazenamento import escrever_atomico, trava_arquivo
+from fintrack_previsao import somar_meses
+
+FREQUENCIAS = {
+    'mensal': "Mensal",
+    'semanal': "Semanal",
+    'dias': "A cada N dias",
+}
+
+
+def _data(texto):
+    return date.fromisoformat(texto) if texto else None
+
+
+def _ocorrencia(regra, k):
+    """Data da k-ésima ocorrência (k pode ser negativo: projeção antes do início)"""
+    inicio = _data(regra['inicio'])
+    if regra['frequencia'] == 'mensal':
+        # Mesmo dia do início; em meses mais curtos, o último dia do mês (31 -> 28/02)
+        ano, mes = somar_meses(inicio.year, inicio.month, k * regra['intervalo'])
+        return date(ano, mes, min(inicio.day, calendar.monthrange(ano, mes)[1]))
+    passo = regra['intervalo'] * (7 if regra['frequencia'] == 'semanal' else 1)
+    return inicio + timedelta(days=k * passo)
+
+
+def _indice_ate(regra, dia):
+    """Maior k com a ocorrência k em `dia` ou antes (sem percorrer as anteriores)"""
+    inicio = _data(regra['inicio'])
+    if regra['frequencia'] == 'mensal':
+        meses = (dia.year - inicio.year) * 12 + dia.month - inicio.month
+        k = meses // regra['intervalo']
+        return k - 1 if _ocorrencia(regra, k) > dia else k
+    passo = regra['intervalo'] * (7 if regra['frequencia'] == 'semanal' else 1)
+    return (dia - inicio).days // passo
+
+
+def datas_da_regra(regra, de, ate, projetar=False):
+    """Datas das ocorrências entre `de` e `ate` (inclusive), respeitando o fim da regra
+
+    Com `projetar`, o calendário da regra é estendido para antes do início
+    (usado para tirar do histórico o que a regra já cobria quando era lançado à mão).
+    """
+    fim = _data(regra.get('fim'))
+    if fim and fim < ate:
+        ate = fim
+    primeiro = _indice_ate(regra, de - timedelta(days=1)) + 1
+    if not projetar:
+        primeiro = max(primeiro, 0)
+    for k in range(primeiro, _indice_ate(regra, ate) + 1):
+        yield _ocorrencia(regra, k)
+
+
+def proxima_pendente(regra):
+    """Primeira ocorrência ainda não materializada, ou None se a regra acabou"""
+    gerada_ate = _data(regra.get('gerada_ate'))
+    k = max(_indice_ate(regra, gerada_ate) + 1, 0) if gerada_ate else 0
+    dia = _ocorrencia(regra, k)
+    fim = _data(regra.get('fim'))
+    return None if fim and dia > fim else dia
+
+
+class AgendaRecorrentes:
+    """Regras recorrentes e materialização sob demanda
+
+    Usa uma trava própria (<base>.recorrentes.lock): a materialização grava as
+    transações, que já tomam a trava dos dados, enquanto segura esta.
+    """
+    def __init__(self, arquivo, arquivo_trava=None):
+        self.arquivo = arquivo
+        self.arquivo_trava = arquivo_trava or arquivo + '.lock'
+        self.recarregar()
+
+    def _ler(self):
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"⚠️  Erro ao carregar recorrentes: {e}")
+            return []
+
+    def _gravar(self, regras):
+        escrever_atomico(self.arquivo, json.dumps(regras, indent=2, ensure_ascii=False).encode('utf-8'))
+
+    def recarregar(self, regras=None):
+        """Relê as regras (ou adota as informadas) e recalcula a próxima ocorrência pendente"""
+        self.regras = {r['id']: r for r in (self._ler() if regras is None else regras)}
+        pendentes = [dia for dia in map(proxima_pendente, self.regras.values()) if dia]
+        self._proxima = min(pendentes, default=None)
+
+    def pendente(self, limite):
+        """True se alguma regra tem ocorrência não materializada até `limite` (O(1))"""
+        return self._proxima is not None and self._proxima <= limite
+
+    def listar(self):
+        return sorted(self.regras.values(), key=lambda r: r['id'])
+
+    def criar(self, tipo, valor, categoria, descricao, frequencia, inicio, intervalo=1, fim=None):
+        """Grava uma regra nova e a retorna; datas 'AAAA-MM-DD' (fim opcional, inclusivo)"""
+        if tipo not in ('receita', 'despesa'):
+            raise ValueError(f"Tipo inválido: {tipo}")
+        if frequencia not in FREQUENCIAS:
+            raise ValueError(f"Frequência inválida: {frequencia} (use {', '.join(FREQUENCIAS)})")
+        if int(intervalo) < 1:
+            raise ValueError("Intervalo deve ser pelo menos 1")
+        if fim and fim < inicio:
+            raise ValueError("Data final anterior ao início")
+        regra = {'tipo': tipo, 'valor': float(valor), 'categoria': categoria, 'descricao': descricao,
+                 'frequencia': frequencia, 'intervalo': int(intervalo), 'inicio': inicio, 'fim': fim or None,
+                 'gerada_ate': None}
+        with trava_arquivo(self.arquivo_trava):
+            # Relê para não apagar regras (nem cursores) gravados por outra sessão
+            regras = self._ler()
+            regra = {'id': max((r['id'] for r in regras), default=0) + 1, **regra}
+            regras.append(regra)
+            self._gravar(regras)
+        self.recarregar(regras)
+        return regra
+
+    def remover(self, regra_id):
+        """Apaga a regra (as transações já geradas ficam); retorna a regra ou None"""
+        with trava_arquivo(self.arquivo_trava):
+            regras = self._ler()
+            removida = next((r for r in regras if r['id'] == regra_id), None)
+            if removida:
+                regras.remove(removida)
+                self._gravar(regras)
+        self.recarregar(regras)
+        return removida
+
+    @contextmanager
+    def materializar(self, limite):
+        """Entrega as ocorrências pendentes até `limite` como transações (sem ID)
+
+        O bloco deve gravá-las; ao sair sem erro os cursores avançam até `limite`.
+        Tudo sob a trava, com as regras relidas do disco: duas sessões não geram
+        a mesma ocorrência.
+        """
+        with trava_arquivo(self.arquivo_trava):
+            regras = self._ler()
+            ocorrencias = []
+            for regra in regras:
+                gerada_ate = _data(regra.get('gerada_ate'))
+                if gerada_ate and gerada_ate >= limite:
+                    continue
+                de = gerada_ate + timedelta(days=1) if gerada_ate else _data(regra['inicio'])
+                ocorrencias.extend({'tipo': regra['tipo'], 'valor': regra['valor'], 'categoria': regra['categoria'],
+                                    'descricao': regra['descricao'], 'data': dia.isoformat()}
+                                   for dia in datas_da_regra(regra, de, limite))
+                regra['gerada_ate'] = limite.isoformat()
+            yield ocorrencias
+            self._gravar(regras)
+        self.recarregar(regras)
+
+    def totais_por_mes(self, de, ate, projetar=False):
+        """(ano, mes) -> {(tipo, categoria): total} das ocorrências entre `de` e `ate`"""
+        totais = defaultdict(lambda: defaultdict(float))
+        for regra in self.regras.values():
+            for dia in datas_da_regra(regra, de, ate, projetar):
+                totais[(dia.year, dia.month)][(regra['tipo'], regra['categoria'])] += regra['valor']
+        return totais
@@ -0,0 +1,199 @@
+# Gerador de históricos sintéticos do FinTrack (testes de carga e benchmark)
+# Vários anos em ordem de data, com salário e contas fixas todo mês, sazonalidade
+# (13º e presentes em dezembro, material escolar e impostos no começo do ano,
+# férias em julho), mais movimento no fim de semana e reajuste anual dos valores.
+# Mesma semente + mesmos parâmetros = mesmas transações.
+# Uso: python fintrack_sinteticos.py --linhas 100000 [--anos 5] [--semente 42]
+#          [--fim AAAA-MM-DD] [--modo json] [--arquivo fintrack_sinteticos.json]
+
+import argparse
+import json
+import os
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+
+from fintrack_armazenamento import ArmazenamentoJSON, MODOS_ARMAZENAMENTO, criar_armazenamento
+
+# Categoria: (peso na escolha, valor típico, dispersão do log-normal, descrições de exemplo)
+PERFIS = {
+    'despesa': {
+        'Alimentação': (30, 45, 0.6, ['IFOOD *Restaurante', 'Padaria Pão Quente', 'Supermercado Extra',
+                                      'Mercado Pão de Açúcar', 'Atacadão', 'Restaurante Sabor Caseiro']),
+        'Transporte': (15, 35, 0.7, ['Uber *Trip', '99 *Corrida', 'Posto Shell', 'Posto Ipiranga',
+                                     'Estacionamento Centro', 'Recarga Bilhete Único']),
+        'Moradia': (4, 180, 0.8, ['Leroy Merlin', 'Manutenção hidráulica', 'Material de construção']),
+        'Contas': (5, 150, 0.4, ['Enel Energia', 'Sabesp Água', 'Vivo Fibra', 'Claro Celular', 'Comgás']),
+        'Saúde': (6, 90, 0.9, ['Drogasil', 'Droga Raia', 'Consulta médica', 'Laboratório Fleury', 'Dentista']),
+        'Entretenimento': (7, 60, 0.8, ['Cinema Cinemark', 'Ingresso.com', 'Bar do Zé', 'Steam Games']),
+        'Assinaturas': (4, 40, 0.5, ['Spotify', 'Amazon Prime', 'Disney Plus', 'YouTube Premium']),
+        'Educação': (3, 120, 0.9, ['Livraria Cultura', 'Curso Udemy', 'Material escolar', 'Alura']),
+        'Vestuário': (4, 130, 0.8, ['Renner', 'C&A', 'Riachuelo', 'Centauro']),
+        'Pets': (3, 80, 0.7, ['Petz', 'Cobasi', 'Veterinário']),
+        'Viagem': (2, 600, 1.0, ['Decolar passagem', 'Booking hotel', 'Airbnb', 'LATAM']),
+        'Presentes': (2, 110, 0.8, ['Presente aniversário', 'Americanas', 'Magazine Luiza']),
+        'Impostos': (1, 400, 0.7, ['IPVA', 'IPTU parcela', 'DARF']),
+        'Outros': (3, 70, 1.0, ['Pix enviado', 'Saque 24h', 'Tarifa bancária']),
+    },
+    'receita': {
+        'Freelance': (5, 900, 0.7, ['Projeto freelance', 'Consultoria', 'Pix recebido cliente']),
+        'Investimentos': (3, 150, 0.8, ['Dividendos ITSA4', 'Rendimento CDB', 'JCP']),
+        'Outros': (2, 100, 1.0, ['Pix recebido', 'Reembolso', 'Cashback']),
+    },
+}
+
+# Parte das transações variáveis que são receitas
+PROPORCAO_RECEITAS = 0.08
+
+# Mês -> multiplicador do peso de cada categoria
+SAZONALIDADE = {
+    1: {'Educação': 3, 'Impostos': 4, 'Viagem': 2},
+    2: {'Educação': 2, 'Impostos': 2},
+    7: {'Viagem': 3},
+    11: {'Vestuário': 1.5, 'Presentes': 1.5},
+    12: {'Presentes': 5, 'Entretenimento': 1.5, 'Alimentação': 1.3, 'Viagem': 2},
+}
+
+# Lançamentos fixos de todo mês: (tipo, categoria, dia, valor, descrição)
+FIXAS = [
+    ('receita', 'Salário', 5, 5200.0, 'Salário Empresa'),
+    ('despesa', 'Moradia', 10, 1800.0, 'Aluguel'),
+    ('despesa', 'Moradia', 10, 450.0, 'Condomínio'),
+    ('despesa', 'Saúde', 20, 380.0, 'Plano de saúde'),
+    ('despesa', 'Saúde', 8, 99.9, 'Academia'),
+    ('despesa', 'Assinaturas', 12, 39.9, 'Netflix'),
+]
+
+REAJUSTE_ANUAL = 0.045          # inflação aplicada aos valores, ano a ano
+VARIAVEIS_POR_MES_BASE = 60     # acima disso o salário cresce junto (família, pequena empresa)
+
+
+def _pesos_por_mes():
+    """Mês -> (lista de (tipo, categoria), pesos acumulados) com a sazonalidade aplicada"""
+    despesas = sum(perfil[0] for perfil in PERFIS['despesa'].values())
+    receitas = sum(perfil[0] for perfil in PERFIS['receita'].values())
+    # Escala os pesos de receita para que respondam por PROPORCAO_RECEITAS do total
+    escala = {'despesa': 1.0, 'receita': despesas * PROPORCAO_RECEITAS / ((1 - PROPORCAO_RECEITAS) * receitas)}
+    chaves = [(tipo, categoria) for tipo in PERFIS for categoria in PERFIS[tipo]]
+    resultado = {}
+    for mes in range(1, 13):
+        ajuste = SAZONALIDADE.get(mes, {})
+        pesos = [PERFIS[tipo][categoria][0] * escala[tipo] * ajuste.get(categoria, 1) for tipo, categoria in chaves]
+        resultado[mes] = (chaves, list(accumulate(pesos)))
+    return resultado
+
+
+def _peso_do_dia(dia, fracao):
+    """Movimento relativo do dia: cresce ao longo do histórico, maior no fim de semana,
+    logo depois do salário e em dezembro"""
+    peso = 1 + 0.5 * fracao
+    if dia.weekday() >= 5:
+        peso *= 1.3
+    if 5 <= dia.day <= 10:
+        peso *= 1.15
+    if dia.month == 12:
+        peso *= 1.25
+    return peso
+
+
+def gerar_transacoes(quantidade, anos=5, semente=42, fim=None):
+    """Gera `quantidade` transações em ordem de data (IDs 1..quantidade) nos `anos` até `fim`
+
+    É um gerador: dá para gravar 10 milhões de linhas sem montar a lista inteira.
+    A data final padrão é hoje; fixe `fim` para repetir exatamente o mesmo histórico.
+    """
+    aleatorio = random.Random(semente)
+    fim = fim or date.today()
+    dias = [fim - timedelta(days=d) for d in range(anos * 365 - 1, -1, -1)]
+    inicio = dias[0]
+
+    # Fixas só quando sobram linhas para o movimento do dia a dia
+    fixas_por_dia = {}
+    for i, dia in enumerate(dias):
+        fixas = [f for f in FIXAS if f[2] == dia.day]
+        if dia.month == 12 and dia.day == 20:
+            fixas.append(('receita', 'Salário', 20, FIXAS[0][3], '13º salário'))
+        if fixas:
+            fixas_por_dia[i] = fixas
+    total_fixas = sum(map(len, fixas_por_dia.values()))
+    if total_fixas > quantidade // 2:
+        fixas_por_dia, total_fixas = {}, 0
+    variaveis = quantidade - total_fixas
+
+    # Distribui as variáveis pelos dias conforme o peso (em lotes, para não criar 10M itens de uma vez)
+    acumulado = list(accumulate(_peso_do_dia(dia, i / len(dias)) for i, dia in enumerate(dias)))
+    por_dia = [0] * len(dias)
+    restante = variaveis
+    while restante:
+        lote = min(restante, 1_000_000)
+        for i in aleatorio.choices(range(len(dias)), cum_weights=acumulado, k=lote):
+            por_dia[i] += 1
+        restante -= lote
+
+    pesos = _pesos_por_mes()
+    meses = max(1, len(dias) / 30.44)
+    volume = max(1.0, variaveis / meses / VARIAVEIS_POR_MES_BASE)
+    proximo_id = 1
+    for i, dia in enumerate(dias):
+        data = dia.isoformat()
+        reajuste = (1 + REAJUSTE_ANUAL) ** (dia.year - inicio.year)
+        for tipo, categoria, _, valor, descricao in fixas_por_dia.get(i, ()):
+            # O salário acompanha o volume de gastos para o saldo continuar plausível
+            valor = valor * reajuste * (volume if categoria == 'Salário' else 1)
+            yield {'id': proximo_id, 'tipo': tipo, 'valor': round(valor, 2), 'categoria': categoria,
+                   'descricao': descricao, 'data': data}
+            proximo_id += 1
+        if not por_dia[i]:
+            continue
+        chaves, acumulados = pesos[dia.month]
+        for tipo, categoria in aleatorio.choices(chaves, cum_weights=acumulados, k=por_dia[i]):
+            _, tipico, dispersao, descricoes = PERFIS[tipo][categoria]
+            valor = max(1.0, tipico * reajuste * aleatorio.lognormvariate(0, dispersao))
+            yield {'id': proximo_id, 'tipo': tipo, 'valor': round(valor, 2), 'categoria': categoria,
+                   'descricao': aleatorio.choice(descricoes), 'data': data}
+            proximo_id += 1
+
+
+def _gravar_json_em_fluxo(arquivo, transacoes):
+    """Grava a lista JSON uma transação por linha, sem montar tudo na memória"""
+    temporario = f"{arquivo}.{os.getpid()}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for i, t in enumerate(transacoes):
+            f.write(',\n' if i else '\n')
+            f.write(json.dumps(t, ensure_ascii=False))
+        f.write('\n]')
+    os.replace(temporario, arquivo)
+
+
+def gravar_sinteticos(arquivo, quantidade, modo='json', anos=5, semente=42, fim=None):
+    """Gera o histórico e grava no modo de armazenamento escolhido (substitui o que houver)"""
+    transacoes = gerar_transacoes(quantidade, anos, semente, fim)
+    if modo == 'json':
+        armazenamento = ArmazenamentoJSON(arquivo)
+        _gravar_json_em_fluxo(arquivo, transacoes)
+    else:
+        armazenamento = criar_armazenamento(modo, arquivo)
+        armazenamento.salvar(list(transacoes))
+    armazenamento.gravar_contador(quantidade + 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um histórico sintético para o FinTrack")
+    parser.add_argument('--linhas', type=int, default=100_000)
+    parser.add_argument('--anos', type=int, default=5)
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--fim', type=date.fromisoformat, default=None, help="data final AAAA-MM-DD (padrão: hoje)")
+    parser.add_argument('--modo', choices=MODOS_ARMAZENAMENTO, default='json')
+    parser.add_argument('--arquivo', default='fintrack_sinteticos.json')
+    args = parser.parse_args()
+
+    # Nunca mistura com dados existentes (JSON ou arquivos do modo escolhido; travas não contam).
+    # Só confere os caminhos: abrir o armazenamento criaria um .db ou .anos/ vazio
+    if any(os.path.exists(caminho) for caminho in MODOS_ARMAZENAMENTO[args.modo].arquivos(args.arquivo)
+           if not caminho.endswith('.lock')):
+        print(f"❌ Já existem dados em {args.arquivo} ({args.modo}); escolha outro --arquivo")
+        raise SystemExit(1)
+    print(f"⏳ Gerando {args.linhas:,} transações...".replace(',', '.'))
+    gravar_sinteticos(args.arquivo, args.linhas, args.modo, args.anos, args.semente, args.fim)
+    print(f"✅ Histórico gravado em {args.arquivo} (modo {args.modo})")
@@ -0,0 +1,162 @@
+# Snapshot binário do FinTrack: formato colunar compacto para abrir rápido
+# Cada campo vira uma coluna (array/struct); textos repetidos (datas, tipos,
+# categorias, descrições) são gravados uma vez só em uma tabela e as linhas
+# guardam apenas o código. Carregar é ler blocos com frombytes e montar os dicts.
+# Meta não atingida: o pedido era abrir históricos de milhões de linhas bem abaixo
+# de 1 s, e este formato não chega lá. O FinTrack guarda um dict por transação, e
+# montar esses dicts (mais os índices) é o piso da abertura: com 2 milhões de
+# linhas, decodificar leva ~1,5 s e abrir no modo 'binario' ~4,5 s. Para
+# históricos grandes use o modo 'particionado' (ou o 'sqlite'), que abre só os
+# totais mensais e lê cada ano quando uma consulta precisa dele.
+#
+# Layout (little-endian):
+#   cabeçalho  '<4sHIQ' = b'FTSB', versão do formato, CRC32 do corpo, linhas
+#   corpo      blocos [tamanho '<Q' + bytes]: id, versao, valor ('q', 'q', 'd'), depois
+#              códigos ('I') + tabela de cada campo de CAMPOS_TEXTO e por fim os extras
+#   tabela     '<QQ' = quantidade de textos, tamanho dos comprimentos; depois os
+#              comprimentos (array 'I', em caracteres) e os textos concatenados em
+#              UTF-8. Sem comprimentos (o caso comum), os textos vêm separados por NUL.
+
+import array
+import json
+import struct
+import sys
+import zlib
+
+MAGICO = b'FTSB'
+VERSAO_FORMATO = 1
+CABECALHO = struct.Struct('<4sHIQ')
+TAMANHO_BLOCO = struct.Struct('<Q')
+CABECALHO_TABELA = struct.Struct('<QQ')
+SEPARADOR = '\x00'
+
+# Campos com coluna própria; qualquer outro campo vai para o bloco 'extras' (JSON)
+CAMPOS = ('id', 'tipo', 'valor', 'categoria', 'descricao', 'data', 'versao')
+CAMPOS_TEXTO = ('tipo', 'categoria', 'descricao', 'data')
+_CONJUNTO_CAMPOS = frozenset(CAMPOS)
+
+_INVERTER_BYTES = sys.byteorder == 'big'
+
+
+class ErroSnapshot(ValueError):
+    """Arquivo que não é um snapshot válido (formato, versão ou checksum)"""
+
+
+def _bytes_do_array(valores):
+    if _INVERTER_BYTES:
+        valores = array.array(valores.typecode, valores)
+        valores.byteswap()
+    return valores.tobytes()
+
+
+def _array_dos_bytes(typecode, conteudo):
+    valores = array.array(typecode)
+    valores.frombytes(conteudo)
+    if _INVERTER_BYTES:
+        valores.byteswap()
+    return valores
+
+
+def _codificar_textos(textos):
+    """Coluna de texto -> (códigos por linha, bloco da tabela de textos distintos)"""
+    codigos_por_texto = {}
+    codigos = array.array('I', [codigos_por_texto.setdefault(t, len(codigos_por_texto)) for t in textos])
+    tabela = list(codigos_por_texto)
+    texto = SEPARADOR.join(tabela)
+    if texto.count(SEPARADOR) == max(len(tabela) - 1, 0):
+        comprimentos = b''   # split() no separador é bem mais rápido que fatiar
+    else:
+        comprimentos = _bytes_do_array(array.array('I', map(len, tabela)))
+        texto = ''.join(tabela)
+    bloco_tabela = CABECALHO_TABELA.pack(len(tabela), len(comprimentos)) + comprimentos + texto.encode('utf-8')
+    return codigos, bloco_tabela
+
+
+def _decodificar_tabela(conteudo):
+    """Bloco da tabela -> lista de textos distintos"""
+    quantidade, tamanho = CABECALHO_TABELA.unpack_from(conteudo)
+    inicio = CABECALHO_TABELA.size
+    texto = conteudo[inicio + tamanho:].decode('utf-8')
+    if not quantidade:
+        return []
+    if not tamanho:
+        tabela = texto.split(SEPARADOR)
+    else:
+        tabela = []
+        posicao = 0
+        for comprimento in _array_dos_bytes('I', conteudo[inicio:inicio + tamanho]):
+            tabela.append(texto[posicao:posicao + comprimento])
+            posicao += comprimento
+    if len(tabela) != quantidade:
+        raise ErroSnapshot("Snapshot inconsistente (tabela de textos)")
+    return tabela
+
+
+def codificar_snapshot(transacoes):
+    """Lista de transações -> bytes do snapshot"""
+    transacoes = list(transacoes)
+    blocos = [
+        _bytes_do_array(array.array('q', [t['id'] for t in transacoes])),
+        _bytes_do_array(array.array('q', [t.get('versao', 1) for t in transacoes])),
+        _bytes_do_array(array.array('d', [t['valor'] for t in transacoes])),
+    ]
+    for campo in CAMPOS_TEXTO:
+        codigos, bloco_tabela = _codificar_textos([t[campo] for t in transacoes])
+        blocos.append(_bytes_do_array(codigos))
+        blocos.append(bloco_tabela)
+
+    extras = {i: {campo: valor for campo, valor in t.items() if campo not in _CONJUNTO_CAMPOS}
+              for i, t in enumerate(transacoes) if not t.keys() <= _CONJUNTO_CAMPOS}
+    blocos.append(json.dumps(extras, ensure_ascii=False).encode('utf-8') if extras else b'')
+
+    corpo = b''.join(TAMANHO_BLOCO.pack(len(bloco)) + bloco for bloco in blocos)
+    return CABECALHO.pack(MAGICO, VERSAO_FORMATO, zlib.crc32(corpo), len(transacoes)) + corpo
+
+
+def decodificar_snapshot(conteudo):
+    """Bytes do snapshot -> lista de transações (confere formato, versão e checksum)"""
+    if len(conteudo) < CABECALHO.size:
+        raise ErroSnapshot("Snapshot truncado")
+    magico, versao, crc, linhas = CABECALHO.unpack_from(conteudo)
+    if magico != MAGICO:
+        raise ErroSnapshot("Arquivo não é um snapshot do FinTrack")
+    if versao > VERSAO_FORMATO:
+        raise ErroSnapshot(f"Snapshot na versão {versao} do formato (suportada até {VERSAO_FORMATO})")
+    corpo = memoryview(conteudo)[CABECALHO.size:]
+    if zlib.crc32(corpo) != crc:
+        raise ErroSnapshot("Snapshot corrompido (checksum não confere)")
+
+    blocos = []
+    posicao = 0
+    while posicao < len(corpo):
+        (tamanho,) = TAMANHO_BLOCO.unpack_from(corpo, posicao)
+        posicao += TAMANHO_BLOCO.size
+        blocos.append(corpo[posicao:posicao + tamanho])
+        posicao += tamanho
+    if len(blocos) != 4 + 2 * len(CAMPOS_TEXTO):
+        raise ErroSnapshot("Snapshot inconsistente (quantidade de blocos)")
+
+    ids = _array_dos_bytes('q', blocos[0])
+    versoes = _array_dos_bytes('q', blocos[1])
+    valores = _array_dos_bytes('d', blocos[2])
+    colunas = {}
+    for i, campo in enumerate(CAMPOS_TEXTO):
+        codigos = _array_dos_bytes('I', blocos[3 + 2 * i])
+        tabela = _decodificar_tabela(bytes(blocos[4 + 2 * i]))
+        colunas[campo] = map(tabela.__getitem__, codigos)   # expandido junto com as linhas
+    if not len(ids) == len(versoes) == len(valores) == linhas or any(
+            len(blocos[3 + 2 * i]) != linhas * 4 for i in range(len(CAMPOS_TEXTO))):
+        raise ErroSnapshot("Snapshot inconsistente (colunas com tamanhos diferentes)")
+
+    transacoes = [
+        {'id': i, 'tipo': tipo, 'valor': valor, 'categoria': categoria,
+         'descricao': descricao, 'data': data, 'versao': versao}
+        for i, tipo, valor, categoria, descricao, data, versao in zip(
+            ids, colunas['tipo'], valores, colunas['categoria'],
+            colunas['descricao'], colunas['data'], versoes)
+    ]
+    extras = bytes(blocos[11])
+    if extras:
+        for i, campos in json.loads(extras.decode('utf-8')).items():
+            transacoes[int(i)].update(campos)
+    return transacoes
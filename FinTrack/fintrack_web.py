@@ -1,11 +1,19 @@
 # Port web (beta) FinTrack
-# Requisitos: streamlit, pandas
-# pip install streamlit pandas
+# Requisitos: streamlit, pandas, numpy
+# pip install streamlit pandas numpy
 
+import calendar
+from contextlib import ExitStack
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 from fintrack import FinTrack  # usa sua classe existente
+from fintrack_armazenamento import ConflitoDeVersao
+from fintrack_importacao import importar_extrato
+from fintrack_analytics import MotorAnalytics, PERIODOS, intervalo_periodo
+from fintrack_previsao import MODELOS
+from fintrack_exibicao import QuadroTransacoes, formatar_brl, texto_alerta
+from fintrack_metricas import METRICAS, capturar_perfil, tamanhos_dos_arquivos
 
 # CONFIGURAÇÃO DA PÁGINA
 st.set_page_config(
@@ -22,32 +30,112 @@ st.markdown("""
 """)
 
 
-# instância do sistema (usa o mesmo arquivo JSON)
-sistema = FinTrack()
+# instância única por processo, compartilhada entre reruns e sessões;
+# só relê o arquivo quando outro processo (ex.: o CLI) gravou nele
+@st.cache_resource
+def obter_sistema():
+    return FinTrack()
+
+sistema = obter_sistema()
+sistema.recarregar_se_alterado()
 
 st.sidebar.title("FinTrack")
 menu = st.sidebar.radio("Menu", [
     "➕ Adicionar Receita",
     "➖ Adicionar Despesa",
     "📋 Listar Transações",
+    "🔍 Buscar Transações",
     "📊 Analisar Gastos",
+    "📅 Relatório por Período",
     "🔮 Previsão Próximo Mês",
     "💡 Recomendações",
     "📈 Dashboard Completo",
     "✏️ Editar Transação",
-    "🗑️ Deletar Transação"
+    "🗑️ Deletar Transação",
+    "📥 Importar Extrato",
+    "💰 Orçamentos"
 ])
 
-def transacoes_para_df(transacoes):
-    if not transacoes:
-        return pd.DataFrame(columns=['id','data','tipo','categoria','valor','descricao'])
-    df = pd.DataFrame(transacoes)
-    # garantia de colunas e formatação da data para exibição
-    df['data'] = pd.to_datetime(df['data'], format='%Y-%m-%d')
-    df = df[['id','data','tipo','categoria','valor','descricao']]
-    df = df.sort_values(by='data', ascending=False)
-    df['data'] = df['data'].dt.strftime('%d/%m/%Y')
-    return df
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+
+# ---------- DIAGNÓSTICO (barra lateral) ----------
+# Tempos das operações (fintrack_metricas) e perfil opcional da página atual
+perfil_pagina = ExitStack()
+with st.sidebar.expander("🩺 Diagnóstico"):
+    medir = st.checkbox("Medir tempos das operações", value=METRICAS.ativo, key="diag_medir")
+    if medir and not METRICAS.ativo:
+        METRICAS.ativar()
+    elif not medir and METRICAS.ativo:
+        METRICAS.desativar()
+    METRICAS.acompanhar(sistema)
+
+    armazenamento = getattr(sistema.armazenamento, 'interno', sistema.armazenamento)
+    st.caption(f"{len(sistema)} transação(ões) — modo {sistema.modo_armazenamento}")
+    for caminho, tamanho in tamanhos_dos_arquivos(armazenamento).items():
+        st.caption(f"📄 {caminho}: {tamanho / 1024:,.1f} KB")
+    resumo = METRICAS.resumo()
+    if resumo:
+        st.dataframe(pd.DataFrame(
+            [(operacao, m['chamadas'], m['media'] * 1000, m['maximo'] * 1000) for operacao, m in resumo.items()],
+            columns=['Operação', 'Chamadas', 'Média (ms)', 'Máximo (ms)']), use_container_width=True)
+        st.download_button("⬇️ Métricas (Prometheus)", METRICAS.prometheus(), file_name="fintrack.prom")
+    if st.checkbox("Perfil (cProfile) desta página", key="diag_perfil"):
+        relatorio_perfil = perfil_pagina.enter_context(capturar_perfil('cprofile'))
+
+@st.cache_resource
+def obter_motor():
+    # visão colunar única por processo, sincronizada pela versão do sistema
+    return MotorAnalytics(sistema)
+
+@st.cache_resource
+def obter_quadro():
+    # linhas das tabelas já montadas, reaproveitadas entre reruns enquanto a versão não muda
+    return QuadroTransacoes()
+
+def filtros_avancados(chave, periodo=True):
+    # filtros repassados para FinTrack.consultar_transacoes
+    filtros = {}
+    with st.expander("🔎 Filtros"):
+        col1, col2 = st.columns(2)
+        with col1:
+            tipo = st.selectbox("Tipo", options=["Todos", "receita", "despesa"], key=f"{chave}_tipo")
+            categoria = st.text_input("Categoria", key=f"{chave}_cat")
+            if periodo and st.checkbox("Filtrar por período", key=f"{chave}_usa_periodo"):
+                intervalo = st.date_input("Período", value=(datetime.now().date().replace(day=1), datetime.now().date()), key=f"{chave}_periodo")
+                if len(intervalo) == 2:
+                    filtros['data_inicial'] = intervalo[0].strftime('%Y-%m-%d')
+                    filtros['data_final'] = intervalo[1].strftime('%Y-%m-%d')
+        with col2:
+            valor_min = st.number_input("Valor mínimo (R$)", min_value=0.0, value=0.0, format="%.2f", key=f"{chave}_vmin")
+            valor_max = st.number_input("Valor máximo (R$, 0 = sem limite)", min_value=0.0, value=0.0, format="%.2f", key=f"{chave}_vmax")
+    if tipo != "Todos":
+        filtros['tipo'] = tipo
+    if categoria.strip():
+        filtros['categoria'] = categoria.strip()
+    if valor_min > 0:
+        filtros['valor_min'] = valor_min
+    if valor_max > 0:
+        filtros['valor_max'] = valor_max
+    return filtros
+
+def tabela_paginada(chave, **filtros):
+    # só a página pedida sai do FinTrack e vai para o navegador
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        ordenar_por = st.selectbox("Ordenar por", options=['data', 'valor', 'id', 'categoria'], key=f"{chave}_ord")
+    with col2:
+        decrescente = st.checkbox("Decrescente", value=True, key=f"{chave}_desc")
+    with col3:
+        tamanho = st.selectbox("Por página", options=TAMANHOS_PAGINA, index=1, key=f"{chave}_tam")
+    with col4:
+        pagina = st.number_input("Página", min_value=1, value=1, step=1, key=f"{chave}_pag")
+    transacoes, total = sistema.consultar_transacoes(
+        inicio=(int(pagina) - 1) * tamanho, limite=tamanho,
+        ordenar_por=ordenar_por, decrescente=decrescente, **filtros)
+    paginas = max(1, -(-total // tamanho))
+    st.dataframe(obter_quadro().pagina(sistema, transacoes), use_container_width=True)
+    st.caption(f"Página {int(pagina)} de {paginas} — {total} transação(ões)")
+    return transacoes
 
 
 # ---------- ADICIONAR RECEITA ----------
@@ -55,13 +143,16 @@ if menu == "➕ Adicionar Receita":
     st.header("➕ Adicionar Receita")
     with st.form("form_receita", clear_on_submit=True):
         valor = st.number_input("Valor (R$)", min_value=0.0, format="%.2f")
-        categoria = st.text_input("Categoria", value="Salário")
+        categoria = st.text_input("Categoria", value="Salário", help="Em branco: sugerida pela descrição")
         descricao = st.text_area("Descrição (opcional)", max_chars=200)
         data_input = st.date_input("Data", value=datetime.now().date())
         enviar = st.form_submit_button("Salvar receita")
     if enviar:
         data_str = data_input.strftime('%Y-%m-%d')
         try:
+            # categoria em branco: sugerida pela descrição
+            if not categoria.strip():
+                categoria = sistema.sugerir_categoria(descricao, 'receita') or 'Outros'
             # validar categoria com método da sua classe
             cat_valid, aviso = sistema.validar_categoria(categoria, 'receita')
             sistema.adicionar_transacao('receita', valor, cat_valid, descricao, data_str)
@@ -76,13 +167,16 @@ elif menu == "➖ Adicionar Despesa":
     st.header("➖ Adicionar Despesa")
     with st.form("form_despesa", clear_on_submit=True):
         valor = st.number_input("Valor (R$)", min_value=0.0, format="%.2f", key="val_desp")
-        categoria = st.text_input("Categoria", value="Alimentação", key="cat_desp")
+        categoria = st.text_input("Categoria", value="Alimentação", key="cat_desp",
+                                  help="Em branco: sugerida pela descrição")
         descricao = st.text_area("Descrição (opcional)", max_chars=200, key="desc_desp")
         data_input = st.date_input("Data", value=datetime.now().date(), key="data_desp")
         enviar = st.form_submit_button("Salvar despesa")
     if enviar:
         data_str = data_input.strftime('%Y-%m-%d')
         try:
+            if not categoria.strip():
+                categoria = sistema.sugerir_categoria(descricao, 'despesa') or 'Outros'
             cat_valid, aviso = sistema.validar_categoria(categoria, 'despesa')
             sistema.adicionar_transacao('despesa', valor, cat_valid, descricao, data_str)
             st.success("✅ Despesa adicionada com sucesso!")
@@ -104,10 +198,39 @@ elif menu == "📋 Listar Transações":
         mes_int = datetime.now().month
     else:
         mes_int = int(mes)
-    transacoes = sistema.listar_transacoes(mes_int, int(ano))
-    # listar_transacoes já imprime, mas aqui vamos mostrar em tabela
-    df = transacoes_para_df(transacoes)
-    st.dataframe(df, use_container_width=True)
+    ultimo_dia = calendar.monthrange(int(ano), mes_int)[1]
+    filtros = filtros_avancados("lst", periodo=False)
+    tabela_paginada("lst", data_inicial=f"{int(ano)}-{mes_int:02d}-01", data_final=f"{int(ano)}-{mes_int:02d}-{ultimo_dia:02d}", **filtros)
+
+# ---------- BUSCAR TRANSAÇÕES ----------
+elif menu == "🔍 Buscar Transações":
+    st.header("🔍 Buscar Transações")
+    consulta = st.text_input("Palavras da descrição ou categoria", placeholder="ex.: mercado alimentacao")
+    st.caption("Sem diferença de acentos ou maiúsculas; palavras incompletas também valem (\"merc\" acha \"Mercado\").")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        tipo = st.selectbox("Tipo", options=["Todos", "receita", "despesa"], key="bus_tipo")
+    with col2:
+        tamanho = st.selectbox("Por página", options=TAMANHOS_PAGINA, index=1, key="bus_tam")
+    with col3:
+        pagina = st.number_input("Página", min_value=1, value=1, step=1, key="bus_pag")
+    filtros = {}
+    if tipo != "Todos":
+        filtros['tipo'] = tipo
+    if st.checkbox("Filtrar por período", key="bus_usa_periodo"):
+        intervalo = st.date_input("Período", value=(datetime.now().date().replace(day=1), datetime.now().date()), key="bus_periodo")
+        if len(intervalo) == 2:
+            filtros['data_inicial'] = intervalo[0].strftime('%Y-%m-%d')
+            filtros['data_final'] = intervalo[1].strftime('%Y-%m-%d')
+    if consulta.strip():
+        transacoes, total = sistema.buscar_transacoes(
+            consulta, inicio=(int(pagina) - 1) * tamanho, limite=tamanho, **filtros)
+        if total:
+            paginas = max(1, -(-total // tamanho))
+            st.dataframe(obter_quadro().pagina(sistema, transacoes), use_container_width=True)
+            st.caption(f"Página {int(pagina)} de {paginas} — {total} transação(ões)")
+        else:
+            st.info("Nenhuma transação encontrada.")
 
 # ---------- ANALISAR GASTOS ----------
 elif menu == "📊 Analisar Gastos":
@@ -115,52 +238,111 @@ elif menu == "📊 Analisar Gastos":
     mes = st.selectbox("Mês", options=["Atual"] + [f"{i:02d}" for i in range(1,13)], index=0, key="an_mes")
     ano = st.number_input("Ano", min_value=2000, max_value=2100, value=datetime.now().year, key="an_ano")
     mes_int = datetime.now().month if mes=="Atual" else int(mes)
-    resultado = sistema.analisar_gastos(mes_int, int(ano))
+    resultado = sistema.calcular_analise(mes_int, int(ano))
     if resultado is None:
         st.info("Nenhuma transação para analisar.")
     else:
-        st.write("**Receitas:**", f"R$ {resultado['receitas']:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        st.write("**Despesas:**", f"R$ {resultado['despesas']:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        st.write("**Saldo:**", f"R$ {resultado['saldo']:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        # mostrar breakdown por categoria
+        st.write("**Receitas:**", formatar_brl(resultado['receitas']))
+        st.write("**Despesas:**", formatar_brl(resultado['despesas']))
+        st.write("**Saldo:**", formatar_brl(resultado['saldo']))
+        # mostrar breakdown por categoria (já ordenado, com percentuais)
+        if resultado['categorias_ordenadas']:
+            gasto_cat = pd.DataFrame(resultado['categorias_ordenadas'], columns=['Categoria','Valor','%'])
+            st.subheader("Distribuição por categoria")
+            st.dataframe(gasto_cat, use_container_width=True)
+            cat_maior, valor_maior = resultado['maior_categoria']
+            st.write(f"🔍 Maior gasto em **{cat_maior}** - {formatar_brl(valor_maior)}")
+            if resultado['alerta_concentracao']:
+                st.warning(f"'{cat_maior}' representa {valor_maior / resultado['despesas'] * 100:.1f}% dos gastos!")
+        if resultado['taxa_economia'] is not None:
+            st.write(f"💹 Taxa de Economia: {resultado['taxa_economia']:.1f}% {resultado['classificacao_economia']}")
+
+# ---------- RELATÓRIO POR PERÍODO ----------
+elif menu == "📅 Relatório por Período":
+    st.header("📅 Relatório por Período")
+    escolha = st.selectbox("Período", options=list(PERIODOS.values()) + ["Personalizado"])
+    if escolha == "Personalizado":
+        hoje = datetime.now().date()
+        intervalo = st.date_input("De / até", value=(hoje.replace(month=1, day=1), hoje))
+        inicio, fim = (intervalo[0], intervalo[1]) if len(intervalo) == 2 else (intervalo[0], intervalo[0])
+    else:
+        inicio, fim = intervalo_periodo(next(k for k, v in PERIODOS.items() if v == escolha))
+    st.caption(f"{inicio.strftime('%d/%m/%Y')} a {fim.strftime('%d/%m/%Y')}")
+
+    motor = obter_motor()
+    resultado = motor.analisar_periodo(inicio, fim)
+    if resultado is None:
+        st.info("Nenhuma transação no período.")
+    else:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Receitas", formatar_brl(resultado['receitas']))
+        col2.metric("Despesas", formatar_brl(resultado['despesas']))
+        col3.metric("Saldo", formatar_brl(resultado['saldo']))
+        st.caption(f"{resultado['quantidade']} transação(ões)")
+        serie = motor.serie_mensal(inicio, fim)
+        if len(serie) > 1:
+            st.subheader("Evolução mensal")
+            grafico = serie[['receita', 'despesa']].copy()
+            grafico.index = grafico.index.strftime('%m/%Y')
+            st.bar_chart(grafico)
         if resultado['gastos_categoria']:
             gasto_cat = pd.DataFrame(list(resultado['gastos_categoria'].items()), columns=['Categoria','Valor'])
             gasto_cat['%'] = gasto_cat['Valor'] / resultado['despesas'] * 100
-            st.subheader("Distribuição por categoria")
-            st.dataframe(gasto_cat.sort_values('Valor', ascending=False), use_container_width=True)
+            st.subheader("Despesas por categoria")
+            st.dataframe(gasto_cat, use_container_width=True)
 
 # ---------- PREVISÃO PRÓXIMO MÊS ----------
 elif menu == "🔮 Previsão Próximo Mês":
     st.header("🔮 Previsão para o Próximo Mês")
-    previsao = sistema.prever_proximo_mes()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        modelo = st.selectbox("Modelo", options=list(MODELOS), format_func=MODELOS.get)
+    with col2:
+        meses_historico = st.slider("Meses de histórico", min_value=2, max_value=24, value=3)
+    with col3:
+        horizonte = st.slider("Meses à frente", min_value=1, max_value=12, value=1)
+    previsao = sistema.calcular_previsao(meses_historico, horizonte, modelo)
     if not previsao:
         st.info("Dados insuficientes para previsão (registre pelo menos 2 meses).")
     else:
-        st.write(f"Receita prevista: R$ {previsao['receita_prevista']:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        st.write(f"Despesa prevista: R$ {previsao['despesa_prevista']:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        st.write(f"Saldo previsto: R$ {previsao['saldo_previsto']:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
+        st.caption(f"Baseado em {len(previsao['historico'])} meses de histórico: {', '.join(previsao['historico'])}")
+        st.write(f"Receita prevista: {formatar_brl(previsao['receita_prevista'])}")
+        st.write(f"Despesa prevista: {formatar_brl(previsao['despesa_prevista'])}")
+        st.write(f"Saldo previsto: {formatar_brl(previsao['saldo_previsto'])}")
+        if horizonte > 1:
+            st.subheader("Próximos meses")
+            st.dataframe(pd.DataFrame(previsao['meses']).set_index('mes'), use_container_width=True)
+        por_categoria = pd.DataFrame(
+            [(tipo, cat, valores[0]) for (tipo, cat), valores in previsao['categorias'].items()],
+            columns=['Tipo', 'Categoria', 'Previsto'])
+        st.subheader("Previsão por categoria (próximo mês)")
+        st.dataframe(por_categoria.sort_values('Previsto', ascending=False), use_container_width=True)
 
 # ---------- RECOMENDAÇÕES ----------
 elif menu == "💡 Recomendações":
     st.header("💡 Recomendações Inteligentes")
-    rec = sistema.gerar_recomendacoes()  # seu método já printa; também pode retornar
-    st.info("Verifique o terminal do servidor (ou adapte gerar_recomendacoes para retornar dados).")
+    analise = sistema.calcular_analise()
+    if not analise:
+        st.info("Nenhuma transação registrada neste mês.")
+    else:
+        recomendacoes = sistema.calcular_recomendacoes(analise)
+        for rec in recomendacoes:
+            st.markdown(f"**{rec['prioridade']} | {rec['titulo']}**  \n→ {rec['acao']}")
+        if not recomendacoes:
+            st.success("Suas finanças estão equilibradas! Continue assim! 🎉")
 
 # ---------- DASHBOARD ----------
 elif menu == "📈 Dashboard Completo":
     st.header("📈 Dashboard Completo")
-    anal = sistema.analisar_gastos()
+    anal = sistema.calcular_analise()
     if not anal:
         st.info("Nenhuma transação registrada.")
     else:
-        receitas = anal['receitas']
-        despesas = anal['despesas']
-        saldo = anal['saldo']
-        uso_orcamento = min((despesas / receitas) * 100, 100) if receitas>0 else 0
-        st.metric("Receitas", f"R$ {receitas:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        st.metric("Despesas", f"R$ {despesas:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        st.metric("Saldo", f"R$ {saldo:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.'))
-        st.progress(int(uso_orcamento))
+        uso_orcamento = anal['uso_orcamento'] or 0
+        st.metric("Receitas", formatar_brl(anal['receitas']))
+        st.metric("Despesas", formatar_brl(anal['despesas']))
+        st.metric("Saldo", formatar_brl(anal['saldo']))
+        st.progress(int(min(uso_orcamento, 100)))
         st.write(f"Uso do orçamento: {uso_orcamento:.1f}%")
         # mostrar top categorias
         if anal['gastos_categoria']:
@@ -171,17 +353,15 @@ elif menu == "📈 Dashboard Completo":
 # ---------- EDITAR TRANSAÇÃO ----------
 elif menu == "✏️ Editar Transação":
     st.header("✏️ Editar Transação")
-    # pega todas as transações e mostra em tabela com id
-    todas = sistema.transacoes
-    if not todas:
+    if not len(sistema):
         st.info("Nenhuma transação para editar.")
     else:
-        df_all = transacoes_para_df(todas)
-        st.dataframe(df_all, use_container_width=True)
-        ids = [t['id'] for t in todas]
-        escolha = st.selectbox("Escolha o ID da transação para editar", options=ids)
-        trans = next((t for t in todas if t['id']==escolha), None)
-        if trans:
+        tabela_paginada("edt", **filtros_avancados("edt"))
+        escolha = st.number_input("ID da transação para editar", min_value=1, step=1, key="edt_id")
+        trans = sistema.obter_transacao(int(escolha))
+        if not trans:
+            st.warning(f"Transação #{int(escolha)} não encontrada.")
+        else:
             col1, col2 = st.columns(2)
             with col1:
                 novo_valor = st.number_input("Valor (R$)", value=float(trans['valor']), format="%.2f")
@@ -189,34 +369,125 @@ elif menu == "✏️ Editar Transação":
             with col2:
                 nova_desc = st.text_area("Descrição", value=trans['descricao'])
                 nova_data = st.date_input("Data", value=datetime.strptime(trans['data'],'%Y-%m-%d').date())
+            # versão exibida no formulário; se outra sessão salvar antes, a gravação é recusada
+            chave_versao = f"edt_versao_{trans['id']}"
+            versao_lida = st.session_state.setdefault(chave_versao, trans['versao'])
             if st.button("Salvar alterações"):
                 # aplica alterações sem usar a função interativa editar_transacao
-                trans['valor'] = float(novo_valor)
-                trans['categoria'] = nova_categoria
-                trans['descricao'] = nova_desc
-                trans['data'] = nova_data.strftime('%Y-%m-%d')
-                sistema.salvar_dados()
-                st.success("Transação atualizada com sucesso!")
-                st.experimental_rerun()
+                try:
+                    sistema.atualizar_transacao(trans['id'], {
+                        'valor': float(novo_valor),
+                        'categoria': nova_categoria,
+                        'descricao': nova_desc,
+                        'data': nova_data.strftime('%Y-%m-%d'),
+                    }, versao_esperada=versao_lida)
+                except ConflitoDeVersao as e:
+                    st.error(f"{e}. Confira os valores atuais e tente de novo.")
+                else:
+                    st.success("Transação atualizada com sucesso!")
+                finally:
+                    del st.session_state[chave_versao]
 
 # ---------- DELETAR TRANSAÇÃO ----------
 elif menu == "🗑️ Deletar Transação":
     st.header("🗑️ Deletar Transação")
-    todas = sistema.transacoes
-    if not todas:
+    if not len(sistema):
         st.info("Nenhuma transação para deletar.")
     else:
-        df_all = transacoes_para_df(todas)
-        st.dataframe(df_all, use_container_width=True)
-        ids = [t['id'] for t in todas]
-        escolha = st.selectbox("Escolha o ID da transação a deletar", options=ids, key="del_select")
-        trans = next((t for t in todas if t['id']==escolha), None)
-        if trans:
+        tabela_paginada("del", **filtros_avancados("del"))
+        escolha = st.number_input("ID da transação a deletar", min_value=1, step=1, key="del_id")
+        trans = sistema.obter_transacao(int(escolha))
+        if not trans:
+            st.warning(f"Transação #{int(escolha)} não encontrada.")
+        else:
             st.write("Você selecionou:")
             st.write(f"ID: {trans['id']} — {trans['tipo'].upper()} — {trans['categoria']} — R$ {trans['valor']:.2f} — {trans['data']}")
+            chave_versao = f"del_versao_{trans['id']}"
+            versao_lida = st.session_state.setdefault(chave_versao, trans['versao'])
             if st.button("Confirmar exclusão"):
-                sistema.transacoes.remove(trans)
-                sistema.salvar_dados()
-                st.success("Transação deletada com sucesso!")
-                st.experimental_rerun()
+                try:
+                    sistema.remover_transacao(trans['id'], versao_esperada=versao_lida)
+                except ConflitoDeVersao as e:
+                    st.error(f"{e}. Confira a transação antes de excluir.")
+                else:
+                    st.success("Transação deletada com sucesso!")
+                finally:
+                    del st.session_state[chave_versao]
+
+
+# ---------- IMPORTAR EXTRATO ----------
+elif menu == "📥 Importar Extrato":
+    st.header("📥 Importar Extrato (CSV/OFX)")
+    st.write("CSV com colunas **Data** e **Valor** (opcionais: Descrição, Categoria, Tipo); valores negativos viram despesas.")
+    arquivo = st.file_uploader("Arquivo do banco", type=["csv", "ofx"])
+    if arquivo is not None and st.button("Importar"):
+        try:
+            relatorio = importar_extrato(sistema, arquivo, arquivo.name)
+        except ValueError as e:
+            st.error(f"Erro ao importar: {e}")
+        else:
+            st.success(f"✅ {relatorio['importadas']} transação(ões) importada(s)")
+            if relatorio['duplicadas']:
+                st.info(f"🔁 {relatorio['duplicadas']} duplicada(s) ignorada(s)")
+            if relatorio['categorizadas']:
+                st.info(f"🏷️ {relatorio['categorizadas']} categorizada(s) automaticamente pela descrição")
+            if relatorio['erros']:
+                st.warning(f"❌ {len(relatorio['erros'])} linha(s) com erro")
+                st.dataframe(pd.DataFrame(relatorio['erros'], columns=['Linha', 'Motivo']), use_container_width=True)
+            if relatorio['avisos']:
+                st.dataframe(pd.DataFrame(relatorio['avisos'], columns=['Linha', 'Aviso']), use_container_width=True)
+
+# ---------- ORÇAMENTOS ----------
+elif menu == "💰 Orçamentos":
+    st.header("💰 Orçamentos e Alertas")
+    hoje = datetime.now()
+    col1, col2 = st.columns(2)
+    with col1:
+        mes = st.selectbox("Mês", list(range(1, 13)), index=hoje.month - 1, key="orc_mes")
+    with col2:
+        ano = st.number_input("Ano", min_value=2000, max_value=2100, value=hoje.year, step=1, key="orc_ano")
+    situacao = sistema.situacao_orcamentos(mes, int(ano))
+    if not situacao:
+        st.info("Nenhum orçamento definido.")
+    for item in situacao:
+        nome = item['categoria'] or "Geral"
+        st.write(f"**{nome}** — {formatar_brl(item['gasto'])} de {formatar_brl(item['limite'])} ({item['percentual']:.1f}%)")
+        st.progress(min(item['percentual'] / 100, 1.0))
+
+    with st.form("form_orcamento"):
+        st.subheader("Definir limite mensal")
+        opcoes = ["(geral)"] + sistema.categorias('despesa')
+        categoria = st.selectbox("Categoria", opcoes, key="orc_cat")
+        limite = st.number_input("Limite (R$, 0 remove)", min_value=0.0, format="%.2f", key="orc_limite")
+        salvar = st.form_submit_button("Salvar limite")
+    if salvar:
+        try:
+            sistema.definir_orcamento(None if categoria == "(geral)" else categoria, limite)
+            st.success("✅ Orçamento atualizado")
+        except (ValueError, IOError) as e:
+            st.error(f"Erro ao salvar: {e}")
+
+    st.subheader("Histórico de alertas")
+    alertas = sistema.historico_alertas(limite=200)
+    if alertas:
+        st.dataframe(pd.DataFrame([{'Quando': a['data_hora'].replace('T', ' '), 'Mês': f"{a['mes']:02d}/{a['ano']}",
+                                    'Orçamento': a['categoria'] or "Geral", 'Limiar': f"{a['limiar']}%",
+                                    'Gasto': a['gasto'], 'Limite': a['limite']} for a in alertas]),
+                     use_container_width=True)
+    else:
+        st.caption("Nenhum alerta disparado.")
+
+# ---------- ALERTAS DE ORÇAMENTO ----------
+# notifica os alertas disparados desde a última página desta sessão (por ela, pelo CLI ou por outra aba)
+total_alertas = len(sistema.orcamentos.alertas)
+alertas_vistos = st.session_state.get("alertas_vistos", total_alertas)
+if total_alertas > alertas_vistos:
+    for alerta in reversed(sistema.historico_alertas(limite=total_alertas - alertas_vistos)):
+        st.toast(texto_alerta(alerta))
+st.session_state["alertas_vistos"] = total_alertas
 
+# Fecha o perfil (se ligado) depois de montar a página
+perfil_pagina.close()
+if st.session_state.get("diag_perfil"):
+    with st.sidebar.expander("📈 Perfil desta página", expanded=True):
+        st.code(relatorio_perfil['texto'])
@@ -0,0 +1,23 @@
+# Testes do FinTrack: python -m pytest -q (na raiz do repositório)
+# Os módulos ficam soltos em FinTrack/, então a pasta entra no sys.path aqui.
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fintrack_armazenamento import MODOS_ARMAZENAMENTO  # noqa: E402
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    """Arquivo de dados numa pasta temporária (os arquivos auxiliares ficam ao lado)"""
+    return str(tmp_path / 'fintrack_data.json')
+
+
+@pytest.fixture(params=sorted(MODOS_ARMAZENAMENTO))
+def modo(request):
+    """Cada teste que pede o modo roda uma vez por modo de armazenamento"""
+    return request.param
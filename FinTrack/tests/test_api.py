@@ -0,0 +1,162 @@
+# API HTTP local (fintrack_api): rotas, ETag/If-Match e If-None-Match, sobre uma conexão keep-alive
+
+import asyncio
+import json
+from datetime import date
+
+import pytest
+
+from fintrack import FinTrack
+from fintrack_api import ServidorAPI
+
+
+class Cliente:
+    """Cliente HTTP/1.1 mínimo sobre uma conexão aberta (entende Content-Length e chunked)"""
+    def __init__(self, leitor, escritor):
+        self.leitor = leitor
+        self.escritor = escritor
+
+    async def enviar_bruto(self, dados):
+        self.escritor.write(dados)
+        await self.escritor.drain()
+
+    async def pedir(self, metodo, alvo, corpo=None, cabecalhos=None):
+        conteudo = json.dumps(corpo).encode('utf-8') if corpo is not None else b''
+        linhas = [f"{metodo} {alvo} HTTP/1.1", "Host: teste", f"Content-Length: {len(conteudo)}"]
+        linhas += [f"{nome}: {valor}" for nome, valor in (cabecalhos or {}).items()]
+        await self.enviar_bruto(('\r\n'.join(linhas) + '\r\n\r\n').encode('latin-1') + conteudo)
+        return await self.resposta()
+
+    async def resposta(self):
+        inicio = (await self.leitor.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        status = int(inicio[0].split()[1])
+        cabecalhos = {}
+        for linha in inicio[1:]:
+            nome, _, valor = linha.partition(':')
+            if nome:
+                cabecalhos[nome.strip().lower()] = valor.strip()
+        if 'content-length' in cabecalhos:
+            corpo = await self.leitor.readexactly(int(cabecalhos['content-length']))
+        else:
+            corpo = b''
+            while True:
+                tamanho = int((await self.leitor.readuntil(b'\r\n'))[:-2], 16)
+                corpo += (await self.leitor.readexactly(tamanho + 2))[:-2]
+                if not tamanho:
+                    break
+        return status, cabecalhos, json.loads(corpo) if corpo else None
+
+
+def _rodar(sistema, cenario):
+    """Sobe a API numa porta livre, abre uma conexão e roda `cenario(cliente, porta)`"""
+    async def principal():
+        api = ServidorAPI(sistema)
+        servidor = await asyncio.start_server(api.atender, '127.0.0.1', 0)
+        porta = servidor.sockets[0].getsockname()[1]
+        try:
+            leitor, escritor = await asyncio.open_connection('127.0.0.1', porta)
+            await cenario(Cliente(leitor, escritor), porta)
+            escritor.close()
+        finally:
+            servidor.close()
+            await servidor.wait_closed()
+    asyncio.run(principal())
+
+
+@pytest.fixture
+def sistema(arquivo, modo):
+    return FinTrack(arquivo, modo)
+
+
+NOVA = {'tipo': 'despesa', 'valor': 10, 'categoria': 'Alimentação', 'descricao': 'padaria', 'data': '2025-03-05'}
+
+
+def test_crud(sistema):
+    async def cenario(cliente, porta):
+        status, _, criada = await cliente.pedir('POST', '/transacoes', NOVA)
+        assert status == 201 and criada['id'] == 1 and criada['versao'] == 1
+        status, _, lote = await cliente.pedir('POST', '/transacoes', [dict(NOVA, valor=i + 1) for i in range(50)])
+        assert status == 201 and len(lote) == 50
+        status, _, lista = await cliente.pedir('GET', '/transacoes?limite=100&tipo=despesa')
+        assert status == 200 and lista['total'] == 51 and len(lista['transacoes']) == 51
+        status, _, transacao = await cliente.pedir('GET', '/transacoes/1')
+        assert status == 200 and transacao['descricao'] == 'padaria'
+        status, _, _ = await cliente.pedir('DELETE', '/transacoes/1')
+        assert status == 200
+        assert (await cliente.pedir('GET', '/transacoes/1'))[0] == 404
+    _rodar(sistema, cenario)
+    assert len(sistema) == 50
+
+
+def test_erros(sistema):
+    async def cenario(cliente, porta):
+        status, _, corpo = await cliente.pedir('POST', '/transacoes', [{'tipo': 'x', 'valor': 1}, NOVA])
+        assert status == 400 and corpo['erros'][0]['item'] == 0
+        assert (await cliente.pedir('PATCH', '/transacoes/99', {'valor': 1}))[0] in (404, 409)
+        assert (await cliente.pedir('PUT', '/transacoes/1'))[0] == 405
+        assert (await cliente.pedir('GET', '/nada'))[0] == 404
+        assert (await cliente.pedir('GET', '/analise?mes=13'))[0] == 400
+    _rodar(sistema, cenario)
+    # O lote com um item inválido não grava nenhum
+    assert len(sistema) == 0
+
+
+def test_if_match(sistema):
+    async def cenario(cliente, porta):
+        await cliente.pedir('POST', '/transacoes', NOVA)
+        _, cabecalhos, _ = await cliente.pedir('GET', '/transacoes/1')
+        etag = cabecalhos['etag']
+        status, cabecalhos, editada = await cliente.pedir('PATCH', '/transacoes/1', {'valor': 20}, {'If-Match': etag})
+        assert status == 200 and editada['valor'] == 20 and editada['versao'] == 2
+        assert cabecalhos['etag'] != etag
+        # A mesma ETag agora está velha: outra edição com ela é recusada
+        status, _, _ = await cliente.pedir('PATCH', '/transacoes/1', {'valor': 30}, {'If-Match': etag})
+        assert status == 409
+        status, _, _ = await cliente.pedir('DELETE', '/transacoes/1', cabecalhos={'If-Match': etag})
+        assert status == 409
+        assert (await cliente.pedir('PATCH', '/transacoes/1', {'campo': 1}))[0] == 400
+    _rodar(sistema, cenario)
+    assert sistema.obter_transacao(1)['valor'] == 20
+
+
+def test_if_none_match(sistema):
+    async def cenario(cliente, porta):
+        await cliente.pedir('POST', '/transacoes', NOVA)
+        status, cabecalhos, analise = await cliente.pedir('GET', '/analise?mes=3&ano=2025')
+        assert status == 200 and analise is not None
+        etag = cabecalhos['etag']
+        status, _, corpo = await cliente.pedir('GET', '/analise?mes=3&ano=2025', cabecalhos={'If-None-Match': etag})
+        assert status == 304 and corpo is None
+        # Uma transação nova no mês muda a análise e a ETag
+        await cliente.pedir('POST', '/transacoes', dict(NOVA, valor=99))
+        status, cabecalhos, _ = await cliente.pedir('GET', '/analise?mes=3&ano=2025', cabecalhos={'If-None-Match': etag})
+        assert status == 200 and cabecalhos['etag'] != etag
+    _rodar(sistema, cenario)
+
+
+def test_previsao_e_recomendacoes(sistema):
+    async def cenario(cliente, porta):
+        # Seis meses de histórico até o mês passado
+        hoje = date.today()
+        meses = [((hoje.year * 12 + hoje.month - 1 - k) // 12, (hoje.year * 12 + hoje.month - 1 - k) % 12 + 1)
+                 for k in range(1, 7)]
+        await cliente.pedir('POST', '/transacoes', [dict(NOVA, data=f'{ano}-{mes:02d}-10') for ano, mes in meses])
+        status, _, previsao = await cliente.pedir('GET', '/previsao?meses=3&horizonte=2')
+        assert status == 200 and isinstance(previsao['categorias'], list)
+        assert (await cliente.pedir('GET', '/recomendacoes?mes=3&ano=2025'))[0] == 200
+        assert (await cliente.pedir('GET', '/saude'))[0] == 200
+    _rodar(sistema, cenario)
+
+
+@pytest.mark.parametrize('tamanho', ['abc', '-1', '²', '1e3'])
+def test_content_length_invalido(sistema, tamanho):
+    async def cenario(cliente, porta):
+        await cliente.enviar_bruto(f"POST /transacoes HTTP/1.1\r\nContent-Length: {tamanho}\r\n\r\n".encode('latin-1'))
+        status, _, corpo = await cliente.resposta()
+        assert status == 400 and 'Content-Length' in corpo['erro']
+        # A conexão é fechada, mas o servidor continua atendendo
+        assert await cliente.leitor.read() == b''
+        leitor, escritor = await asyncio.open_connection('127.0.0.1', porta)
+        assert (await Cliente(leitor, escritor).pedir('GET', '/saude'))[0] == 200
+        escritor.close()
+    _rodar(sistema, cenario)
@@ -0,0 +1,142 @@
+# Ida e volta pelo disco e conflitos entre sessões, em todos os modos de armazenamento
+
+import multiprocessing
+
+import pytest
+
+from fintrack import FinTrack
+from fintrack_armazenamento import ConflitoDeVersao
+
+
+def _lote(quantidade, ano=2024):
+    return [{'tipo': 'despesa' if i % 3 else 'receita', 'valor': i + 0.5,
+             'categoria': 'Alimentação' if i % 3 else 'Salário', 'descricao': f'item {i}',
+             'data': f'{ano + i % 3}-{1 + i % 12:02d}-{1 + i % 28:02d}'} for i in range(quantidade)]
+
+
+def _estado(sistema):
+    return sorted((t['id'], t['tipo'], t['valor'], t['categoria'], t['descricao'], t['data'], t['versao'])
+                  for t in sistema.transacoes)
+
+
+def test_ida_e_volta(arquivo, modo):
+    sistema = FinTrack(arquivo, modo)
+    sistema.adicionar_em_lote(_lote(30))
+    sistema.adicionar_transacao('despesa', 12.34, 'Transporte', 'uber', '2025-06-15')
+    sistema.atualizar_transacao(2, {'valor': 99.9, 'descricao': 'editada'})
+    sistema.remover_transacao(3)
+    sistema.remover_em_lote([4, 5])
+
+    reaberto = FinTrack(arquivo, modo)
+    assert _estado(reaberto) == _estado(sistema)
+    assert len(reaberto) == 31 - 3
+    assert reaberto.obter_transacao(2)['versao'] == 2
+    assert reaberto.obter_transacao(3) is None
+    # O alocador continua depois do maior ID já usado, mesmo com os removidos
+    assert reaberto.adicionar_em_lote(_lote(1))[0]['id'] == 32
+
+
+def test_ida_e_volta_resumos(arquivo, modo):
+    sistema = FinTrack(arquivo, modo)
+    sistema.adicionar_em_lote(_lote(60))
+    sistema.atualizar_transacao(7, {'data': '2026-01-10'})
+    reaberto = FinTrack(arquivo, modo)
+    for ano in (2024, 2025, 2026):
+        for mes in range(1, 13):
+            assert reaberto.resumo_do_mes(mes, ano) == sistema.resumo_do_mes(mes, ano)
+            assert (sorted(t['id'] for t in reaberto.consultar_mes(mes, ano)['transacoes'])
+                    == sorted(t['id'] for t in sistema.consultar_mes(mes, ano)['transacoes']))
+
+
+def test_ida_e_volta_com_write_behind(arquivo, modo):
+    sistema = FinTrack(arquivo, modo, intervalo_gravacao=60)
+    sistema.adicionar_em_lote(_lote(10))
+    sistema.atualizar_transacao(1, {'valor': 1.25})
+    sistema.remover_transacao(2)
+    sistema.flush()
+    assert _estado(FinTrack(arquivo, modo)) == _estado(sistema)
+
+
+def test_sessao_desatualizada_nao_sobrescreve_insercoes(arquivo, modo):
+    a = FinTrack(arquivo, modo)
+    b = FinTrack(arquivo, modo)
+    a.adicionar_transacao('despesa', 10, 'Outros', 'a', '2024-01-01')
+    b.adicionar_transacao('despesa', 20, 'Outros', 'b', '2024-01-02')
+    assert sorted(t['descricao'] for t in FinTrack(arquivo, modo).transacoes) == ['a', 'b']
+    assert len({t['id'] for t in FinTrack(arquivo, modo).transacoes}) == 2
+
+
+def test_conflito_de_edicao(arquivo, modo):
+    a = FinTrack(arquivo, modo)
+    a.adicionar_transacao('despesa', 10, 'Outros', 'x', '2024-01-01')
+    b = FinTrack(arquivo, modo)
+    assert b.obter_transacao(1)['versao'] == 1   # b leu a versão 1
+    a.atualizar_transacao(1, {'valor': 11})
+    with pytest.raises(ConflitoDeVersao):
+        b.atualizar_transacao(1, {'valor': 12})
+    # O disco venceu e a sessão perdedora foi recarregada
+    assert b.obter_transacao(1)['valor'] == 11
+    assert b.obter_transacao(1)['versao'] == 2
+    assert FinTrack(arquivo, modo).obter_transacao(1)['valor'] == 11
+
+
+def test_conflito_de_remocao(arquivo, modo):
+    a = FinTrack(arquivo, modo)
+    a.adicionar_transacao('despesa', 10, 'Outros', 'x', '2024-01-01')
+    b = FinTrack(arquivo, modo)
+    b.atualizar_transacao(1, {'descricao': 'editada'})
+    with pytest.raises(ConflitoDeVersao):
+        a.remover_transacao(1)
+    assert FinTrack(arquivo, modo).obter_transacao(1)['descricao'] == 'editada'
+
+
+def test_versao_esperada(arquivo, modo):
+    sistema = FinTrack(arquivo, modo)
+    sistema.adicionar_transacao('despesa', 10, 'Outros', 'x', '2024-01-01')
+    with pytest.raises(ConflitoDeVersao):
+        sistema.atualizar_transacao(1, {'valor': 5}, versao_esperada=2)
+    with pytest.raises(ConflitoDeVersao):
+        sistema.remover_transacao(1, versao_esperada=2)
+    assert sistema.atualizar_transacao(1, {'valor': 5}, versao_esperada=1)['versao'] == 2
+
+
+def test_recarrega_gravacao_de_outra_sessao(arquivo, modo):
+    a = FinTrack(arquivo, modo)
+    b = FinTrack(arquivo, modo)
+    assert not b.recarregar_se_alterado()
+    a.adicionar_em_lote(_lote(5))
+    assert b.recarregar_se_alterado()
+    assert _estado(b) == _estado(a)
+
+
+def _escritor(arquivo, modo, n):
+    sistema = FinTrack(arquivo, modo)
+    for k in range(10):
+        if k % 5 == 0:
+            sistema.adicionar_em_lote([{'tipo': 'receita', 'valor': 1, 'categoria': 'Outros',
+                                        'descricao': f'p{n}', 'data': '2024-02-01'}] * 3)
+        else:
+            sistema.adicionar_transacao('despesa', 1, 'Outros', f'p{n}', '2024-02-02')
+
+
+def test_processos_concorrentes(arquivo, modo):
+    processos = [multiprocessing.Process(target=_escritor, args=(arquivo, modo, n)) for n in range(4)]
+    for processo in processos:
+        processo.start()
+    for processo in processos:
+        processo.join()
+    assert all(processo.exitcode == 0 for processo in processos)
+    ids = [t['id'] for t in FinTrack(arquivo, modo).transacoes]
+    assert len(ids) == 4 * (8 + 2 * 3)
+    assert len(set(ids)) == len(ids)
+
+
+def test_mes_com_gravacao_de_outra_sessao(arquivo, modo):
+    a = FinTrack(arquivo, modo)
+    b = FinTrack(arquivo, modo)
+    b.consultar_mes(3, 2024)
+    a.adicionar_transacao('despesa', 10, 'Outros', 'a', '2024-03-01')
+    # Antes de recarregar, b lista o mês pelo que tem em memória (sem linhas desconhecidas)
+    assert b.consultar_mes(3, 2024)['transacoes'] == []
+    assert b.recarregar_se_alterado()
+    assert [t['descricao'] for t in b.consultar_mes(3, 2024)['transacoes']] == ['a']
@@ -0,0 +1,81 @@
+# Consulta paginada: a página por data (mês a mês) bate com filtrar e ordenar tudo;
+# o quadro da web reaproveita as linhas e acompanha as alterações pela versão
+
+import random
+
+import pytest
+
+from fintrack import FinTrack
+from fintrack_exibicao import QuadroTransacoes
+
+CATEGORIAS = {'despesa': ['Alimentação', 'Transporte'], 'receita': ['Salário']}
+
+
+@pytest.fixture
+def sistema(arquivo, modo):
+    aleatorio = random.Random(7)
+    sistema = FinTrack(arquivo, modo)
+    lote = []
+    for _ in range(400):
+        tipo = aleatorio.choice(['despesa', 'despesa', 'receita'])
+        lote.append({'tipo': tipo, 'valor': round(aleatorio.uniform(1, 500), 2),
+                     'categoria': aleatorio.choice(CATEGORIAS[tipo]), 'descricao': '',
+                     'data': f'{aleatorio.randint(2022, 2024)}-{aleatorio.randint(1, 12):02d}-{aleatorio.randint(1, 28):02d}'})
+    sistema.adicionar_em_lote(lote)
+    return sistema
+
+
+def _referencia(sistema, decrescente, tipo, categoria, data_inicial, data_final):
+    selecionadas = [t for t in sistema.transacoes
+                    if (tipo is None or t['tipo'] == tipo)
+                    and (categoria is None or t['categoria'].lower() == categoria.lower())
+                    and (data_inicial is None or t['data'] >= data_inicial)
+                    and (data_final is None or t['data'] <= data_final)]
+    return sorted(selecionadas, key=lambda t: (t['data'], t['id']), reverse=decrescente)
+
+
+@pytest.mark.parametrize('filtros', [
+    {},
+    {'tipo': 'despesa'},
+    {'categoria': 'alimentação'},
+    {'data_inicial': '2023-02-15', 'data_final': '2023-11-03'},
+    {'tipo': 'receita', 'data_inicial': '2022-06-01'},
+    {'data_final': '2022-01-01'},
+])
+@pytest.mark.parametrize('decrescente', [True, False])
+def test_paginas_por_data(sistema, filtros, decrescente):
+    esperado = _referencia(sistema, decrescente, filtros.get('tipo'), filtros.get('categoria'),
+                           filtros.get('data_inicial'), filtros.get('data_final'))
+    obtido = []
+    for inicio in range(0, len(esperado) + 37, 37):
+        pagina, total = sistema.consultar_transacoes(inicio, 37, 'data', decrescente, **filtros)
+        assert total == len(esperado)
+        obtido.extend(pagina)
+    assert [t['id'] for t in obtido] == [t['id'] for t in esperado]
+
+
+def test_ordenar_por_valor(sistema):
+    pagina, total = sistema.consultar_transacoes(0, 10, 'valor', True, valor_min=100)
+    esperado = sorted((t for t in sistema.transacoes if t['valor'] >= 100), key=lambda t: t['valor'], reverse=True)
+    assert total == len(esperado)
+    assert [t['valor'] for t in pagina] == [t['valor'] for t in esperado[:10]]
+
+
+def test_quadro_acompanha_as_alteracoes(sistema):
+    pytest.importorskip('pandas')
+    quadro = QuadroTransacoes()
+    pagina, _ = sistema.consultar_transacoes(0, 20)
+    df = quadro.pagina(sistema, pagina)
+    assert list(df['id']) == [t['id'] for t in pagina]
+    assert df['data'].iloc[0] == '/'.join(reversed(pagina[0]['data'].split('-')))
+
+    editada, removida = pagina[0]['id'], pagina[1]['id']
+    sistema.atualizar_transacao(editada, {'descricao': 'editada', 'valor': 1.5})
+    sistema.remover_em_lote([removida])
+    pagina, _ = sistema.consultar_transacoes(0, 20)
+    df = quadro.pagina(sistema, pagina).set_index('id')
+    assert removida not in df.index
+    assert (df.loc[editada, 'descricao'], df.loc[editada, 'valor']) == ('editada', 1.5)
+    assert list(df.index) == [t['id'] for t in pagina]
+    # Só as linhas que passaram pela tela ficam no quadro (as 19 que restaram e a que entrou na página)
+    assert len(quadro.df) == 20
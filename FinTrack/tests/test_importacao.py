@@ -0,0 +1,73 @@
+# Importação de extratos: duplicatas, erros por linha e gravação única
+
+import io
+
+from fintrack import FinTrack
+from fintrack_importacao import importar_extrato, importar_linhas
+
+CSV = """Data;Descrição;Valor;Categoria
+05/03/2025;Padaria;-12,50;Alimentação
+05/03/2025;Padaria;-12,50;Alimentação
+06/03/2025;SALARIO EMPRESA;5000,00;Salário
+07/03/2025;Sem valor;;
+31/02/2025;Data errada;-1,00;
+02/04/2025;Posto Shell;-150,00;Transporte
+"""
+
+OFX = """<OFX><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250305<TRNAMT>-12.50<MEMO>PADARIA</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250308<TRNAMT>-40.00<MEMO>Farmácia</STMTTRN>
+</BANKTRANLIST></OFX>
+"""
+
+
+def _importar(sistema, conteudo, nome):
+    return importar_extrato(sistema, io.BytesIO(conteudo.encode('utf-8')), nome)
+
+
+def test_importa_csv(arquivo, modo):
+    sistema = FinTrack(arquivo, modo)
+    relatorio = _importar(sistema, CSV, 'extrato.csv')
+    assert relatorio['importadas'] == 4
+    assert relatorio['duplicadas'] == 0
+    assert [numero for numero, _ in relatorio['erros']] == [5, 6]
+    assert len(FinTrack(arquivo, modo)) == 4
+
+
+def test_reimportar_nao_duplica(arquivo, modo):
+    sistema = FinTrack(arquivo, modo)
+    _importar(sistema, CSV, 'extrato.csv')
+    relatorio = _importar(FinTrack(arquivo, modo), CSV, 'extrato.csv')
+    # As duas linhas iguais do extrato casam com as duas já gravadas
+    assert relatorio['importadas'] == 0
+    assert relatorio['duplicadas'] == 4
+    assert len(FinTrack(arquivo, modo)) == 4
+
+
+def test_duplicata_entre_fontes(arquivo, modo):
+    sistema = FinTrack(arquivo, modo)
+    _importar(sistema, CSV, 'extrato.csv')
+    # Mesma data, tipo, valor e descrição (sem diferenciar caixa): a padaria já existe
+    relatorio = _importar(sistema, OFX, 'extrato.ofx')
+    assert relatorio['importadas'] == 1
+    assert relatorio['duplicadas'] == 1
+    assert len(FinTrack(arquivo, modo)) == 5
+
+
+def test_linha_repetida_alem_das_gravadas_entra(arquivo, modo):
+    sistema = FinTrack(arquivo, modo)
+    linha = {'data': '2025-03-05', 'valor': '-9,90', 'descricao': 'Café', 'categoria': 'Alimentação'}
+    importar_linhas(sistema, [(2, linha)])
+    relatorio = importar_linhas(sistema, [(2, linha), (3, linha)])
+    assert relatorio['importadas'] == 1
+    assert relatorio['duplicadas'] == 1
+
+
+def test_uma_gravacao_por_importacao(arquivo, modo, monkeypatch):
+    sistema = FinTrack(arquivo, modo)
+    gravacoes = []
+    registrar_lote = sistema.armazenamento.registrar_lote
+    monkeypatch.setattr(sistema.armazenamento, 'registrar_lote',
+                        lambda *args: gravacoes.append(args[0]) or registrar_lote(*args))
+    _importar(sistema, CSV, 'extrato.csv')
+    assert gravacoes == ['add']
@@ -0,0 +1,62 @@
+# Journal append-only dos modos journal e binario: compactação e recuperação de quedas
+
+import pytest
+
+from fintrack import FinTrack
+
+
+@pytest.fixture(params=['journal', 'binario'])
+def modo_journal(request):
+    return request.param
+
+
+def _linhas(sistema):
+    with open(sistema.armazenamento.arquivo_journal, encoding='utf-8') as f:
+        return f.readlines()
+
+
+def _estado(sistema):
+    return sorted((t['id'], t['valor'], t['versao']) for t in sistema.transacoes)
+
+
+def test_mutacoes_vao_para_o_journal(arquivo, modo_journal):
+    sistema = FinTrack(arquivo, modo_journal)
+    sistema.adicionar_transacao('despesa', 10, 'Outros', 'a', '2024-01-01')
+    sistema.atualizar_transacao(1, {'valor': 11})
+    assert FinTrack(arquivo, modo_journal).obter_transacao(1)['valor'] == 11
+    sistema.remover_transacao(1)
+    # Cabeçalho (CRC do snapshot) + um evento por mutação
+    assert len(_linhas(sistema)) == 4
+    assert FinTrack(arquivo, modo_journal).transacoes == []
+
+
+def test_compactacao(arquivo, modo_journal):
+    sistema = FinTrack(arquivo, modo_journal)
+    sistema.armazenamento.limite_compactacao = 5
+    for i in range(12):
+        sistema.adicionar_transacao('despesa', i + 1, 'Outros', f'item {i}', '2024-01-01')
+    sistema.atualizar_transacao(3, {'valor': 30})
+    assert len(_linhas(sistema)) < 6
+    assert _estado(FinTrack(arquivo, modo_journal)) == _estado(sistema)
+
+
+def test_journal_de_snapshot_antigo_e_ignorado(arquivo, modo_journal):
+    sistema = FinTrack(arquivo, modo_journal)
+    sistema.adicionar_transacao('despesa', 10, 'Outros', 'a', '2024-01-01')
+    antigo = _linhas(sistema)
+    for i in range(3):
+        sistema.adicionar_transacao('despesa', 1, 'Outros', '', '2024-01-02')
+    sistema.salvar_dados()
+    # Queda entre gravar o snapshot e zerar o journal: os eventos antigos já estão no snapshot
+    with open(sistema.armazenamento.arquivo_journal, 'w', encoding='utf-8') as f:
+        f.writelines(antigo + ['{"op": "delete", "id": 1}\n'])
+    assert _estado(FinTrack(arquivo, modo_journal)) == _estado(sistema)
+
+
+def test_ultima_linha_truncada(arquivo, modo_journal):
+    sistema = FinTrack(arquivo, modo_journal)
+    sistema.adicionar_transacao('despesa', 10, 'Outros', 'a', '2024-01-01')
+    sistema.adicionar_transacao('despesa', 20, 'Outros', 'b', '2024-01-02')
+    with open(sistema.armazenamento.arquivo_journal, 'a', encoding='utf-8') as f:
+        f.write('{"op": "add", "transacao": {"id": 3, "tipo"')
+    assert [t['id'] for t in FinTrack(arquivo, modo_journal).transacoes] == [1, 2]
@@ -0,0 +1,96 @@
+# Orçamentos mensais: alertas em 70/90/100% conferidos a cada inserção ou edição
+
+from datetime import date
+
+import pytest
+
+from fintrack import FinTrack
+
+HOJE = date.today().isoformat()
+
+
+def _limiares(sistema, **filtros):
+    """(categoria, limiar) dos alertas, do mais antigo para o mais recente"""
+    return [(a['categoria'], a['limiar']) for a in reversed(sistema.historico_alertas(**filtros))]
+
+
+@pytest.fixture
+def sistema(arquivo, modo):
+    sistema = FinTrack(arquivo, modo)
+    sistema.definir_orcamento('Alimentação', 100)
+    return sistema
+
+
+def test_cada_limiar_dispara_uma_vez(sistema):
+    for valor in (50, 25, 10, 5, 20, 30):
+        sistema.adicionar_transacao('despesa', valor, 'Alimentação', '', HOJE)
+    assert _limiares(sistema) == [('Alimentação', 70), ('Alimentação', 90), ('Alimentação', 100)]
+    alerta = sistema.historico_alertas(limite=1)[0]
+    assert (alerta['gasto'], alerta['limite'], alerta['percentual']) == (110, 100, 110)
+
+
+def test_salto_dispara_so_o_maior_limiar(sistema):
+    sistema.adicionar_transacao('despesa', 150, 'Alimentação', '', HOJE)
+    assert _limiares(sistema) == [('Alimentação', 100)]
+    sistema.adicionar_transacao('despesa', 1, 'Alimentação', '', HOJE)
+    assert len(sistema.historico_alertas()) == 1
+
+
+def test_orcamento_geral(sistema):
+    sistema.definir_orcamento(None, 200)
+    sistema.adicionar_transacao('despesa', 150, 'Transporte', '', HOJE)
+    assert _limiares(sistema) == [(None, 70)]
+    assert _limiares(sistema, categoria='') == [(None, 70)]
+
+
+def test_receitas_e_outras_categorias_nao_contam(sistema):
+    sistema.adicionar_transacao('receita', 500, 'Salário', '', HOJE)
+    sistema.adicionar_transacao('despesa', 500, 'Transporte', '', HOJE)
+    assert sistema.historico_alertas() == []
+
+
+def test_meses_passados_nao_disparam(sistema):
+    sistema.adicionar_transacao('despesa', 500, 'Alimentação', '', '2020-01-10')
+    assert sistema.historico_alertas() == []
+
+
+def test_edicao_confere_o_orcamento(sistema):
+    sistema.adicionar_transacao('despesa', 10, 'Alimentação', '', HOJE)
+    sistema.atualizar_transacao(1, {'valor': 95})
+    assert _limiares(sistema) == [('Alimentação', 90)]
+
+
+def test_lote_dispara_uma_vez_por_orcamento(sistema):
+    sistema.adicionar_em_lote([{'tipo': 'despesa', 'valor': 30, 'categoria': 'Alimentação',
+                                'descricao': '', 'data': HOJE}] * 4)
+    assert _limiares(sistema) == [('Alimentação', 100)]
+
+
+def test_situacao(sistema):
+    sistema.adicionar_transacao('despesa', 40, 'Alimentação', '', HOJE)
+    hoje = date.today()
+    situacao = sistema.situacao_orcamentos(hoje.month, hoje.year)
+    assert situacao == [{'categoria': 'Alimentação', 'limite': 100, 'gasto': 40, 'percentual': 40}]
+
+
+def test_historico_persiste_e_nao_repete_entre_sessoes(arquivo, modo, sistema):
+    outra = FinTrack(arquivo, modo)
+    sistema.adicionar_transacao('despesa', 75, 'Alimentação', '', HOJE)
+    # A outra sessão não viu o alerta de 70%; ao gravar, relê o histórico e não o repete
+    outra.adicionar_transacao('despesa', 1, 'Alimentação', '', HOJE)
+    reaberto = FinTrack(arquivo, modo)
+    assert _limiares(reaberto) == [('Alimentação', 70)]
+    assert reaberto.orcamentos.limites == {'Alimentação': 100}
+
+
+def test_alertas_retornados_sem_saida_no_terminal(sistema, capsys, monkeypatch):
+    sistema.adicionar_transacao('despesa', 10, 'Alimentação', '', HOJE)
+    retornos = []
+    persistir_lote = sistema.persistir_lote
+    monkeypatch.setattr(sistema, 'persistir_lote', lambda operacao, lote: retornos.append(persistir_lote(operacao, lote)))
+    capsys.readouterr()
+    sistema.atualizar_transacao(1, {'valor': 95})
+    sistema.remover_transacao(1)
+    # Quem chama decide como mostrar os alertas; gravar não imprime nada
+    assert capsys.readouterr().out == ''
+    assert [[(a['categoria'], a['limiar']) for a in alertas] for alertas in retornos] == [[('Alimentação', 90)], []]
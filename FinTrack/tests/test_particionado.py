@@ -0,0 +1,87 @@
+# Modo particionado: abre só o índice e lê cada ano quando uma consulta precisa dele
+
+import os
+
+import pytest
+
+from fintrack import FinTrack
+
+ANOS = (2022, 2023, 2024)
+
+
+def _lote():
+    return [{'tipo': 'despesa' if i % 4 else 'receita', 'valor': 10 + i,
+             'categoria': 'Alimentação' if i % 4 else 'Salário', 'descricao': f'item {i}',
+             'data': f'{ANOS[i % 3]}-{1 + i % 12:02d}-{1 + i % 28:02d}'} for i in range(90)]
+
+
+@pytest.fixture
+def gravado(arquivo):
+    """Histórico de três anos já gravado; retorna a sessão que o gravou"""
+    sistema = FinTrack(arquivo, 'particionado')
+    sistema.adicionar_em_lote(_lote())
+    return sistema
+
+
+def _espiar(sistema, monkeypatch):
+    """Registra os anos lidos do disco pela sessão"""
+    lidos = []
+    carregar_ano = sistema.armazenamento.carregar_ano
+    monkeypatch.setattr(sistema.armazenamento, 'carregar_ano', lambda ano: lidos.append(ano) or carregar_ano(ano))
+    return lidos
+
+
+def test_abrir_le_so_o_indice(arquivo, gravado, monkeypatch):
+    reaberto = FinTrack(arquivo, 'particionado')
+    lidos = _espiar(reaberto, monkeypatch)
+    assert len(reaberto) == 90
+    for ano in ANOS:
+        for mes in range(1, 13):
+            assert reaberto.resumo_do_mes(mes, ano) == gravado.resumo_do_mes(mes, ano)
+    assert lidos == []
+
+
+def test_consulta_do_mes_le_so_o_ano(arquivo, gravado, monkeypatch):
+    reaberto = FinTrack(arquivo, 'particionado')
+    lidos = _espiar(reaberto, monkeypatch)
+    transacoes = reaberto.consultar_mes(2, 2023)['transacoes']
+    assert transacoes
+    assert sorted(t['id'] for t in transacoes) == sorted(t['id'] for t in gravado.consultar_mes(2, 2023)['transacoes'])
+    assert lidos == [2023]
+    reaberto.consultar_mes(5, 2023)
+    assert lidos == [2023]
+
+
+def test_todas_as_transacoes_carregam_os_anos_pendentes(arquivo, gravado):
+    reaberto = FinTrack(arquivo, 'particionado')
+    assert sorted(map(repr, reaberto.transacoes)) == sorted(map(repr, gravado.transacoes))
+    assert reaberto.obter_transacao(5) == gravado.obter_transacao(5)
+
+
+def test_gravacao_reescreve_so_o_ano_afetado(arquivo, gravado):
+    pasta = gravado.armazenamento.pasta
+    antes = {ano: os.stat(os.path.join(pasta, f'{ano}.fts')) for ano in ANOS}
+    FinTrack(arquivo, 'particionado').adicionar_transacao('despesa', 5, 'Outros', 'novo', '2024-05-05')
+    depois = {ano: os.stat(os.path.join(pasta, f'{ano}.fts')) for ano in ANOS}
+    for ano in (2022, 2023):
+        assert (depois[ano].st_ino, depois[ano].st_mtime_ns) == (antes[ano].st_ino, antes[ano].st_mtime_ns)
+    assert (depois[2024].st_ino, depois[2024].st_mtime_ns) != (antes[2024].st_ino, antes[2024].st_mtime_ns)
+
+
+def test_edicao_que_muda_de_ano(arquivo, gravado):
+    # ID 1 é de 2022; a sessão nova ainda não leu esse ano
+    reaberto = FinTrack(arquivo, 'particionado')
+    reaberto.atualizar_transacao(1, {'data': '2024-06-10'})
+    final = FinTrack(arquivo, 'particionado')
+    assert 1 not in [t['id'] for t in final.consultar_mes(1, 2022)['transacoes']]
+    assert 1 in [t['id'] for t in final.consultar_mes(6, 2024)['transacoes']]
+    assert final.resumo_do_mes(6, 2024) != gravado.resumo_do_mes(6, 2024)
+    assert len(final) == 90
+
+
+def test_importa_o_json_na_primeira_abertura(arquivo):
+    FinTrack(arquivo, 'json').adicionar_em_lote(_lote())
+    particionado = FinTrack(arquivo, 'particionado')
+    assert len(particionado) == 90
+    assert sorted(map(repr, particionado.transacoes)) == sorted(map(repr, FinTrack(arquivo, 'json').transacoes))
+    assert particionado.adicionar_em_lote(_lote()[:1])[0]['id'] == 91
@@ -0,0 +1,54 @@
+# Materialização das regras recorrentes: repetir (ou cair no meio) não duplica ocorrências
+
+from datetime import date, timedelta
+
+import pytest
+
+from fintrack import FinTrack
+
+
+def _inicio(dias):
+    return (date.today() - timedelta(days=dias)).isoformat()
+
+
+def _ocorrencias(sistema, descricao):
+    return sorted(t['data'] for t in sistema.transacoes if t['descricao'] == descricao)
+
+
+def test_materializar_de_novo_nao_duplica(arquivo, modo):
+    sistema = FinTrack(arquivo, modo)
+    sistema.criar_recorrente('despesa', 50, 'Moradia', 'condominio', 'semanal', _inicio(70))
+    geradas = _ocorrencias(sistema, 'condominio')
+    assert len(geradas) == 11
+    assert sistema.materializar_recorrentes() == []
+    reaberto = FinTrack(arquivo, modo)
+    assert reaberto.materializar_recorrentes() == []
+    assert _ocorrencias(reaberto, 'condominio') == geradas
+
+
+def test_duas_sessoes_nao_geram_a_mesma_ocorrencia(arquivo, modo):
+    a = FinTrack(arquivo, modo)
+    b = FinTrack(arquivo, modo)
+    a.recorrentes.criar('receita', 10, 'Outros', 'mesada', 'dias', _inicio(9), intervalo=3)
+    b.recorrentes.recarregar()
+    assert len(a.materializar_recorrentes()) == 4
+    assert b.materializar_recorrentes() == []
+    assert len(_ocorrencias(FinTrack(arquivo, modo), 'mesada')) == 4
+
+
+def test_queda_antes_de_avancar_o_cursor(arquivo, modo, monkeypatch):
+    sistema = FinTrack(arquivo, modo)
+    sistema.recorrentes.criar('despesa', 80, 'Lazer', 'streaming', 'mensal', _inicio(100))
+    # As transações chegam ao disco, mas o processo cai antes de gravar o cursor da regra
+    def queda():
+        raise OSError("queda")
+    monkeypatch.setattr(sistema, 'flush', queda)
+    with pytest.raises(OSError):
+        sistema.materializar_recorrentes()
+    monkeypatch.undo()
+    geradas = _ocorrencias(FinTrack(arquivo, modo), 'streaming')
+    assert len(geradas) >= 3
+
+    reaberto = FinTrack(arquivo, modo)
+    assert reaberto.materializar_recorrentes() == []
+    assert _ocorrencias(FinTrack(arquivo, modo), 'streaming') == geradas
@@ -0,0 +1,64 @@
+# Formato binário do snapshot (fintrack_snapshot) e o modo binario que o usa
+
+import struct
+
+import pytest
+
+from fintrack import FinTrack
+from fintrack_snapshot import (CABECALHO, VERSAO_FORMATO, ErroSnapshot, codificar_snapshot,
+                               decodificar_snapshot)
+
+TRANSACOES = [
+    {'id': 1, 'tipo': 'despesa', 'valor': 45.9, 'categoria': 'Alimentação', 'descricao': 'Padaria São João',
+     'data': '2025-03-02', 'versao': 1},
+    {'id': 7, 'tipo': 'receita', 'valor': 5000.0, 'categoria': 'Salário', 'descricao': '',
+     'data': '2025-03-05', 'versao': 3},
+    {'id': 8, 'tipo': 'despesa', 'valor': 0.01, 'categoria': 'Alimentação', 'descricao': 'com\x00nulo e 😀',
+     'data': '2024-12-31', 'versao': 1, 'origem': 'extrato'},
+]
+
+
+def test_ida_e_volta():
+    assert decodificar_snapshot(codificar_snapshot(TRANSACOES)) == TRANSACOES
+
+
+def test_snapshot_vazio():
+    assert decodificar_snapshot(codificar_snapshot([])) == []
+
+
+def test_checksum():
+    conteudo = bytearray(codificar_snapshot(TRANSACOES))
+    conteudo[-1] ^= 0xFF
+    with pytest.raises(ErroSnapshot, match="checksum"):
+        decodificar_snapshot(bytes(conteudo))
+
+
+def test_versao_do_formato():
+    conteudo = codificar_snapshot(TRANSACOES)
+    magico, _, crc, linhas = CABECALHO.unpack_from(conteudo)
+    futuro = CABECALHO.pack(magico, VERSAO_FORMATO + 1, crc, linhas) + conteudo[CABECALHO.size:]
+    with pytest.raises(ErroSnapshot, match="versão"):
+        decodificar_snapshot(futuro)
+
+
+@pytest.mark.parametrize('conteudo', [b'', b'FTSB', b'{"transacoes": []}' + bytes(CABECALHO.size)])
+def test_conteudo_invalido(conteudo):
+    with pytest.raises(ErroSnapshot):
+        decodificar_snapshot(conteudo)
+
+
+def test_linhas_do_cabecalho_conferidas():
+    conteudo = codificar_snapshot(TRANSACOES)
+    magico, versao, crc, _ = CABECALHO.unpack_from(conteudo)
+    with pytest.raises(ErroSnapshot, match="inconsistente"):
+        decodificar_snapshot(struct.pack('<4sHIQ', magico, versao, crc, 2) + conteudo[CABECALHO.size:])
+
+
+def test_modo_binario_importa_o_json(arquivo):
+    legado = FinTrack(arquivo, 'json')
+    legado.adicionar_em_lote([{k: t[k] for k in ('tipo', 'valor', 'categoria', 'descricao', 'data')}
+                              for t in TRANSACOES])
+    binario = FinTrack(arquivo, 'binario')
+    assert sorted(map(repr, binario.transacoes)) == sorted(map(repr, legado.transacoes))
+    binario.atualizar_transacao(1, {'valor': 50})
+    assert FinTrack(arquivo, 'binario').obter_transacao(1)['valor'] == 50
@@ -0,0 +1,98 @@
+# Modo sqlite: esquema do banco, migração de bancos antigos e leitura sob demanda por ano
+
+import sqlite3
+
+import pytest
+
+from fintrack import FinTrack
+
+ESQUEMA_ANTIGO = """
+    CREATE TABLE transacoes (id INTEGER NOT NULL, tipo TEXT NOT NULL, valor REAL NOT NULL,
+                             categoria TEXT NOT NULL, descricao TEXT NOT NULL DEFAULT '', data TEXT NOT NULL);
+    CREATE INDEX idx_transacoes_id ON transacoes (id);
+    CREATE TABLE meta (chave TEXT PRIMARY KEY, valor INTEGER NOT NULL);
+    INSERT INTO meta VALUES ('proximo_id', 4);
+"""
+
+
+def _banco(arquivo):
+    return arquivo[:-len('.json')] + '.db'
+
+
+def test_id_e_chave_primaria(arquivo):
+    sistema = FinTrack(arquivo, 'sqlite')
+    sistema.adicionar_transacao('despesa', 10, 'Outros', '', '2024-01-01')
+    conexao = sqlite3.connect(_banco(arquivo))
+    assert [(nome, pk) for _, nome, _, _, _, pk in conexao.execute("PRAGMA table_info(transacoes)")
+            if nome == 'id'] == [('id', 1)]
+    with pytest.raises(sqlite3.IntegrityError):
+        conexao.execute("INSERT INTO transacoes (id, tipo, valor, categoria, data) VALUES (1, 'despesa', 1, 'Outros', '2024-01-01')")
+
+
+def test_migra_banco_sem_chave_primaria(arquivo):
+    conexao = sqlite3.connect(_banco(arquivo))
+    conexao.executescript(ESQUEMA_ANTIGO)
+    conexao.executemany("INSERT INTO transacoes (id, tipo, valor, categoria, descricao, data) VALUES (?, ?, ?, ?, ?, ?)",
+                        [(1, 'despesa', 10, 'Outros', 'a', '2024-01-01'), (2, 'receita', 20, 'Salário', 'b', '2024-01-02'),
+                         (2, 'despesa', 30, 'Outros', 'c', '2024-01-03')])
+    conexao.commit()
+    conexao.close()
+
+    sistema = FinTrack(arquivo, 'sqlite')
+    # O ID repetido ganha um ID novo; nada se perde e o contador continua depois dele
+    assert sorted((t['id'], t['descricao'], t['versao']) for t in sistema.transacoes) == [
+        (1, 'a', 1), (2, 'b', 1), (4, 'c', 1)]
+    assert sistema.adicionar_em_lote([{'tipo': 'despesa', 'valor': 1, 'categoria': 'Outros',
+                                       'descricao': '', 'data': '2024-01-04'}])[0]['id'] == 5
+    indices = {nome for (nome,) in sqlite3.connect(_banco(arquivo)).execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'transacoes'")}
+    assert 'idx_transacoes_id' not in indices
+    assert len(FinTrack(arquivo, 'sqlite')) == 4
+
+
+def _lote():
+    return [{'tipo': 'despesa' if i % 4 else 'receita', 'valor': 10 + i,
+             'categoria': 'Alimentação' if i % 4 else 'Salário', 'descricao': f'item {i}',
+             'data': f'{2022 + i % 3}-{1 + i % 12:02d}-{1 + i % 28:02d}'} for i in range(90)]
+
+
+def _espiar(sistema, monkeypatch):
+    """Registra os anos lidos do banco pela sessão"""
+    lidos = []
+    carregar_ano = sistema.armazenamento.carregar_ano
+    monkeypatch.setattr(sistema.armazenamento, 'carregar_ano', lambda ano: lidos.append(ano) or carregar_ano(ano))
+    return lidos
+
+
+def test_abrir_le_so_os_totais(arquivo, monkeypatch):
+    gravado = FinTrack(arquivo, 'sqlite')
+    gravado.adicionar_em_lote(_lote())
+    reaberto = FinTrack(arquivo, 'sqlite')
+    lidos = _espiar(reaberto, monkeypatch)
+    assert len(reaberto) == 90
+    for ano in (2022, 2023, 2024):
+        for mes in range(1, 13):
+            assert reaberto.resumo_do_mes(mes, ano) == gravado.resumo_do_mes(mes, ano)
+    assert lidos == []
+    transacoes = reaberto.consultar_mes(2, 2023)['transacoes']
+    assert sorted(t['id'] for t in transacoes) == sorted(t['id'] for t in gravado.consultar_mes(2, 2023)['transacoes'])
+    assert lidos == [2023]
+
+
+def test_recarregar_refaz_os_totais(arquivo):
+    a = FinTrack(arquivo, 'sqlite')
+    a.adicionar_em_lote(_lote())
+    b = FinTrack(arquivo, 'sqlite')
+    a.adicionar_transacao('despesa', 1000, 'Outros', 'de fora', '2022-03-10')
+    antes = b.resumo_do_mes(3, 2022)
+    assert b.recarregar_se_alterado()
+    assert b.resumo_do_mes(3, 2022)[('despesa', 'Outros')] == antes.get(('despesa', 'Outros'), 0) + 1000
+    assert b.resumo_do_mes(3, 2022) == a.resumo_do_mes(3, 2022)
+    assert len(b) == 91
+
+
+def test_contador_depois_da_migracao_do_json(arquivo):
+    FinTrack(arquivo, 'json').adicionar_em_lote(_lote())
+    sistema = FinTrack(arquivo, 'sqlite')
+    assert len(sistema) == 90
+    assert sistema.adicionar_em_lote(_lote()[:1])[0]['id'] == 91
@@ -0,0 +1,111 @@
+# Write-behind (intervalo_gravacao > 0): mutações em memória, gravadas em lote depois
+
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+from fintrack import FinTrack
+
+PASTA = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _no_disco(arquivo, modo):
+    return sorted((t['id'], t['valor']) for t in FinTrack(arquivo, modo).transacoes)
+
+
+def _aguardar(condicao, limite=5.0):
+    fim = time.monotonic() + limite
+    while not condicao():
+        if time.monotonic() > fim:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+def test_mutacoes_so_vao_para_o_disco_no_flush(arquivo, modo):
+    sistema = FinTrack(arquivo, modo, intervalo_gravacao=60)
+    for i in range(3):
+        sistema.adicionar_transacao('despesa', i + 1, 'Outros', f'item {i}', '2024-01-01')
+    assert _no_disco(arquivo, modo) == []
+    assert sistema.armazenamento.pendentes > 0
+    sistema.flush()
+    assert sistema.armazenamento.pendentes == 0
+    assert _no_disco(arquivo, modo) == [(1, 1.0), (2, 2.0), (3, 3.0)]
+
+
+def test_mutacoes_da_mesma_transacao_sao_combinadas(arquivo):
+    sistema = FinTrack(arquivo, 'journal', intervalo_gravacao=60)
+    sistema.adicionar_transacao('despesa', 10, 'Outros', 'a', '2024-01-01')
+    sistema.adicionar_transacao('despesa', 20, 'Outros', 'b', '2024-01-01')
+    sistema.atualizar_transacao(1, {'valor': 15})
+    sistema.remover_transacao(2)
+    sistema.flush()
+    # add + edit viram um add; add + delete não chegam ao disco
+    with open(sistema.armazenamento.interno.arquivo_journal, encoding='utf-8') as f:
+        assert len(f.readlines()) == 2
+    assert _no_disco(arquivo, 'journal') == [(1, 15.0)]
+
+
+def test_thread_grava_depois_do_intervalo(arquivo, modo):
+    sistema = FinTrack(arquivo, modo, intervalo_gravacao=0.05)
+    sistema.adicionar_transacao('receita', 100, 'Salário', '', '2024-01-05')
+    assert _aguardar(lambda: _no_disco(arquivo, modo) == [(1, 100.0)])
+
+
+def test_lote_cheio_grava_antes_do_intervalo(arquivo, modo, monkeypatch):
+    monkeypatch.setenv('FINTRACK_LOTE_GRAVACAO', '5')
+    sistema = FinTrack(arquivo, modo, intervalo_gravacao=60)
+    for i in range(5):
+        sistema.adicionar_transacao('despesa', 1, 'Outros', '', '2024-01-01')
+    assert _aguardar(lambda: len(_no_disco(arquivo, modo)) == 5)
+
+
+def _processo(arquivo, modo, espera):
+    codigo = (f"import time; from fintrack import FinTrack\n"
+              f"s = FinTrack({arquivo!r}, {modo!r}, intervalo_gravacao=60)\n"
+              f"s.adicionar_transacao('despesa', 7, 'Outros', 'saida', '2024-01-01')\n"
+              f"print('pronto', flush=True)\n"
+              f"time.sleep({espera})\n")
+    ambiente = dict(os.environ, PYTHONPATH=PASTA)
+    return subprocess.Popen([sys.executable, '-c', codigo], env=ambiente,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+
+
+def test_saida_normal_grava_pendentes(arquivo, modo):
+    processo = _processo(arquivo, modo, 0)
+    processo.communicate(timeout=30)
+    assert processo.returncode == 0
+    assert _no_disco(arquivo, modo) == [(1, 7.0)]
+
+
+@pytest.mark.skipif(not hasattr(signal, 'SIGTERM') or os.name == 'nt', reason="SIGTERM de POSIX")
+def test_sigterm_grava_pendentes(arquivo, modo):
+    processo = _processo(arquivo, modo, 30)
+    # adicionar_transacao também imprime; espera a linha de pronto
+    for linha in processo.stdout:
+        if linha.strip() == 'pronto':
+            break
+    processo.send_signal(signal.SIGTERM)
+    processo.communicate(timeout=30)
+    assert _no_disco(arquivo, modo) == [(1, 7.0)]
+
+
+def test_recarregar_sem_gravacao_de_fora_nao_grava(arquivo, modo):
+    sistema = FinTrack(arquivo, modo, intervalo_gravacao=60)
+    sistema.adicionar_transacao('despesa', 1, 'Outros', '', '2024-01-01')
+    assert not sistema.recarregar_se_alterado()
+    assert sistema.armazenamento.pendentes > 0
+    assert _no_disco(arquivo, modo) == []
+
+
+def test_recarregar_com_gravacao_de_fora_grava_antes(arquivo, modo):
+    sistema = FinTrack(arquivo, modo, intervalo_gravacao=60)
+    sistema.adicionar_transacao('despesa', 1, 'Outros', 'minha', '2024-01-01')
+    FinTrack(arquivo, modo).adicionar_transacao('despesa', 2, 'Outros', 'de fora', '2024-01-02')
+    assert sistema.recarregar_se_alterado()
+    assert sorted(t['descricao'] for t in sistema.transacoes) == ['de fora', 'minha']
+    assert len(_no_disco(arquivo, modo)) == 2